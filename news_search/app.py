@@ -1,15 +1,33 @@
 import os
+import html
+import re
 import streamlit as st
 import requests
 from openai import OpenAI
 from dotenv import load_dotenv
 import json
 
+from cache import TTLCache
+from stt import ChunkedTranscriber, audio_key
+from summarizer import MapReduceSummarizer
+
 # 환경변수 로드
 load_dotenv()
 
 # FastAPI 서버 URL (환경변수로 설정 가능)
-FASTAPI_URL = "http://localhost:8000"
+FASTAPI_URL = os.getenv("FASTAPI_URL", "http://localhost:8000")
+# 서버 요청 timeout (연결, 응답 대기) 초. 스트리밍은 줄과 줄 사이 대기 시간에 적용
+FASTAPI_TIMEOUT = (5, float(os.getenv("FASTAPI_READ_TIMEOUT", "60")))
+
+# AI 분석 응답 캐시 (같은 기사 + 같은 프롬프트는 다시 요청하지 않음, 기사 요약은 프롬프트가 바뀌어도 재사용)
+# - LLM_CACHE_DB: SQLite 캐시 파일 (재시작해도 유지). 빈 값이면 메모리에만 저장
+# - LLM_CACHE_TTL: 응답 유지 시간(초)
+# - LLM_CACHE_MAX_ITEMS: 최대 저장 응답 수. 넘으면 가장 오래 안 쓴 응답부터 삭제
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db")) or None
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ITEMS = int(os.getenv("LLM_CACHE_MAX_ITEMS", "2000"))
+# STT 결과 캐시 유지 시간(초). 같은 녹음은 rerun / 재시작 후에도 다시 변환하지 않음 (LLM_CACHE_DB 파일 공유)
+STT_CACHE_TTL = float(os.getenv("STT_CACHE_TTL", str(24 * 3600)))
 
 # OpenAI 클라이언트 초기화
 @st.cache_resource
@@ -20,61 +38,125 @@ def get_openai_client():
         return None
     return OpenAI(api_key=api_key)
 
-# 서버에 뉴스 검색 호출
-def get_news_articles(query: str, display: int = 10):
-    ################################################
-    ######### 필수 과제 - 문제 2: fastapi를 호출한 검색결과 가져오기
-    # query -- 어떤 뉴스 검색
-    # display - 기사 개수
+
+@st.cache_resource
+def get_llm_cache():
+    return TTLCache(
+        "llm",
+        LLM_CACHE_TTL,
+        memory_items=min(LLM_CACHE_MAX_ITEMS, 256) if LLM_CACHE_DB else LLM_CACHE_MAX_ITEMS,
+        db_path=LLM_CACHE_DB,
+        db_max_items=LLM_CACHE_MAX_ITEMS,
+    )
+
+
+@st.cache_resource
+def get_stt_cache():
+    return TTLCache("stt", STT_CACHE_TTL, memory_items=256, db_path=LLM_CACHE_DB, db_max_items=LLM_CACHE_MAX_ITEMS)
+
+# 서버의 스트리밍 검색(/search/stream) 호출: 본문이 추출되는 대로 기사를 하나씩 yield
+# (type 이 "article" 인 기사 / "duplicate" 인 중복 기사 안내. 마지막 "summary" 는 화면에 쓰지 않음)
+def iter_news_articles(query: str, display: int = 10):
     reqBody = {
         "query": query,
         "display": display
     }
-    response = requests.get(FASTAPI_URL + "/search", params=reqBody)
-    
-    print("status:", response.status_code)
-    print("response text:", response.text)
+    with requests.get(
+        FASTAPI_URL + "/search/stream", params=reqBody, stream=True, timeout=FASTAPI_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        for line in response.iter_lines():
+            if not line:
+                continue
+            record = json.loads(line)
+            if record["type"] in ("article", "duplicate"):
+                yield record
+
 
-    ## list 만 return
-    data = response.json()
-    return data["articles"]
-    ################################################
+def render_article(index, article, key_prefix="result"):
+    """검색 결과 기사 하나를 expander 로 표시"""
+    title = html.unescape(article.get("title", ""))
+    title = re.sub(r"<.*?>", "", title)
+    link = article.get("link", "")
+    body = article.get("body", "")
+    alternative_links = article.get("alternative_links") or []
+
+    label = f"📝 {index}. {title}"
+    if alternative_links:
+        label += f" (같은 기사 {len(alternative_links)}개 더)"
+    with st.expander(label):
+        st.markdown(f"**링크:** [{link}]({link})")
+        if alternative_links:
+            st.markdown("**다른 언론사:** " + " · ".join(f"[{i}]({url})" for i, url in enumerate(alternative_links, start=1)))
+        # 스트리밍 중(live) / 완료 후(result) 같은 실행에서 두 번 그리므로 위젯 key 를 구분
+        st.text_area("본문", body, height=300, key=f"{key_prefix}-{index}-{link}")
 
 ### openAi로 분석 함수
 def generate_with_openai(news_list, prompt):
-    
+    """
+    기사 목록을 압축 직렬화해서 분석하고, 결과를 화면에 스트리밍으로 표시한 뒤 전체 문자열을 반환
+    (토큰 예산을 넘으면 기사별 map 요약 -> reduce 분석, summarizer.py 참고)
+    """
     client = get_openai_client()
     if not client:
         return None
-    
-    # 뉴스 데이터를 JSON 문자열로 변환
-    news_json = json.dumps(news_list, ensure_ascii=False, indent=2)
-    
+
+    summarizer = MapReduceSummarizer(client, cache=get_llm_cache())
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": prompt},
-                {"role": "user", "content": news_json}
-            ]
-        )
-        return response.choices[0].message.content
+        plan = summarizer.plan(news_list, prompt)
+        if plan["mode"] == "map_reduce" and plan["cached_chunks"] == len(plan["chunks"]):
+            st.caption(f"기사 {plan['articles']}개의 요약(조각 {len(plan['chunks'])}개)을 재사용해서 종합 분석합니다.")
+        elif plan["mode"] == "map_reduce":
+            st.caption(
+                f"기사 {plan['articles']}개, 약 {plan['input_tokens']:,} 토큰 -> "
+                f"조각 {len(plan['chunks'])}개를 먼저 요약한 뒤 종합 분석합니다."
+            )
+        with st.spinner("AI 분석 중..."):
+            result = st.write_stream(summarizer.stream(news_list, prompt, plan=plan))
+        st.session_state.ai_cache_info = summarizer.stats
+        return result
     except Exception as e:
         st.error(f"OpenAI API 오류: {str(e)}")
         return None
+
+
+def render_cache_info(stats):
+    """AI 분석 요청 / 토큰 사용량과, 결과가 캐시에서 왔는지, 얼마나 아꼈는지 표시"""
+    if not stats:
+        return
+    if stats["requests"]:
+        st.caption(
+            f"OpenAI 요청 {stats['requests']}번 (map {stats['map_requests']} / reduce {stats['reduce_requests']}), "
+            f"토큰 입력 {stats['usage_prompt_tokens']:,} / 출력 {stats['usage_completion_tokens']:,}"
+        )
+    if not stats["cache_hits"]:
+        return
+    saved = f"토큰 약 {stats['saved_tokens']:,}개, 약 {stats['saved_seconds']:.1f}초 절약"
+    if stats["requests"] == 0:
+        st.success(f"⚡ 캐시된 분석 결과입니다. ({saved})")
+    else:
+        st.info(
+            f"♻️ 캐시된 응답 {stats['cache_hits']}개를 재사용하고 {stats['requests']}번만 새로 요청했습니다. ({saved})"
+        )
     
 ### 오디오 파일 텍스트로 변환 STT
-def transcribe_audio(audio_file):
+def transcribe_audio(audio_file, placeholder):
+    """
+    녹음을 무음 구간에서 나눠 동시에 변환하고, 조각이 끝날 때마다 placeholder 에 지금까지의 결과를 표시
+    (stt.py 참고. 같은 녹음은 캐시에서 바로 가져온다)
+    """
     client = get_openai_client()
     if not client:
         return None
-    
+
+    transcriber = ChunkedTranscriber(client, cache=get_stt_cache())
+    text = ""
     try:
-        transcription = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file
-        )
-        return transcription.text
+        for i, text in enumerate(transcriber.stream(audio_file.getvalue(), filename=audio_file.name or "audio.wav")):
+            placeholder.text_area("STT 결과 (변환 중...)", value=text, height=120, disabled=True, key=f"stt-partial-{i}")
+        stats = transcriber.stats
+        st.caption(f"STT 조각 {stats['segments']}개, 요청 {stats['requests']}번, 캐시 {stats['cache_hits']}개 재사용")
+        return text
     except Exception as e:
         st.error(f"STT 오류: {str(e)}")
         return None
@@ -109,9 +191,27 @@ with tab1:
         st.session_state.news_data = []
     
     if search_button and search_query:
-        with st.spinner("FastAPI 서버를 통해 뉴스를 검색하고 있습니다..."):
-            news_articles = get_news_articles(search_query, num_articles)
-            st.session_state.news_data = news_articles
+        # 스트리밍 검색: 본문이 추출된 기사부터 바로 화면에 표시
+        news_articles = []
+        live_results = st.empty()
+        try:
+            with live_results.container():
+                with st.spinner("FastAPI 서버를 통해 뉴스를 검색하고 있습니다..."):
+                    for record in iter_news_articles(search_query, num_articles):
+                        if record["type"] == "duplicate":
+                            # 이미 받은 대표 기사의 다른 링크로 추가 (완료 후 다시 그릴 때 표시)
+                            for article in news_articles:
+                                if article["index"] == record["duplicate_of"]:
+                                    article.setdefault("alternative_links", []).append(record["link"])
+                            continue
+                        news_articles.append(record)
+                        render_article(len(news_articles), record, key_prefix="live")
+        except requests.RequestException as e:
+            st.error(f"검색 요청 오류: {str(e)}")
+        # 다 받은 뒤에는 검색 결과 순서대로 아래 검색 결과 영역에 다시 그린다
+        live_results.empty()
+        news_articles.sort(key=lambda a: a["index"])
+        st.session_state.news_data = news_articles
         
         if news_articles:
             st.success(f"✅ {len(news_articles)}개의 뉴스 기사를 찾았습니다!")
@@ -129,20 +229,8 @@ with tab1:
         # 뉴스 제목 (ex, 제목이모지 1.제목~)
         # 뉴스 링크 (ex, 링크: ~~)     
         # 뉴스 본문 (ex, 본문: text_area)   
-        import html
-        import re
-
         for index, article in enumerate(news_data, start=1):
-            title_raw = article.get("title", "")
-            link = article.get("link", "")
-            body = article.get("body", "")
-            
-            title = html.unescape(title_raw)
-            title = re.sub(r"<.*?>", "", title)
-
-            with st.expander(f"📝 {index}. {title}"):
-                st.markdown(f"**링크:** [{link}]({link})")
-                st.text_area("본문", body, height=300)             
+            render_article(index, article)
         
         ## AI 분석요청 및 분석 결과 
         st.header("AI 분석 요청")
@@ -152,15 +240,16 @@ with tab1:
 
         analyze_btn = st.button("👾 AI 분석 실행", type="primary", use_container_width=True)
 
-        if analyze_btn:
-            with st.spinner("AI 분석 중..."):
-                result = generate_with_openai(news_data, prompt)
-                st.session_state.ai_result = result
-
         st.header("AI 분석 결과")
 
-        if st.session_state.get("ai_result"):
+        if analyze_btn:
+            # 분석 결과는 생성되는 대로 이 영역에 스트리밍으로 표시
+            st.session_state.ai_cache_info = None
+            st.session_state.ai_result = generate_with_openai(news_data, prompt)
+            render_cache_info(st.session_state.ai_cache_info)
+        elif st.session_state.get("ai_result"):
             st.markdown(st.session_state.ai_result)
+            render_cache_info(st.session_state.get("ai_cache_info"))
         else:
             st.info("아직 분석 결과가 없습니다.")
         ################################################
@@ -190,11 +279,18 @@ with tab2:
 
         st.audio(audio_bytes, format=audio_file.type)
 
-        with st.spinner("음성을 텍스트로 변환 중입니다..."):
-            stt_text = transcribe_audio(audio_file)
-            st.session_state.stt_text = stt_text or ""
         st.subheader("📒 변환된 텍스트")
-        st.text_area("STT 결과", value=st.session_state.get("stt_text", ""), height=120) 
+        stt_area = st.empty()
+        # 같은 녹음이면 rerun(버튼 클릭 등) 때 다시 변환하지 않는다
+        clip_key = audio_key(audio_bytes)
+        if st.session_state.get("stt_clip_key") != clip_key:
+            with st.spinner("음성을 텍스트로 변환 중입니다..."):
+                stt_text = transcribe_audio(audio_file, stt_area)
+            st.session_state.stt_text = stt_text or ""
+            if stt_text is not None:
+                st.session_state.stt_clip_key = clip_key
+        stt_text = st.session_state.get("stt_text", "")
+        stt_area.text_area("STT 결과", value=stt_text, height=120)
     
         if st.button("🔎 이 텍스트로 뉴스 검색하기"):
             if not stt_text:
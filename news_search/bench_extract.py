@@ -0,0 +1,106 @@
+"""기사 본문 추출 정확성 확인 + 속도 벤치마크
+
+golden/ 디렉터리의 HTML 페이지마다 같은 이름의 .txt 정답 파일(기존 BeautifulSoup 방식의 출력)이 있다.
+1) 정확성: 기존 방식(bs4) / 빠른 방식(lxml) 출력이 정답 파일과 모두 같은지 확인 (다르면 종료 코드 1)
+2) 속도: 두 방식의 초당 처리 페이지 수(pages/sec) 비교
+
+실제 기사 페이지를 저장해 둔 디렉터리를 --pages 로 넘기면 정답 파일 없이 두 방식의 출력만 비교한다.
+
+사용 예:
+    python bench_extract.py
+    python bench_extract.py --pages ./saved_pages --repeat 50
+    python bench_extract.py --update   # 기존 방식 출력으로 golden/*.txt 다시 생성
+"""
+import argparse
+import os
+import sys
+import time
+
+from extract import extract_naver_article_html, extract_naver_article_html_bs4
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+NO_ARTICLE = "<<no article>>\n"  # 본문을 못 찾은(None) 페이지의 정답 파일 내용
+
+
+def _load_pages(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                pages.append((os.path.join(directory, name), f.read()))
+    return pages
+
+
+def _as_golden(text):
+    return NO_ARTICLE if text is None else text + "\n"
+
+
+def check(pages, use_golden, update):
+    failures = 0
+    for path, html in pages:
+        expected = extract_naver_article_html_bs4(html)
+        actual = extract_naver_article_html(html)
+        golden_path = os.path.splitext(path)[0] + ".txt"
+
+        if update:
+            with open(golden_path, "w", encoding="utf-8") as f:
+                f.write(_as_golden(expected))
+
+        problems = []
+        if actual != expected:
+            problems.append("lxml != bs4")
+        if use_golden:
+            if not os.path.exists(golden_path):
+                problems.append("정답 파일 없음")
+            else:
+                with open(golden_path, encoding="utf-8") as f:
+                    golden = f.read()
+                if _as_golden(expected) != golden:
+                    problems.append("bs4 != golden")
+                if _as_golden(actual) != golden:
+                    problems.append("lxml != golden")
+
+        status = "OK" if not problems else "FAIL (" + ", ".join(problems) + ")"
+        print(f"  {os.path.basename(path):<30} {status}")
+        failures += bool(problems)
+    return failures
+
+
+def bench(pages, repeat):
+    results = {}
+    for name, fn in [("bs4", extract_naver_article_html_bs4), ("lxml", extract_naver_article_html)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, html in pages:
+                fn(html)
+        elapsed = time.perf_counter() - start
+        results[name] = len(pages) * repeat / elapsed
+        print(f"  {name:<5} {results[name]:10.1f} pages/sec  ({elapsed:.2f}s, {len(pages) * repeat} pages)")
+    print(f"  speedup {results['lxml'] / results['bs4']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", help="정답 파일 없이 비교할 HTML 디렉터리 (기본: golden/)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--update", action="store_true", help="golden/*.txt 를 기존 방식 출력으로 다시 생성")
+    args = parser.parse_args()
+
+    directory = args.pages or GOLDEN_DIR
+    pages = _load_pages(directory)
+    if not pages:
+        raise SystemExit(f"HTML 파일이 없습니다: {directory}")
+
+    print(f"[check] {directory}")
+    failures = check(pages, use_golden=args.pages is None, update=args.update and args.pages is None)
+
+    print(f"[bench] repeat={args.repeat}")
+    bench(pages, args.repeat)
+
+    if failures:
+        print(f"{failures}개 페이지의 출력이 다릅니다.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""/search 서버 부하 테스트: 처리량(requests/sec) 과 업스트림 연결 수(socket churn) 측정
+
+로컬 stub 네이버 서버(bench_search.py 와 같은 응답, HTTP/1.1 keep-alive 지원)를 띄우고,
+main.py 서버를 uvicorn 하위 프로세스로 실행한 뒤 --concurrency 개 클라이언트가 --duration 초 동안 /search 를 계속 호출한다.
+캐시는 끄고(TTL 0) 측정하므로 매 요청마다 검색 API 1번 + 기사 페이지 --display 번을 stub 서버로 보낸다.
+
+출력
+- requests/sec, 지연시간 p50 / p95, 오류 수
+- upstream conns : stub 서버가 받은 TCP 연결 수 (적을수록 keep-alive 재사용이 잘 된 것)
+- upstream reqs  : stub 서버가 받은 HTTP 요청 수, reqs/conn : 연결 하나당 처리한 요청 수
+
+변경 전 코드와 비교하려면 이전 커밋을 다른 디렉터리에 꺼내서 --app-dir 로 지정한다.
+    git worktree add /tmp/news_before <이전 커밋>
+    python bench_load.py --app-dir /tmp/news_before/news_search
+    python bench_load.py
+
+사용 예:
+    python bench_load.py --concurrency 20 --duration 10 --display 10 --delay 0.05
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import httpx
+
+from bench_search import make_handler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CountingServer(ThreadingHTTPServer):
+    """받은 TCP 연결 수 / HTTP 요청 수를 세는 stub 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.connections = 0
+        self.requests = 0
+        self.counter_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.counter_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+def make_counting_handler(args):
+    base = make_handler(args)
+
+    class CountingHandler(base):
+        # HTTP/1.1: 클라이언트가 연결을 재사용할 수 있다 (기본 HTTP/1.0 은 응답마다 연결 종료)
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with self.server.counter_lock:
+                self.server.requests += 1
+            super().do_GET()
+
+    return CountingHandler
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(app_dir, port, stub_url, args):
+    env = {
+        **os.environ,
+        "NAVER_NEWS_API_URL": f"{stub_url}/v1/search/news.json",
+        "NAVER_API_KEY": os.environ.get("NAVER_API_KEY", "stub"),
+        "NAVER_SECRET_KEY": os.environ.get("NAVER_SECRET_KEY", "stub"),
+        # 캐시 hit 없이 매 요청 업스트림을 호출하도록 TTL 0
+        "SEARCH_CACHE_TTL": "0",
+        "ARTICLE_CACHE_TTL": "0",
+        "ARTICLE_CACHE_NEGATIVE_TTL": "0",
+        "NEWS_CACHE_DB": "",
+        "SEARCH_DEADLINE": str(args.deadline),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", app_dir,
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir,
+        env=env,
+    )
+    # 서버가 뜰 때까지 대기
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            if proc.poll() is not None:
+                raise SystemExit(f"서버 실행 실패 (종료 코드 {proc.returncode})")
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit("서버가 10초 안에 뜨지 않았습니다.")
+
+
+async def run_load(url, params, concurrency, duration):
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        end = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < end:
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(url, params=params)
+                    resp.raise_for_status()
+                    latencies.append(time.perf_counter() - start)
+                except httpx.HTTPError:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app-dir", default=BASE_DIR, help="main.py 가 있는 디렉터리 (변경 전 코드와 비교할 때 지정)")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--display", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.05, help="기사 페이지 응답 지연(초)")
+    parser.add_argument("--deadline", type=float, default=10.0)
+    args = parser.parse_args()
+    # make_handler 가 쓰는 느린 기사 설정 (부하 테스트에서는 사용 안 함)
+    args.slow, args.slow_delay = 0, 0.0
+
+    server = CountingServer(("127.0.0.1", 0), make_counting_handler(args))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    port = _free_port()
+    proc = start_app(os.path.abspath(args.app_dir), port, stub_url, args)
+    try:
+        url = f"http://127.0.0.1:{port}/search"
+        params = {"query": "stub", "display": args.display}
+        if args.warmup:
+            asyncio.run(run_load(url, params, args.concurrency, args.warmup))
+
+        with server.counter_lock:
+            server.connections = server.requests = 0
+        latencies, errors, elapsed = asyncio.run(run_load(url, params, args.concurrency, args.duration))
+        with server.counter_lock:
+            connections, requests = server.connections, server.requests
+    finally:
+        proc.terminate()
+        proc.wait()
+        server.shutdown()
+
+    print(f"app        : {os.path.abspath(args.app_dir)}")
+    print(f"load       : concurrency={args.concurrency} duration={args.duration}s "
+          f"display={args.display} delay={args.delay}s")
+    print(f"requests   : {len(latencies)} ok, {errors} errors, {len(latencies) / elapsed:.1f} req/s")
+    print(f"latency    : p50={_percentile(latencies, 0.5) * 1000:.0f}ms p95={_percentile(latencies, 0.95) * 1000:.0f}ms")
+    print(f"upstream   : conns={connections} reqs={requests} reqs/conn={requests / max(connections, 1):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""/search 기사 본문 수집 지연시간 벤치마크 (로컬 stub 네이버 서버 사용)
+
+로컬에 가짜 네이버 서버를 띄워서
+- /v1/search/news.json : 검색 결과 (링크는 stub 기사 주소)
+- /n.news.naver.com/article/<i> : 기사 페이지 (--delay 초 뒤 응답, 앞의 --slow 개는 --slow-delay 초)
+를 응답하게 하고, 같은 검색을
+- serial     : 기존처럼 fetch_article_text 를 기사마다 순서대로 호출
+- concurrent : fetch_articles (스레드 풀 동시 수집 + 마감 시간), 캐시를 비운 상태
+- cached     : 같은 검색을 한 번 더 (검색 결과 / 기사 본문 캐시 hit)
+세 방식으로 실행해서 소요시간과 가져온 기사 수를 비교한다.
+(서버 전체의 처리량 / 연결 재사용 비교는 bench_load.py)
+
+사용 예:
+    python bench_search.py --display 10 --delay 0.5
+    python bench_search.py --display 20 --delay 0.3 --slow 2 --slow-delay 8 --deadline 3
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ARTICLE_HTML = """<html><body><div id="dic_area">
+{body}<br>기사 번호 {idx} 본문입니다. 벤치마크용 stub 기사로, 도메인 체크와 본문 길이 조건을 통과하도록 충분히 길게 만듭니다.
+<script>var x = 1;</script><div class="copyright">ⓒ stub</div>
+</div></body></html>"""
+
+
+def make_handler(args):
+    class StubNaverHandler(BaseHTTPRequestHandler):
+        def log_message(self, *_):
+            pass
+
+        def _send(self, body, content_type):
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            host = f"http://{self.server.server_address[0]}:{self.server.server_address[1]}"
+            if parsed.path == "/v1/search/news.json":
+                params = parse_qs(parsed.query)
+                display = int(params.get("display", ["10"])[0])
+                items = [
+                    {"title": f"stub 기사 {i}", "link": f"{host}/n.news.naver.com/article/{i}"}
+                    for i in range(display)
+                ]
+                self._send(json.dumps({"total": display, "items": items}, ensure_ascii=False), "application/json")
+                return
+
+            idx = int(parsed.path.rsplit("/", 1)[-1])
+            # 앞에서부터 --slow 개는 느린 기사
+            time.sleep(args.slow_delay if idx < args.slow else args.delay)
+            self._send(ARTICLE_HTML.format(body="테스트 " * 20, idx=idx), "text/html; charset=utf-8")
+
+    return StubNaverHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--display", type=int, default=10)
+    parser.add_argument("--delay", type=float, default=0.5, help="기사 페이지 응답 지연(초)")
+    parser.add_argument("--slow", type=int, default=0, help="느리게 응답할 기사 수")
+    parser.add_argument("--slow-delay", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--deadline", type=float, default=10.0)
+    parser.add_argument("--skip-serial", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    # main 은 import 시점에 환경변수를 읽으므로 먼저 설정
+    os.environ["NAVER_NEWS_API_URL"] = f"http://{host}:{port}/v1/search/news.json"
+    os.environ.setdefault("NAVER_API_KEY", "stub")
+    os.environ.setdefault("NAVER_SECRET_KEY", "stub")
+    os.environ["ARTICLE_FETCH_WORKERS"] = str(args.workers)
+    os.environ["SEARCH_DEADLINE"] = str(args.deadline)
+    import main as news_main
+
+    print(f"stub server http://{host}:{port}  display={args.display} delay={args.delay}s "
+          f"slow={args.slow}x{args.slow_delay}s workers={args.workers} deadline={args.deadline}s")
+
+    if not args.skip_serial:
+        start = time.perf_counter()
+        items = news_main.search_naver_news("stub", args.display)["items"]
+        bodies = [news_main.fetch_article_text(item["link"]) for item in items]
+        serial_time = time.perf_counter() - start
+        print(f"serial     : {serial_time:6.2f}s  articles={sum(1 for b in bodies if b)}")
+
+    # serial 실행에서 채워진 캐시를 비우고 측정
+    news_main.search_cache.clear()
+    news_main.article_cache.clear()
+
+    def search():
+        items = news_main.search_naver_news("stub", args.display)["items"]
+        fetched, timed_out = news_main.fetch_articles(items)
+        return sum(1 for _, body in fetched if body), timed_out
+
+    start = time.perf_counter()
+    total, timed_out = search()
+    concurrent_time = time.perf_counter() - start
+    print(f"concurrent : {concurrent_time:6.2f}s  articles={total} timed_out={timed_out} partial={timed_out > 0}")
+
+    start = time.perf_counter()
+    total, _ = search()
+    cached_time = time.perf_counter() - start
+    print(f"cached     : {cached_time:6.2f}s  articles={total}")
+
+    if not args.skip_serial:
+        print(f"speedup    : {serial_time / concurrent_time:.2f}x (concurrent), "
+              f"{serial_time / cached_time:.1f}x (cached)")
+    print(f"cache      : search={news_main.search_cache.stats()} article={news_main.article_cache.stats()}")
+
+    server.shutdown()
+    news_main.fetch_executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
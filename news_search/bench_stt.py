@@ -0,0 +1,184 @@
+"""STT(stt.py) 무음 분할 확인 + 변환 시간 벤치마크 (로컬 stub OpenAI 호환 서버 사용)
+
+합성 WAV(발화 = 잡음 섞인 사인파, 발화 사이 --gap 초 무음 + 무음 없이 긴 발화 하나)를 만들고
+/v1/audio/transcriptions 를 흉내 내는 stub 서버(오디오 1초당 --per-second 초 + --delay 초 뒤 응답)로 변환한다.
+
+확인 (하나라도 틀리면 종료 코드 1)
+- 자른 지점이 모두 무음 구간 안 (최대 길이 때문에 강제로 자른 지점 제외)
+- 조각 길이: 마지막 조각 외에는 STT_MIN_CHUNK_SECONDS 이상, 모두 STT_MAX_CHUNK_SECONDS 이하
+- stub 이 받은 요청 수 == 조각 수, 결과 문자열 == 조각 결과를 순서대로 이은 것
+- 같은 녹음을 다시 변환하면 요청 0번 (캐시)
+출력: 한 번에 변환 vs 조각 순차 변환 vs 조각 동시 변환 소요시간, 첫 부분 결과까지 걸린 시간
+
+사용 예:
+    python bench_stt.py
+    python bench_stt.py --utterances 12 --workers 8 --per-second 0.1
+"""
+import argparse
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import wave
+from email.parser import BytesParser
+from email.policy import default
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import OpenAI
+
+import stt
+from cache import TTLCache
+
+RATE = 16000
+
+
+def make_wav(utterances, gap, long_seconds, seed=0):
+    """합성 녹음. 반환: (WAV 바이트, [(발화 시작 초, 끝 초)])"""
+    rng = random.Random(seed)
+    samples, spans = [], []
+
+    def tone(seconds, freq):
+        start = len(samples) / RATE
+        for i in range(int(seconds * RATE)):
+            samples.append(0.3 * math.sin(2 * math.pi * freq * i / RATE) + rng.uniform(-0.02, 0.02))
+        spans.append((start, len(samples) / RATE))
+
+    def silence(seconds):
+        samples.extend(rng.uniform(-0.001, 0.001) for _ in range(int(seconds * RATE)))
+
+    silence(0.5)
+    for n in range(utterances):
+        tone(rng.uniform(1.0, 4.0), 200 + 40 * n)
+        silence(gap)
+    if long_seconds:
+        tone(long_seconds, 330)
+        silence(0.3)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(b"".join(int(s * 32767).to_bytes(2, "little", signed=True) for s in samples))
+    return buffer.getvalue(), spans
+
+
+def _duration(wav_bytes):
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+        return wav.getnframes() / wav.getframerate()
+
+
+def make_handler(args, log):
+    class StubTranscriptionHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            message = BytesParser(policy=default).parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+            )
+            audio = next(
+                part.get_payload(decode=True) for part in message.iter_parts()
+                if part.get_param("name", header="content-disposition") == "file"
+            )
+            seconds = _duration(audio)
+            with log["lock"]:
+                log["requests"] += 1
+            time.sleep(args.delay + args.per_second * seconds)
+
+            data = json.dumps({"text": f"<{seconds:.2f}s>"}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return StubTranscriptionHandler
+
+
+def transcribe(client, audio, workers, cache=None, split=True):
+    """반환: (결과, 부분 결과 yield 횟수, 첫 부분 결과까지 시간, 전체 시간)"""
+    transcriber = stt.ChunkedTranscriber(client, workers=workers, cache=cache)
+    start = time.perf_counter()
+    first, partials, text = None, 0, ""
+    if split:
+        for text in transcriber.stream(audio):
+            partials += 1
+            first = first or time.perf_counter() - start
+    else:
+        text = transcriber._transcribe(audio, "audio.wav")
+        partials, first = 1, time.perf_counter() - start
+    return text, partials, first, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--utterances", type=int, default=8)
+    parser.add_argument("--gap", type=float, default=0.6, help="발화 사이 무음 길이(초)")
+    parser.add_argument("--long", type=float, default=45.0, help="무음 없이 긴 발화 길이(초, 0 이면 없음)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.3, help="stub 요청당 고정 지연(초)")
+    parser.add_argument("--per-second", type=float, default=0.05, help="stub 오디오 1초당 지연(초)")
+    args = parser.parse_args()
+
+    audio, spans = make_wav(args.utterances, args.gap, args.long)
+    segments = stt.split_on_silence(audio)
+
+    log = {"lock": threading.Lock(), "requests": 0}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args, log))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="stub", max_retries=0)
+
+    print(f"audio      : {_duration(audio):.1f}s, {len(spans)} utterances, {len(segments)} segments "
+          f"{[round(s['end'] - s['start'], 1) for s in segments]}")
+
+    single = transcribe(client, audio, 1, split=False)
+    serial = transcribe(client, audio, 1)
+    log["requests"] = 0
+    cache = TTLCache("stt", 3600)
+    concurrent = transcribe(client, audio, args.workers, cache=cache)
+    concurrent_requests = log["requests"]
+    log["requests"] = 0
+    cached = transcribe(client, audio, args.workers, cache=cache)
+    cached_requests = log["requests"]
+    server.shutdown()
+
+    for name, (_, partials, first, total) in [("single", single), ("serial", serial),
+                                              ("concurrent", concurrent), ("cached", cached)]:
+        print(f"{name:<11}: {total:6.2f}s  first partial {first:5.2f}s  partial updates={partials}")
+    print(f"speedup    : {single[3] / concurrent[3]:.2f}x vs single request, {serial[3] / concurrent[3]:.2f}x vs serial")
+
+    failures = []
+    for segment in segments[1:]:
+        cut = segment["start"]
+        # 최대 길이보다 긴 발화 안의 강제 분할은 허용
+        if any(begin < cut < end and end - begin <= stt.STT_MAX_CHUNK_SECONDS for begin, end in spans):
+            failures.append(f"{cut:.2f}s 지점이 발화 중간")
+    for segment in segments[:-1]:
+        if segment["end"] - segment["start"] < stt.STT_MIN_CHUNK_SECONDS - 0.05:
+            failures.append(f"짧은 조각 {segment['start']:.2f}s ~ {segment['end']:.2f}s")
+    if any(segment["end"] - segment["start"] > stt.STT_MAX_CHUNK_SECONDS + 0.05 for segment in segments):
+        failures.append("최대 길이를 넘는 조각")
+    if concurrent_requests != len(segments):
+        failures.append(f"요청 수 {concurrent_requests} != 조각 수 {len(segments)}")
+    expected = " ".join(f"<{_duration(s['wav']):.2f}s>" for s in segments)
+    if concurrent[0] != expected or serial[0] != expected or cached[0] != expected:
+        failures.append("결과 문자열이 조각 순서와 다름")
+    if cached_requests != 0:
+        failures.append(f"캐시된 녹음 재변환에서 요청 {cached_requests}번")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""AI 분석(summarizer.py) 확인 + 벤치마크 (로컬 stub OpenAI 호환 서버 사용)
+
+로컬에 /v1/chat/completions 를 흉내 내는 stub 서버를 띄우고 (--delay 초 뒤 응답, stream=True 면 SSE 로 조금씩)
+가짜 기사 --articles 개(기사마다 --paragraphs 문단 + 저작권 / 기자 이메일 문구)로 분석을 실행한다.
+
+확인 (하나라도 틀리면 종료 코드 1)
+- stub 이 받은 요청 수 == plan 의 map 조각 수 + reduce 1번 (+ 요약 합치기)
+- 요청마다 입력 토큰이 SUMMARY_MAX_INPUT_TOKENS 이하
+- stub 이 센 입력 토큰 합계 == summarizer 가 센 합계 == 응답 usage 합계
+- 스트리밍으로 받은 결과 == stub 이 보낸 최종 답변
+- 응답 캐시: 같은 프롬프트로 다시 실행하면 요청 0번, 프롬프트만 바꾸면 reduce 1번만 요청 (기사 요약 재사용)
+  기사 순서만 바꿔도 reduce 1번만 요청 (기사 요약 캐시 키는 본문만으로 정해진다)
+- 예산 안에 들어가는 기사(single): 프롬프트를 바꾸면 map-reduce 로 기사 요약을 만들어 두고, 그다음 프롬프트부터 reduce 1번
+출력: 기존 방식(들여쓰기 JSON 한 메시지) vs 압축 직렬화 토큰 수, 요청 수, 소요시간
+
+사용 예:
+    python bench_summarize.py
+    python bench_summarize.py --articles 10 --paragraphs 60 --max-input-tokens 8000 --delay 0.5
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import OpenAI
+
+from cache import TTLCache
+from summarizer import MapReduceSummarizer, count_message_tokens, count_tokens
+
+FINAL_ANSWER = "최종 분석 결과입니다. 기사들의 공통 주제는 반도체 투자 확대이며, 세부 내용은 다음과 같습니다."
+
+
+def make_articles(count, paragraphs):
+    articles = []
+    for i in range(count):
+        body = [
+            f"{i}번 기사의 {p}번째 문단입니다. 반도체 업계는 올해 설비 투자를 {p + 10}% 늘릴 계획이라고 밝혔다.  "
+            f"관계자는   \"수요 회복이 예상보다 빠르다\"고 말했다."
+            for p in range(paragraphs)
+        ]
+        body += ["", "홍길동 기자 hong@example.com", "ⓒ 예시뉴스, 무단전재 및 재배포 금지", "구독하고 최신 뉴스를 받아보세요"]
+        articles.append({
+            "index": i,
+            "title": f"<b>반도체</b> 투자 확대 기사 {i}",
+            "link": f"https://n.news.naver.com/mnews/article/001/{i:010d}",
+            "body": "\n".join(body),
+        })
+    return articles
+
+
+def make_handler(args, log):
+    class StubOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *_):
+            pass
+
+        def _send(self, body, content_type):
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            messages = request["messages"]
+            prompt_tokens = count_message_tokens(messages)
+            with log["lock"]:
+                log["requests"].append({"stream": bool(request.get("stream")), "prompt_tokens": prompt_tokens})
+            time.sleep(args.delay)
+
+            if not request.get("stream"):
+                # map 단계: 입력 앞부분을 요약인 것처럼 돌려준다 (max_tokens 를 넘으면 잘림, 글자 1개 = 1토큰으로 계산)
+                content = messages[-1]["content"][:min(args.summary_chars, request.get("max_tokens") or args.summary_chars)]
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": count_tokens(content),
+                         "total_tokens": prompt_tokens + count_tokens(content)}
+                self._send(json.dumps({
+                    "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": request["model"],
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": usage,
+                }, ensure_ascii=False), "application/json")
+                return
+
+            # reduce 단계: SSE 로 몇 글자씩 보내고, 마지막에 usage 청크
+            def chunk(delta, usage=None):
+                choices = [] if usage else [{"index": 0, "delta": delta, "finish_reason": None}]
+                return "data: " + json.dumps({
+                    "id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": request["model"], "choices": choices, "usage": usage,
+                }, ensure_ascii=False) + "\n\n"
+
+            events = [chunk({"role": "assistant", "content": ""})]
+            events += [chunk({"content": FINAL_ANSWER[i:i + 8]}) for i in range(0, len(FINAL_ANSWER), 8)]
+            completion_tokens = count_tokens(FINAL_ANSWER)
+            events.append(chunk({}, usage={"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                                           "total_tokens": prompt_tokens + completion_tokens}))
+            events.append("data: [DONE]\n\n")
+            self._send("".join(events), "text/event-stream")
+
+    return StubOpenAIHandler
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=10)
+    parser.add_argument("--paragraphs", type=int, default=40, help="기사 하나의 문단 수")
+    parser.add_argument("--max-input-tokens", type=int, default=6000)
+    parser.add_argument("--chunk-tokens", type=int, default=1500)
+    parser.add_argument("--map-workers", type=int, default=4)
+    parser.add_argument("--summary-chars", type=int, default=200, help="stub map 응답(요약) 길이")
+    parser.add_argument("--delay", type=float, default=0.2, help="stub 응답 지연(초)")
+    args = parser.parse_args()
+
+    log = {"lock": threading.Lock(), "requests": []}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args, log))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = OpenAI(base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="stub", max_retries=0)
+
+    news_list = make_articles(args.articles, args.paragraphs)
+    prompt = "이 기사들의 핵심 내용을 정리하고 공통 주제를 분석해 주세요."
+    llm_cache = TTLCache("llm", 3600, memory_items=10000)
+
+    def make_summarizer():
+        return MapReduceSummarizer(
+            client,
+            max_input_tokens=args.max_input_tokens,
+            chunk_tokens=args.chunk_tokens,
+            map_workers=args.map_workers,
+            cache=llm_cache,
+        )
+
+    summarizer = make_summarizer()
+
+    # 기존 방식: 기사 목록 전체를 들여쓰기 JSON 으로 메시지 하나에
+    legacy_tokens = count_message_tokens([
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": json.dumps(news_list, ensure_ascii=False, indent=2)},
+    ])
+
+    start = time.perf_counter()
+    plan = summarizer.plan(news_list, prompt)
+    answer = "".join(summarizer.stream(news_list, prompt, plan=plan))
+    elapsed = time.perf_counter() - start
+    requests = list(log["requests"])
+
+    # 응답 캐시: 같은 프롬프트로 다시 / 프롬프트만 바꿔서 다시
+    cache_runs = []
+    for run_prompt in [prompt, "이 기사들에서 언급된 수치만 표로 정리해 주세요."]:
+        log["requests"].clear()
+        cached_summarizer = make_summarizer()
+        start = time.perf_counter()
+        cached_answer = "".join(cached_summarizer.stream(news_list, run_prompt))
+        cache_runs.append((len(log["requests"]), cached_summarizer.stats, time.perf_counter() - start, cached_answer))
+
+    log["requests"].clear()
+    "".join(make_summarizer().stream(list(reversed(news_list)), prompt))
+    reorder_requests = len(log["requests"])
+
+    # 예산 안에 들어가는 기사: 프롬프트를 바꿀 때마다 요청 수
+    small = make_articles(3, 5)
+    small_runs = []
+    for run_prompt in [prompt, "이 기사들에서 언급된 수치만 표로 정리해 주세요.", "이 기사들의 인물만 정리해 주세요."]:
+        log["requests"].clear()
+        small_summarizer = make_summarizer()
+        small_plan = small_summarizer.plan(small, run_prompt)
+        "".join(small_summarizer.stream(small, run_prompt, plan=small_plan))
+        small_runs.append((small_plan["mode"], len(small_plan["chunks"]), len(log["requests"])))
+    server.shutdown()
+    stub_tokens = sum(r["prompt_tokens"] for r in requests)
+    stats = summarizer.stats
+
+    print(f"articles   : {plan['articles']}  tokens per article: {plan['article_tokens']}")
+    print(f"input      : legacy JSON {legacy_tokens} tokens -> compact {plan['input_tokens']} tokens "
+          f"({1 - plan['input_tokens'] / legacy_tokens:.0%} less)")
+    print(f"plan       : {plan['mode']}, map chunks={len(plan['chunks'])}, budget={args.max_input_tokens}")
+    print(f"requests   : {len(requests)} (map={stats['map_requests']} reduce={stats['reduce_requests']}), "
+          f"max input per request={max(r['prompt_tokens'] for r in requests)}")
+    print(f"tokens     : stub={stub_tokens} summarizer={stats['input_tokens']} usage={stats['usage_prompt_tokens']}")
+    print(f"elapsed    : {elapsed:.2f}s (delay {args.delay}s per request, map workers {args.map_workers})")
+    for name, (count, cache_stats, cache_elapsed, _) in zip(["same prompt", "new prompt"], cache_runs):
+        print(f"cache      : {name:<11} requests={count} hits={cache_stats['cache_hits']} "
+              f"saved_tokens={cache_stats['saved_tokens']} elapsed={cache_elapsed:.2f}s")
+    print(f"cache      : reordered   requests={reorder_requests}")
+    print(f"small      : {', '.join(f'{mode} chunks={chunks} requests={count}' for mode, chunks, count in small_runs)}")
+
+    failures = []
+    expected_requests = len(plan["chunks"]) + 1 if plan["mode"] == "map_reduce" else 1
+    if plan["mode"] == "map_reduce" and len(requests) < expected_requests:
+        failures.append(f"요청 수 {len(requests)} < 예상 {expected_requests}")
+    if plan["mode"] == "single" and len(requests) != 1:
+        failures.append(f"요청 수 {len(requests)} != 1")
+    if stats["requests"] != len(requests):
+        failures.append(f"summarizer 요청 수 {stats['requests']} != stub {len(requests)}")
+    if any(r["prompt_tokens"] > args.max_input_tokens for r in requests):
+        failures.append("입력 토큰 예산을 넘은 요청이 있음")
+    if not stub_tokens == stats["input_tokens"] == stats["usage_prompt_tokens"]:
+        failures.append("입력 토큰 합계가 서로 다름")
+    if answer != FINAL_ANSWER:
+        failures.append("스트리밍 결과가 stub 응답과 다름")
+    (same_requests, _, _, same_answer), (new_requests, _, _, _) = cache_runs
+    if same_requests != 0 or same_answer != answer:
+        failures.append(f"같은 프롬프트 재실행에서 요청 {same_requests}번 (캐시 미사용)")
+    if new_requests != 1:
+        failures.append(f"프롬프트만 바꾼 재실행에서 요청 {new_requests}번 (예상 1번: reduce)")
+    if reorder_requests != 1:
+        failures.append(f"기사 순서만 바꾼 재실행에서 요청 {reorder_requests}번 (예상 1번: reduce)")
+    (first_mode, _, first_count), (second_mode, second_chunks, second_count), (_, _, third_count) = small_runs
+    if first_mode != "single" or first_count != 1:
+        failures.append(f"예산 안의 기사 첫 분석이 {first_mode} / 요청 {first_count}번 (예상 single 1번)")
+    if second_mode != "map_reduce" or second_count != second_chunks + 1:
+        failures.append(f"예산 안의 기사 프롬프트 변경이 {second_mode} / 요청 {second_count}번 (예상 map_reduce)")
+    if third_count != 1:
+        failures.append(f"예산 안의 기사 두 번째 프롬프트 변경에서 요청 {third_count}번 (예상 1번: reduce)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
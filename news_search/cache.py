@@ -0,0 +1,179 @@
+"""검색 결과 / 기사 본문 캐시
+
+인기 검색어는 같은 검색 API 호출과 같은 기사 페이지 다운로드·파싱이 계속 반복된다.
+- 1단계: 메모리 LRU (항목 개수 제한)
+- 2단계: (선택) SQLite 파일 -> 서버를 재시작해도 캐시가 남는다
+항목마다 만료 시각(TTL)을 저장하고, 만료된 항목도 바로 지우지 않고 "stale" 로 돌려준다.
+호출하는 쪽은 stale 항목의 ETag / Last-Modified 로 조건부 요청을 보내서 바뀌지 않았으면(304) touch 로 연장한다.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, name, ttl, memory_items=1024, db_path=None, db_max_items=50000):
+        self.name = name
+        self.ttl = ttl
+        self.memory_items = memory_items
+        self.db_path = db_path
+        self.db_max_items = db_max_items
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (value, expires_at) (가장 최근 사용이 뒤쪽)
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "stale": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+        }
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS cache (
+                        namespace TEXT NOT NULL,
+                        key TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        expires_at REAL NOT NULL,
+                        used_at REAL NOT NULL,
+                        PRIMARY KEY (namespace, key)
+                    )
+                    """
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_used ON cache (namespace, used_at)")
+
+    # ---------------- SQLite ----------------
+    def _db_get(self, key):
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?", (self.name, key)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute(
+                "UPDATE cache SET used_at = ? WHERE namespace = ? AND key = ?", (time.time(), self.name, key)
+            )
+        return json.loads(row[0]), row[1]
+
+    def _db_set(self, key, value, expires_at):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, used_at) VALUES (?, ?, ?, ?, ?)",
+                (self.name, key, json.dumps(value, ensure_ascii=False), expires_at, time.time()),
+            )
+            # 최대 개수를 넘으면 가장 오래 안 쓴 항목부터 삭제
+            self._conn.execute(
+                """
+                DELETE FROM cache WHERE namespace = ? AND key IN (
+                    SELECT key FROM cache WHERE namespace = ? ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.name, self.name, self.db_max_items),
+            )
+
+    def _db_touch(self, key, expires_at):
+        with self._conn:
+            self._conn.execute(
+                "UPDATE cache SET expires_at = ?, used_at = ? WHERE namespace = ? AND key = ?",
+                (expires_at, time.time(), self.name, key),
+            )
+
+    # ---------------- 메모리 ----------------
+    def _memory_set(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    # ---------------- 공개 API ----------------
+    def get(self, key):
+        """
+        캐시 조회. 반환: (value, fresh)
+        - 만료 전: (value, True)
+        - 만료됨: (value, False) -> 재검증(조건부 요청)에 사용
+        - 없음: (None, False)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            tier = "memory_hits"
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                entry = self._db_get(key)
+                tier = "disk_hits"
+                if entry is not None:
+                    # SQLite 에서 찾은 값은 메모리로 올려둔다
+                    self._memory_set(key, *entry)
+
+            if entry is None:
+                self._counters["misses"] += 1
+                return None, False
+
+            value, expires_at = entry
+            if expires_at <= now:
+                self._counters["stale"] += 1
+                return value, False
+            self._counters[tier] += 1
+            return value, True
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._memory_set(key, value, expires_at)
+            if self._conn is not None:
+                self._db_set(key, value, expires_at)
+            self._counters["stores"] += 1
+
+    def touch(self, key, ttl=None):
+        """재검증 결과 바뀌지 않은(304) 항목의 만료 시각을 연장한다."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory_set(key, entry[0], expires_at)
+            if self._conn is not None:
+                self._db_touch(key, expires_at)
+            self._counters["revalidated"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache WHERE namespace = ?", (self.name,))
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+
+        hits = counters["memory_hits"] + counters["disk_hits"] + counters["revalidated"]
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["stale"] + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            # 재검증(304)으로 다시 쓴 항목도 본문을 새로 받지 않았으므로 hit 으로 본다
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "ttl": self.ttl,
+            "memory_items": memory_items,
+            "memory_max_items": self.memory_items,
+            "sqlite_enabled": self._conn is not None,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,279 @@
+"""네이버 뉴스 대량 수집 (bulk crawl)
+
+한 주제로 수백 개 기사를 모을 때 search_naver_news 를 손으로 반복 호출하지 않도록
+start 위치를 여러 페이지로 나눠서 동시에 요청하고 결과를 JSONL 파일로 계속 써 나간다.
+- API 제한: 한 번에 최대 100개(display), start 는 최대 1000 -> 검색어 하나당 최대 1000개
+- 속도 제한: 초당 --rate 번까지만 검색 API 호출 (네이버 API 초당 호출 제한 대응),
+  --max-requests 로 이번 실행에서 쓸 호출 수(일일 쿼터 예산)를 정할 수 있다
+- 중복 제거: 정규화한 기사 주소 기준 (같은 기사가 여러 페이지에 나와도 한 번만 저장)
+- 이어받기: 끝난 페이지를 <output>.checkpoint.json 에 기록. 중단 후 같은 명령을 다시 실행하면
+  남은 페이지만 요청하고, 이미 저장된 기사는 output 파일에서 읽어서 중복 제거에 사용
+- (선택) 끝난 뒤 --parquet 로 Parquet 파일로 변환 (pyarrow 필요)
+
+사용 예:
+    python crawl.py "AI 반도체" --max-articles 500 --output ai.jsonl
+    python crawl.py "AI 반도체" --max-articles 1000 --output ai.jsonl --sort date --no-bodies --parquet ai.parquet
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from fastapi import HTTPException
+
+from main import SEARCH_DEADLINE, canonical_article_url, fetch_articles, search_naver_news
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+MAX_DISPLAY = 100
+MAX_START = 1000
+MAX_RETRIES = 5
+
+
+def _retryable(e):
+    """
+    search_naver_news 오류(HTTPException) 중 다시 시도할 만한 것: 429 / 5xx 응답, 연결 실패 / 타임아웃.
+    API 키가 없거나 잘못됐거나(401/403) 요청이 잘못된(4xx) 경우는 다시 보내도 같으므로 바로 실패.
+    """
+    cause = e.__cause__
+    if isinstance(cause, requests.HTTPError) and cause.response is not None:
+        status = cause.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(cause, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError))
+
+
+class QuotaExhausted(Exception):
+    """이번 실행의 검색 API 호출 예산(--max-requests)을 다 쓴 경우"""
+
+
+class RateLimiter:
+    """초당 rate 번까지만 통과시키는 토큰 버킷 (스레드 안전)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _load_checkpoint(path, query, sort, page_size):
+    params = {"query": query, "sort": sort, "page_size": page_size}
+    if not os.path.exists(path):
+        return {**params, "total": None, "done_offsets": []}
+
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if any(state.get(key) != value for key, value in params.items()):
+        raise SystemExit(
+            f"체크포인트({path})의 수집 조건이 다릅니다: "
+            f"{ {key: state.get(key) for key in params} } -> 다른 output 파일을 지정하세요."
+        )
+    return state
+
+
+def _load_seen(output):
+    """이미 저장된 기사 주소를 읽는다. 중단되어 마지막 줄이 잘린 경우 그 줄은 잘라낸다."""
+    seen = set()
+    if not os.path.exists(output):
+        return seen
+
+    with open(output, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    for line in data.splitlines():
+        try:
+            seen.add(canonical_article_url(json.loads(line)["link"]))
+        except (ValueError, KeyError):
+            continue
+    return seen
+
+
+def _page_offsets(total, max_articles, page_size):
+    limit = min(total, max_articles, MAX_START)
+    return [(start, min(page_size, limit - start + 1)) for start in range(1, limit + 1, page_size)]
+
+
+def crawl(query, output, max_articles=500, sort="sim", page_size=MAX_DISPLAY, workers=4, rate=8.0,
+          max_requests=None, fetch_bodies=True, deadline=SEARCH_DEADLINE):
+    """
+    query 검색 결과를 최대 max_articles 개까지 output(JSONL)에 저장한다.
+    반환: 수집 통계 dict (requests, written, duplicates, pages, done)
+    """
+    page_size = min(page_size, MAX_DISPLAY)
+    checkpoint_path = f"{output}.checkpoint.json"
+    state = _load_checkpoint(checkpoint_path, query, sort, page_size)
+    done_offsets = set(state["done_offsets"])
+    seen = _load_seen(output)
+
+    limiter = RateLimiter(rate)
+    lock = threading.Lock()
+    stats = {"requests": 0, "written": 0, "duplicates": 0, "pages": 0}
+
+    def fetch_page(start, display):
+        for attempt in range(MAX_RETRIES):
+            with lock:
+                if max_requests is not None and stats["requests"] >= max_requests:
+                    raise QuotaExhausted(f"검색 API 호출 예산({max_requests}회)을 모두 사용했습니다.")
+                stats["requests"] += 1
+            limiter.acquire()
+            try:
+                return search_naver_news(query, display, start, sort)
+            except HTTPException as e:
+                # 속도 제한(429) / 일시 오류는 점점 길게 기다렸다가 다시 시도
+                if attempt == MAX_RETRIES - 1 or not _retryable(e):
+                    raise
+                print(f"[crawl] start={start} 요청 실패, 재시도 {attempt + 1}/{MAX_RETRIES - 1}: {e.detail}")
+                time.sleep(2 ** attempt)
+
+    with open(output, "a", encoding="utf-8") as out:
+
+        def save_page(start, result):
+            items = result.get("items", [])
+            if fetch_bodies:
+                fetched, _ = fetch_articles(items, deadline)
+            else:
+                fetched = [(item, None) for item in items]
+
+            crawled_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+            with lock:
+                lines = []
+                for rank, (item, body) in enumerate(fetched, start=start):
+                    key = canonical_article_url(item.get("link", ""))
+                    if key in seen:
+                        stats["duplicates"] += 1
+                        continue
+                    seen.add(key)
+                    lines.append(json.dumps({
+                        "query": query,
+                        "sort": sort,
+                        "rank": rank,
+                        "title": item.get("title", ""),
+                        "link": item.get("link", ""),
+                        "originallink": item.get("originallink", ""),
+                        "description": item.get("description", ""),
+                        "pub_date": item.get("pubDate", ""),
+                        "body": body,
+                        "crawled_at": crawled_at,
+                    }, ensure_ascii=False) + "\n")
+                out.writelines(lines)
+                out.flush()
+
+                # 파일에 쓴 뒤에 체크포인트 기록 (중간에 끊기면 이 페이지는 다음 실행에서 다시 받고 중복은 걸러진다)
+                stats["written"] += len(lines)
+                stats["pages"] += 1
+                done_offsets.add(start)
+                state["done_offsets"] = sorted(done_offsets)
+                _write_json_atomic(checkpoint_path, state)
+                print(f"[crawl] start={start:<4} items={len(items):<3} new={len(lines):<3} "
+                      f"total_written={stats['written']} requests={stats['requests']}")
+
+        try:
+            # 전체 검색 결과 수를 모르면 첫 페이지로 확인
+            if state["total"] is None:
+                first_display = min(page_size, max_articles)
+                first = fetch_page(1, first_display)
+                state["total"] = int(first.get("total", 0))
+                save_page(1, first)
+
+            pending = [
+                (start, display) for start, display in _page_offsets(state["total"], max_articles, page_size)
+                if start not in done_offsets
+            ]
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl") as pool:
+                futures = [pool.submit(lambda s=start, d=display: save_page(s, fetch_page(s, d)))
+                           for start, display in pending]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    # 예산 소진 / Ctrl+C: 아직 시작 안 한 페이지는 취소하고, 진행 중인 페이지는 끝까지 저장
+                    for future in futures:
+                        future.cancel()
+                    raise
+        except QuotaExhausted as e:
+            print(f"[crawl] {e} 같은 명령을 다시 실행하면 이어서 수집합니다.")
+        except HTTPException as e:
+            print(f"[crawl] 검색 API 오류로 중단: {e.detail} 같은 명령을 다시 실행하면 이어서 수집합니다.")
+        except KeyboardInterrupt:
+            print("[crawl] 중단됨. 같은 명령을 다시 실행하면 이어서 수집합니다.")
+
+    all_offsets = {start for start, _ in _page_offsets(state["total"] or 0, max_articles, page_size)}
+    stats["done"] = state["total"] is not None and all_offsets <= done_offsets
+    return stats
+
+
+def jsonl_to_parquet(jsonl_path, parquet_path):
+    if pa is None:
+        raise SystemExit("Parquet 변환에는 pyarrow 가 필요합니다. (pip install pyarrow)")
+    with open(jsonl_path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    pq.write_table(pa.Table.from_pylist(rows), parquet_path)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query")
+    parser.add_argument("--output", required=True, help="결과 JSONL 파일 (이어받기 체크포인트는 <output>.checkpoint.json)")
+    parser.add_argument("--max-articles", type=int, default=500, help="최대 수집 기사 수 (API 제한상 최대 1000)")
+    parser.add_argument("--sort", choices=["sim", "date"], default="sim")
+    parser.add_argument("--page-size", type=int, default=MAX_DISPLAY)
+    parser.add_argument("--workers", type=int, default=4, help="동시에 요청할 페이지 수")
+    parser.add_argument("--rate", type=float, default=8.0, help="검색 API 초당 최대 호출 수")
+    parser.add_argument("--max-requests", type=int, help="이번 실행에서 쓸 검색 API 호출 수 예산")
+    parser.add_argument("--no-bodies", action="store_true", help="기사 본문은 가져오지 않고 검색 결과만 저장")
+    parser.add_argument("--parquet", help="수집이 끝나면 이 경로로 Parquet 변환")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = crawl(
+        args.query,
+        args.output,
+        max_articles=args.max_articles,
+        sort=args.sort,
+        page_size=args.page_size,
+        workers=args.workers,
+        rate=args.rate,
+        max_requests=args.max_requests,
+        fetch_bodies=not args.no_bodies,
+    )
+    print(f"[crawl] {stats} elapsed={time.perf_counter() - start:.1f}s")
+
+    if args.parquet and stats["done"]:
+        rows = jsonl_to_parquet(args.output, args.parquet)
+        print(f"[crawl] {args.parquet} 에 {rows}개 기사 저장")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""중복 기사(같은 통신사 기사를 여러 언론사가 다시 낸 경우) 묶기
+
+MinHash(bottom-k) 로 글자 shingle 집합의 Jaccard 유사도를 추정한다.
+- 정규화: HTML 태그 / 엔티티 제거, 소문자, 공백·문장부호 제거 (줄바꿈·띄어쓰기 차이 무시)
+- shingle: 연속 SHINGLE_SIZE 글자. 각 shingle 을 crc32 로 해시
+- 서명(sketch): 해시값 중 가장 작은 SKETCH_SIZE 개
+- 유사도: 두 서명을 합친 것 중 가장 작은 k 개 가운데 양쪽 서명에 모두 있는 비율 (집합이 작으면 정확한 Jaccard)
+NearDuplicateIndex 는 기사를 하나씩 넣으면서, 이미 넣은 기사 중 threshold 이상 비슷한 대표 기사가 있으면 그 키를 돌려준다.
+"""
+import heapq
+import html
+import re
+import zlib
+
+SHINGLE_SIZE = 5
+SKETCH_SIZE = 128
+
+_TAG = re.compile(r"<.*?>")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD.sub("", html.unescape(_TAG.sub("", text or "")).lower())
+
+
+def sketch(text: str, shingle_size: int = SHINGLE_SIZE, size: int = SKETCH_SIZE) -> frozenset:
+    """text 의 MinHash(bottom-k) 서명. 빈 문자열이면 빈 집합"""
+    text = normalize(text)
+    if not text:
+        return frozenset()
+    if len(text) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+    hashes = {zlib.crc32(shingle.encode("utf-8")) for shingle in shingles}
+    return frozenset(heapq.nsmallest(size, hashes))
+
+
+def similarity(a: frozenset, b: frozenset, size: int = SKETCH_SIZE) -> float:
+    """두 서명으로 추정한 Jaccard 유사도 (0 ~ 1)"""
+    if not a or not b:
+        return 0.0
+    union = heapq.nsmallest(size, a | b)
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+
+class NearDuplicateIndex:
+    def __init__(self, threshold=0.8):
+        self.threshold = threshold
+        self._sketches = []  # [(대표 기사 키, 서명)] 넣은 순서
+
+    def add(self, key, text):
+        """
+        text 와 threshold 이상 비슷한 대표 기사가 있으면 그 키를 반환 (중복)
+        없으면 key 를 새 대표로 등록하고 None 반환. 빈 text 는 중복으로 보지 않고 등록도 안 한다.
+        """
+        signature = sketch(text)
+        if not signature:
+            return None
+        best_key, best = None, self.threshold
+        for rep_key, rep_signature in self._sketches:
+            score = similarity(signature, rep_signature)
+            if score >= best:
+                best_key, best = rep_key, score
+        if best_key is None:
+            self._sketches.append((key, signature))
+        return best_key
@@ -0,0 +1,91 @@
+"""네이버 뉴스 기사 본문 추출
+
+extract_naver_article_html_bs4 : 기존 BeautifulSoup 방식 (기준 구현)
+extract_naver_article_html     : lxml 트리를 직접 순회하는 빠른 방식 (기준 구현과 같은 결과)
+
+BeautifulSoup 은 페이지 전체를 파이썬 객체 트리로 다시 만들고, CSS 선택 / decompose / <br> 치환을 거친다.
+빠른 방식은 lxml(C) 로 파싱한 뒤 본문 노드만 순회하면서, 제거 대상 요소는 건너뛰고(꼬리 텍스트는 유지)
+get_text("\\n", strip=True) 와 같은 규칙으로 문자열을 모은다.
+- 주석 / 처리 명령 / rt, rp, template 안의 문자열은 BeautifulSoup get_text 에서도 빠지므로 제외
+- <br> 은 strip 후 빈 문자열이 되므로 따로 처리하지 않아도 결과가 같다
+"""
+from bs4 import BeautifulSoup
+from lxml import etree
+
+# 본문에서 제거하는 요소 (기존 select("script, style, .media_end_correction, .copyright, figure") 와 같음)
+REMOVE_TAGS = frozenset(["script", "style", "figure"])
+REMOVE_CLASSES = frozenset(["media_end_correction", "copyright"])
+# BeautifulSoup 이 get_text 대상이 아닌 문자열 타입(Script, Stylesheet, TemplateString, RubyText...)으로 담는 태그
+NON_TEXT_TAGS = frozenset(["script", "style", "template", "rt", "rp"])
+
+_ARTICLE_XPATHS = [etree.XPath('//*[@id="dic_area"]'), etree.XPath('//*[@id="newsct_article"]')]
+_HTML_PARSER = etree.HTMLParser(recover=True)
+
+
+#  네이버 뉴스 페이지 전용 파서
+def extract_naver_article_html_bs4(html: str):
+
+    soup = BeautifulSoup(html, "lxml")
+    # 모바일(mnews)에서 본문
+    article = soup.select_one("#dic_area")
+    # PC(news)에서 본문
+    if not article:
+        article = soup.select_one("#newsct_article")
+    if not article:
+        return None
+    # 불필요 요소 제거
+    for s in article.select(
+        "script, style, .media_end_correction, .copyright, figure"
+    ):
+        s.decompose()
+    for br in article.find_all("br"):
+        br.replace_with("\n")
+    return article.get_text("\n", strip=True)
+
+
+def _is_removed(el):
+    if el.tag in REMOVE_TAGS:
+        return True
+    classes = el.get("class")
+    return bool(classes) and not REMOVE_CLASSES.isdisjoint(classes.split())
+
+
+def _collect_text(el, hidden, out):
+    # hidden: el 바로 안의 문자열이 get_text 대상에서 빠지는지 여부
+    if el.text and not hidden:
+        out.append(el.text)
+    for child in el:
+        # 주석 / 처리 명령은 tag 가 문자열이 아니다 (내용은 제외, 꼬리 텍스트는 포함)
+        if isinstance(child.tag, str) and not _is_removed(child):
+            _collect_text(child, hidden or child.tag in NON_TEXT_TAGS, out)
+        if child.tail and not hidden:
+            out.append(child.tail)
+
+
+def extract_naver_article_html(html: str):
+    """extract_naver_article_html_bs4 와 같은 결과를 lxml 로 빠르게 만든다."""
+    try:
+        root = etree.fromstring(html, _HTML_PARSER)
+    except (ValueError, etree.LxmlError):
+        # 인코딩 선언이 있는 문자열 등 lxml 이 바로 못 읽는 입력은 기존 방식으로 처리
+        return extract_naver_article_html_bs4(html)
+    if root is None:
+        return None
+
+    article = None
+    # 모바일(mnews) 본문 #dic_area 우선, 없으면 PC(news) 본문 #newsct_article
+    for xpath in _ARTICLE_XPATHS:
+        found = xpath(root)
+        if found:
+            article = found[0]
+            break
+    if article is None:
+        return None
+
+    if article.tag in NON_TEXT_TAGS or any(el.tag in NON_TEXT_TAGS for el in article.iterancestors()):
+        # 본문 노드가 script / template 등의 안에 있는 비정상 페이지는 문자열 타입 규칙이 달라서 기존 방식 사용
+        return extract_naver_article_html_bs4(html)
+
+    parts = []
+    _collect_text(article, False, parts)
+    return "\n".join(text for text in (part.strip() for part in parts) if text)
@@ -0,0 +1,97 @@
+"""업스트림 호스트별 비동기 HTTP 클라이언트 (httpx.AsyncClient)
+
+요청마다 새 연결을 열지 않도록 호스트(scheme + host:port)마다 AsyncClient 하나를 만들어 두고
+HTTP/1.1 keep-alive 커넥션 풀을 재사용한다.
+- 네이버 검색 API(openapi.naver.com) 와 기사 페이지(n.news.naver.com) 가 서로의 풀을 잡아먹지 않는다
+- 풀 크기(max_connections / max_keepalive) 는 호스트마다 따로 적용
+- 리다이렉트로 다른 호스트로 넘어가면 처음 요청한 호스트의 클라이언트가 그대로 따라간다
+- 기사 링크는 아무 호스트나 올 수 있으므로 클라이언트는 최근에 쓴 max_hosts 개만 둔다.
+  밀려난 클라이언트는 진행 중인 요청이 끝나면 닫는다
+FastAPI lifespan 에서 만들고 종료 시 aclose() 로 모든 연결을 닫는다.
+"""
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class HostClients:
+    def __init__(self, max_connections=20, max_keepalive=20, keepalive_expiry=30.0, timeout=15.0, headers=None,
+                 max_hosts=32):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self.headers = dict(headers or {})
+        self.max_hosts = max_hosts
+        self._clients = OrderedDict()  # "scheme://host:port" -> httpx.AsyncClient (오래 안 쓴 순)
+        self._requests = {}  # "scheme://host:port" -> 요청 수
+        self._active = {}  # httpx.AsyncClient -> 진행 중인 요청 수
+        self._retired = []  # 밀려났지만 아직 닫지 않은 클라이언트
+        self._evicted = 0
+
+    def _client(self, url):
+        """url 의 호스트용 클라이언트 (처음이면 만든다. 이벤트 루프 안에서만 호출하므로 잠금 불필요)"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                headers=self.headers,
+                follow_redirects=True,
+            )
+            self._clients[origin] = client
+            while len(self._clients) > self.max_hosts:
+                old_origin, old = self._clients.popitem(last=False)
+                self._requests.pop(old_origin, None)
+                self._retired.append(old)
+                self._evicted += 1
+        else:
+            self._clients.move_to_end(origin)
+        self._requests[origin] = self._requests.get(origin, 0) + 1
+        return client
+
+    async def request(self, method, url, **kwargs):
+        """url 의 호스트 클라이언트로 요청 (본문까지 읽은 httpx.Response)"""
+        client = self._client(url)
+        self._active[client] = self._active.get(client, 0) + 1
+        try:
+            return await client.request(method, url, **kwargs)
+        finally:
+            self._active[client] -= 1
+            if not self._active[client]:
+                del self._active[client]
+            await self._close_retired()
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def _close_retired(self):
+        idle = [client for client in self._retired if client not in self._active]
+        if not idle:
+            return
+        self._retired = [client for client in self._retired if client in self._active]
+        for client in idle:
+            await client.aclose()
+
+    def stats(self):
+        return {
+            "hosts": dict(self._requests),
+            "clients": len(self._clients),
+            "max_hosts": self.max_hosts,
+            "evicted": self._evicted,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive": self.limits.max_keepalive_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+        }
+
+    async def aclose(self):
+        clients = list(self._clients.values()) + self._retired
+        self._clients.clear()
+        self._retired = []
+        for client in clients:
+            await client.aclose()
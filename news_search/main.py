@@ -1,15 +1,86 @@
+import asyncio
+import json
 import os
+import re
+import time
+from contextlib import aclosing, asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, Query
+from urllib.parse import parse_qs, urlsplit, urlunsplit, urlencode
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from cache import TTLCache
+from dedup import NearDuplicateIndex
+from http_clients import HostClients
+# 네이버 뉴스 페이지 전용 파서 (lxml 로 본문 노드만 순회, 기존 BeautifulSoup 방식과 같은 결과)
+from extract import extract_naver_article_html
+
 # 환경변수 로드
 load_dotenv()
 
-app = FastAPI(title="Naver News Search API")
+# 네이버 뉴스 검색 API 주소 (로컬 stub 서버로 벤치마크할 때 변경)
+NAVER_NEWS_API_URL = os.getenv("NAVER_NEWS_API_URL", "https://openapi.naver.com/v1/search/news.json")
+
+# 기사 본문 동시 수집 설정
+# - ARTICLE_FETCH_WORKERS: 동시에 가져올 기사 수 (= 세션 커넥션 풀 크기)
+# - ARTICLE_FETCH_TIMEOUT: 기사 하나의 요청 timeout(초)
+# - SEARCH_DEADLINE: /search 전체 본문 수집 마감 시간(초). 넘으면 그때까지 받은 기사만 반환
+ARTICLE_FETCH_WORKERS = int(os.getenv("ARTICLE_FETCH_WORKERS", "8"))
+ARTICLE_FETCH_TIMEOUT = float(os.getenv("ARTICLE_FETCH_TIMEOUT", "15"))
+SEARCH_DEADLINE = float(os.getenv("SEARCH_DEADLINE", "10"))
+
+# 캐시 설정 (NEWS_CACHE_DB 를 지정하면 메모리 LRU 뒤에 SQLite 캐시를 둔다)
+# - SEARCH_CACHE_TTL: 검색 결과 캐시 유지 시간(초)
+# - ARTICLE_CACHE_TTL: 기사 본문 캐시 유지 시간(초). 만료되면 ETag / Last-Modified 로 재검증
+# - ARTICLE_CACHE_NEGATIVE_TTL: 본문을 못 얻은 링크(네이버 뉴스가 아닌 링크 등)를 다시 시도하지 않을 시간(초)
+NEWS_CACHE_DB = os.getenv("NEWS_CACHE_DB") or None
+NEWS_CACHE_MEMORY_ITEMS = int(os.getenv("NEWS_CACHE_MEMORY_ITEMS", "1024"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+ARTICLE_CACHE_TTL = float(os.getenv("ARTICLE_CACHE_TTL", "86400"))
+ARTICLE_CACHE_NEGATIVE_TTL = float(os.getenv("ARTICLE_CACHE_NEGATIVE_TTL", "600"))
+
+# 서버(비동기 엔드포인트)용 업스트림 HTTP 클라이언트 설정 (호스트마다 keep-alive 커넥션 풀 하나)
+# - HTTP_POOL_MAX_CONNECTIONS: 호스트 하나에 동시에 열 수 있는 최대 연결 수
+# - HTTP_POOL_MAX_KEEPALIVE: 요청이 끝난 뒤에도 열어 두는 최대 연결 수
+# - HTTP_KEEPALIVE_EXPIRY: 쓰지 않는 연결을 닫기까지의 시간(초)
+# - HTTP_POOL_MAX_HOSTS: 클라이언트(커넥션 풀)를 열어 두는 최대 호스트 수 (오래 안 쓴 호스트부터 닫음)
+# - NAVER_API_TIMEOUT: 검색 API 요청 timeout(초)
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_POOL_MAX_HOSTS = int(os.getenv("HTTP_POOL_MAX_HOSTS", "32"))
+NAVER_API_TIMEOUT = float(os.getenv("NAVER_API_TIMEOUT", "20"))
+
+# 중복 기사 묶기 (같은 통신사 기사를 여러 언론사가 다시 낸 경우, dedup.py)
+# - DEDUP_ENABLED: 0 이면 사용 안 함
+# - DEDUP_TITLE_THRESHOLD: 본문을 가져오기 전, 제목 + 요약문 유사도가 이 이상이면 같은 기사로 보고 본문은 한 번만 가져온다
+# - DEDUP_BODY_THRESHOLD: 추출한 본문 유사도가 이 이상이면 같은 기사
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") != "0"
+DEDUP_TITLE_THRESHOLD = float(os.getenv("DEDUP_TITLE_THRESHOLD", "0.9"))
+DEDUP_BODY_THRESHOLD = float(os.getenv("DEDUP_BODY_THRESHOLD", "0.8"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 서버 시작 시 호스트별 클라이언트 묶음을 만들고, 종료 시 열린 연결을 모두 닫는다
+    app.state.http = HostClients(
+        max_connections=HTTP_POOL_MAX_CONNECTIONS,
+        max_keepalive=HTTP_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        timeout=ARTICLE_FETCH_TIMEOUT,
+        headers=HEADERS,
+        max_hosts=HTTP_POOL_MAX_HOSTS,
+    )
+    yield
+    await app.state.http.aclose()
+
+
+app = FastAPI(title="Naver News Search API", lifespan=lifespan)
 
 
 # 응답 모델
@@ -17,11 +88,20 @@ class NewsArticle(BaseModel):
     title: str
     link: str
     body: str
+    # 같은 기사로 묶인 다른 언론사 기사 링크
+    alternative_links: List[str] = []
 
 
 class NewsResponse(BaseModel):
     total: int
     articles: List[NewsArticle]
+    # 마감 시간 안에 본문을 못 가져온 기사 수 (0 보다 크면 일부 결과)
+    timed_out: int = 0
+    partial: bool = False
+    # 중복으로 묶인 기사 수 / 검색 결과 중 비율, 중복이라 본문을 가져오지 않은 기사 수
+    duplicates: int = 0
+    dedup_rate: float = 0.0
+    skipped_fetches: int = 0
 
 
 # User Agent 설정
@@ -31,39 +111,118 @@ UA = (
     "Chrome/123.0 Safari/537.36"
 )
 
+HEADERS = {"User-Agent": UA, "Accept-Language": "ko-KR,ko;q=0.9"}
+
+# 동기 함수(crawl.py 등 스크립트)용 세션
 session = requests.Session()
-session.headers.update({"User-Agent": UA, "Accept-Language": "ko-KR,ko;q=0.9"})
-
-#  네이버 뉴스 페이지 전용 파서
-def extract_naver_article_html(html: str):
-   
-    soup = BeautifulSoup(html, "lxml")
-    # 모바일(mnews)에서 본문
-    article = soup.select_one("#dic_area")
-    # PC(news)에서 본문
-    if not article:
-        article = soup.select_one("#newsct_article")
-    if not article:
-        return None
-    # 불필요 요소 제거
-    for s in article.select(
-        "script, style, .media_end_correction, .copyright, figure"
-    ):
-        s.decompose()
-    for br in article.find_all("br"):
-        br.replace_with("\n")
-    return article.get_text("\n", strip=True)
+session.headers.update(HEADERS)
+# 여러 스레드가 같은 세션을 쓰므로 호스트별 커넥션 풀을 워커 수만큼 키운다 (기본 10개)
+_adapter = HTTPAdapter(pool_connections=ARTICLE_FETCH_WORKERS, pool_maxsize=ARTICLE_FETCH_WORKERS)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+# 기사 본문 수집용 스레드 풀 (요청마다 만들지 않고 공유)
+fetch_executor = ThreadPoolExecutor(max_workers=ARTICLE_FETCH_WORKERS, thread_name_prefix="article")
+
+search_cache = TTLCache("search", SEARCH_CACHE_TTL, NEWS_CACHE_MEMORY_ITEMS, NEWS_CACHE_DB)
+article_cache = TTLCache("article", ARTICLE_CACHE_TTL, NEWS_CACHE_MEMORY_ITEMS, NEWS_CACHE_DB)
+
+_NAVER_ARTICLE_PATH = re.compile(r"/article/(?:\d+/)?(\d+)/(\d+)")
+
+
+def canonical_article_url(url: str) -> str:
+    """
+    같은 기사를 가리키는 여러 형태의 링크를 하나의 캐시 키로 만든다.
+    - 네이버 뉴스: oid(언론사) / aid(기사) 를 뽑아서 n.news.naver.com/mnews/article/{oid}/{aid}
+      (mnews / PC / read.naver?oid=..&aid=.. / ?sid= 등 형태와 무관)
+    - 그 외: 호스트 소문자, fragment 제거, 쿼리 파라미터 정렬
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.endswith("news.naver.com"):
+        match = _NAVER_ARTICLE_PATH.search(parts.path)
+        query = parse_qs(parts.query)
+        if match:
+            oid, aid = match.groups()
+        elif "oid" in query and "aid" in query:
+            oid, aid = query["oid"][0], query["aid"][0]
+        else:
+            oid = aid = None
+        if oid and aid:
+            return f"https://n.news.naver.com/mnews/article/{oid}/{aid}"
+
+    query = urlencode(sorted(parse_qs(parts.query, keep_blank_values=True).items()), doseq=True)
+    return urlunsplit((parts.scheme.lower(), host, parts.path, query, ""))
+
+def _conditional_headers(cached):
+    # 만료된 캐시가 있으면 조건부 요청: 바뀌지 않았으면 304 로 본문 없이 응답이 온다
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+def _revalidated(key, cached):
+    article_cache.touch(key, ARTICLE_CACHE_TTL if cached["body"] else ARTICLE_CACHE_NEGATIVE_TTL)
+    return cached["body"]
+
+
+def _store_article(key, html, final_url, resp_headers):
+    body = _article_body(html, final_url)
+    article_cache.set(
+        key,
+        {"body": body, "etag": resp_headers.get("ETag"), "last_modified": resp_headers.get("Last-Modified")},
+        ttl=ARTICLE_CACHE_TTL if body else ARTICLE_CACHE_NEGATIVE_TTL,
+    )
+    return body
+
 
 # 뉴스 도메인 체크 함수
-def fetch_article_text(url: str, timeout: int = 15):
+def fetch_article_text(url: str, timeout: float = ARTICLE_FETCH_TIMEOUT):
+    key = canonical_article_url(url)
+    cached, fresh = article_cache.get(key)
+    if cached is not None and fresh:
+        return cached["body"]
+
     try:
-        resp = session.get(url, timeout=timeout, allow_redirects=True)
+        resp = session.get(url, timeout=timeout, allow_redirects=True, headers=_conditional_headers(cached))
+        if resp.status_code == 304 and cached is not None:
+            return _revalidated(key, cached)
         resp.raise_for_status()
     except Exception:
-        return None
+        # 네트워크 오류 시 만료된 본문이라도 있으면 사용
+        return cached["body"] if cached is not None else None
+
+    return _store_article(key, resp.text, resp.url, resp.headers)
+
+
+async def fetch_article_text_async(http: HostClients, url: str):
+    """fetch_article_text 의 비동기 버전 (호스트별 keep-alive 풀 사용)"""
+    key = canonical_article_url(url)
+    # 캐시 조회 / 갱신도 SQLite 백엔드면 디스크 I/O 라서 이벤트 루프 밖에서
+    cached, fresh = await asyncio.to_thread(article_cache.get, key)
+    if cached is not None and fresh:
+        return cached["body"]
+
+    try:
+        resp = await http.get(url, headers=_conditional_headers(cached))
+        if resp.status_code == 304 and cached is not None:
+            return await asyncio.to_thread(_revalidated, key, cached)
+        resp.raise_for_status()
+    except Exception:
+        return cached["body"] if cached is not None else None
+
+    # 본문 파싱(lxml) 과 캐시 저장(SQLite) 은 이벤트 루프를 막지 않도록 스레드 풀에서
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        fetch_executor, _store_article, key, resp.text, str(resp.url), resp.headers
+    )
 
-    html = resp.text
-    final_url = resp.url
+
+def _article_body(html, final_url):
 
     # 네이버 뉴스 도메인 체크
     if (
@@ -81,9 +240,53 @@ def fetch_article_text(url: str, timeout: int = 15):
 
 
 # 네이버 뉴스 검색 API 호출 함수
-def search_naver_news(query: str, display: int = 10):
-    """네이버 뉴스 검색 API 호출"""
+def search_naver_news(query: str, display: int = 10, start: int = 1, sort: str = "sim"):
+    """
+    네이버 뉴스 검색 API 호출
+    display 는 최대 100, start 는 최대 1000 (API 제한). sort: "sim"(정확도순) / "date"(날짜순)
+    """
+    cache_key, params, headers = _naver_api_request(query, display, start, sort)
+    cached, fresh = search_cache.get(cache_key)
+    if fresh:
+        return cached
+
+    try:
+        resp = session.get(NAVER_NEWS_API_URL, params=params, headers=headers, timeout=NAVER_API_TIMEOUT)
+        resp.encoding = "utf-8"
+        resp.raise_for_status()
+        result = resp.json()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Naver API error: {str(e)}"
+        ) from e
+
+    search_cache.set(cache_key, result)
+    return result
+
+
+async def search_naver_news_async(http: HostClients, query: str, display: int = 10, start: int = 1, sort: str = "sim"):
+    """search_naver_news 의 비동기 버전 (호스트별 keep-alive 풀 사용)"""
+    cache_key, params, headers = _naver_api_request(query, display, start, sort)
+    cached, fresh = await asyncio.to_thread(search_cache.get, cache_key)
+    if fresh:
+        return cached
+
+    try:
+        resp = await http.get(NAVER_NEWS_API_URL, params=params, headers=headers, timeout=NAVER_API_TIMEOUT)
+        resp.encoding = "utf-8"
+        resp.raise_for_status()
+        result = resp.json()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Naver API error: {str(e)}"
+        ) from e
+
+    await asyncio.to_thread(search_cache.set, cache_key, result)
+    return result
 
+
+def _naver_api_request(query, display, start, sort):
+    """검색 API 요청의 (캐시 키, 쿼리 파라미터, 인증 헤더)"""
     api_key    = os.getenv("NAVER_API_KEY")  # Client ID 값
     secret_key = os.getenv("NAVER_SECRET_KEY")   # Client Secret 값 입력
 
@@ -93,46 +296,185 @@ def search_naver_news(query: str, display: int = 10):
             detail="NAVER_API_KEY or NAVER_SECRET_KEY not found in environment variables",
         )
 
-    url = "https://openapi.naver.com/v1/search/news.json"
-
     params = {
         "query": query,
         "display": display,
-        "start": 1,
-        "sort": "sim",
+        "start": start,
+        "sort": sort,
     }
 
+    # 같은 (검색어, 개수, 정렬, 시작 위치) 검색은 SEARCH_CACHE_TTL 동안 API 를 다시 호출하지 않는다
+    cache_key = f"{query}\x00{display}\x00{sort}\x00{start}"
+
     headers = {
         "X-Naver-Client-Id": api_key,
         "X-Naver-Client-Secret": secret_key,
     }
-
+    return cache_key, params, headers
+
+
+def iter_articles(items: list, deadline: float = SEARCH_DEADLINE):
+    """
+    검색 결과 items 의 기사 본문을 스레드 풀에서 동시에 가져오면서,
+    끝나는 순서대로 (검색 결과 순번, item, 본문 또는 None) 을 yield 한다.
+    deadline(초)이 지나면 나머지는 기다리지 않는다. (못 끝난 개수 = len(items) - yield 된 개수)
+    """
+    futures = {
+        fetch_executor.submit(fetch_article_text, item.get("link", "")): index
+        for index, item in enumerate(items)
+    }
     try:
-        resp = requests.get(url, params=params, headers=headers, timeout=20)
-        resp.encoding = "utf-8"
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Naver API error: {str(e)}"
-        )
+        for future in as_completed(futures, timeout=deadline):
+            index = futures[future]
+            yield index, items[index], future.result()
+    except FuturesTimeout:
+        pass
+    finally:
+        # 아직 시작하지 않은 요청은 취소 (이미 실행 중인 요청은 각자의 timeout 으로 끝난다)
+        # 스트리밍 중 클라이언트가 끊어도 여기로 온다
+        for future in futures:
+            future.cancel()
+
+
+def fetch_articles(items: list, deadline: float = SEARCH_DEADLINE):
+    """
+    iter_articles 결과를 검색 결과 순서대로 모은다.
+    반환: ([(item, 본문 또는 None), ...] 검색 결과 순서 유지, 마감 시간 안에 못 끝난 개수)
+    """
+    results = [(item, None) for item in items]
+    finished = 0
+    for index, item, text in iter_articles(items, deadline):
+        results[index] = (item, text)
+        finished += 1
+    return results, len(items) - finished
+
+
+async def iter_articles_async(http: HostClients, items: list, deadline: float = SEARCH_DEADLINE, indexes=None,
+                              fallbacks=None):
+    """
+    iter_articles 의 비동기 버전. 기사마다 task 를 만들어 동시에 가져오고 끝나는 순서대로 yield 한다.
+    deadline(초)이 지나면 남은 task 는 취소한다. indexes 를 주면 그 순번의 기사만 가져온다.
+    fallbacks({순번: [대신 가져올 순번, ...]}) 를 주면 본문을 못 가져온 기사 대신 다음 순번을 같은 마감 시간 안에
+    가져와서, 가져온 기사의 순번으로 yield 한다 (indexes 의 기사 하나당 yield 는 한 번).
+    가져오기 시작한 순번은 fallbacks 의 리스트에서 빠진다 (끝난 뒤 남은 순번 = 가져오지 않은 기사).
+    """
+    if indexes is None:
+        indexes = range(len(items))
+    fallbacks = fallbacks or {}
+
+    def fetch(index):
+        return asyncio.ensure_future(fetch_article_text_async(http, items[index].get("link", "")))
+
+    tasks = {fetch(index): index for index in indexes}
+    roots = {index: index for index in indexes}  # 대신 가져오는 순번 -> 처음 요청한 순번
+    loop = asyncio.get_running_loop()
+    end = loop.time() + deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = end - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = tasks[task]
+                text = task.result()
+                rest = fallbacks.get(roots[index])
+                if not text and rest:
+                    next_index = rest.pop(0)
+                    roots[next_index] = roots[index]
+                    retry = fetch(next_index)
+                    tasks[retry] = next_index
+                    pending.add(retry)
+                    continue
+                yield index, items[index], text
+    finally:
+        # 마감 시간 초과 / 스트리밍 중 클라이언트 연결 끊김: 남은 요청 취소
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_articles_async(http: HostClients, items: list, deadline: float = SEARCH_DEADLINE, indexes=None,
+                               fallbacks=None):
+    """fetch_articles 의 비동기 버전. 반환 형식 같음 (가져오지 않은 기사의 본문은 None, fallbacks 는 iter_articles_async)"""
+    results = [(item, None) for item in items]
+    finished = 0
+    async with aclosing(iter_articles_async(http, items, deadline, indexes, fallbacks)) as articles:
+        async for index, item, text in articles:
+            results[index] = (item, text)
+            finished += 1
+    return results, len(items if indexes is None else indexes) - finished
+
+
+def _fetch_priority(items: list, i: int):
+    # 본문을 추출할 수 있는 네이버 뉴스 링크 먼저, 그 안에서는 검색 결과 순서
+    return "news.naver.com" not in items[i].get("link", ""), i
+
+
+def prefetch_duplicates(items: list):
+    """
+    본문을 가져오기 전 1차 중복 묶기 (제목 + 요약문 유사도).
+    반환: (본문을 가져올 검색 결과 순번 리스트, {중복 순번: 대표 순번})
+    본문을 추출할 수 있는 네이버 뉴스 링크를 먼저 넣어서 대표가 되도록 한다.
+    """
+    if not DEDUP_ENABLED:
+        return list(range(len(items))), {}
+
+    index = NearDuplicateIndex(DEDUP_TITLE_THRESHOLD)
+    order = sorted(range(len(items)), key=lambda i: _fetch_priority(items, i))
+    duplicates = {}
+    for i in order:
+        rep = index.add(i, f"{items[i].get('title', '')} {items[i].get('description', '')}")
+        if rep is not None:
+            duplicates[i] = rep
+    return [i for i in range(len(items)) if i not in duplicates], duplicates
+
+
+def duplicate_fallbacks(items: list, duplicates: dict) -> dict:
+    """{대표 순번: [대표 본문을 못 가져왔을 때 대신 가져올 중복 순번, ...]} (prefetch_duplicates 와 같은 우선순위)"""
+    fallbacks = {}
+    for i in sorted(duplicates, key=lambda i: _fetch_priority(items, i)):
+        fallbacks.setdefault(duplicates[i], []).append(i)
+    return fallbacks
+
+
+def promote_duplicate(duplicates: dict, index: int) -> None:
+    """대표 대신 본문을 가져온 중복 기사(index)를 그 묶음의 대표로 바꾼다 (본문을 못 가져온 대표는 중복으로)"""
+    old = duplicates.pop(index)
+    for i, rep in duplicates.items():
+        if rep == old:
+            duplicates[i] = index
+    duplicates[old] = index
+
+
+def _dedup_stats(items, duplicates, fallbacks):
+    # 가져오지 않은 본문 = 대표를 대신하지 않아도 돼서 fallbacks 에 남은 중복 기사
+    return {
+        "duplicates": len(duplicates),
+        "dedup_rate": round(len(duplicates) / len(items), 4) if items else 0.0,
+        "skipped_fetches": sum(len(rest) for rest in fallbacks.values()),
+    }
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Naver News Search API"}
 
 
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check(request: Request):
+    return {
+        "status": "healthy",
+        "cache": {"search": search_cache.stats(), "article": article_cache.stats()},
+        "http": request.app.state.http.stats(),
+    }
 
 
 ## 네이버 뉴스 검색 및 본문 추출 api
 @app.get("/search", response_model=NewsResponse)
-def search_news(query, display):
-
-    search_result = search_naver_news(query, display)
+async def search_news(request: Request, query, display):
+    http = request.app.state.http
+    search_result = await search_naver_news_async(http, query, display)
 
     if "items" not in search_result:
         raise HTTPException(
@@ -145,23 +487,132 @@ def search_news(query, display):
     
     news_list = [] # 네이버 뉴스 링크 담을 리스트
 
-    for item in search_result["items"]:
-        link = item.get("link", "")
+    items = search_result["items"]
+    # 제목 + 요약문이 같은 기사(중복)는 본문을 한 번만 가져온다
+    fetch_indexes, duplicates = prefetch_duplicates(items)
 
-        text = fetch_article_text(link)
+    # 기사 본문은 동시에 가져오고, 마감 시간을 넘긴 기사는 빼고 반환
+    # (대표 기사 본문을 못 가져오면 같은 묶음의 다음 기사를 대신 가져온다)
+    fallbacks = duplicate_fallbacks(items, duplicates)
+    fetched, timed_out = await fetch_articles_async(http, items, indexes=fetch_indexes, fallbacks=fallbacks)
 
+    body_index = NearDuplicateIndex(DEDUP_BODY_THRESHOLD)
+    articles = {}  # 검색 결과 순번 -> NewsArticle (대표 기사만)
+    for index, (item, text) in enumerate(fetched):
         if not text:
             continue
+        if index in duplicates:
+            promote_duplicate(duplicates, index)
+        # 본문이 거의 같은 기사는 검색 순위가 높은 기사 하나만 남긴다
+        rep = body_index.add(index, text) if DEDUP_ENABLED else None
+        if rep is not None:
+            duplicates[index] = rep
+            continue
+
+        articles[index] = NewsArticle(
+            title=item.get("title", ""),
+            link=item.get("link", ""),
+            body=text
+        )
+        news_list.append(articles[index])
+
+    # 중복 기사는 대표 기사의 다른 링크로 표시
+    for index in sorted(duplicates):
+        rep = duplicates[index]
+        while rep in duplicates:
+            rep = duplicates[rep]
+        if rep in articles:
+            articles[rep].alternative_links.append(items[index].get("link", ""))
+
+    return {
+        "total": len(news_list),
+        "articles": news_list,
+        "timed_out": timed_out,
+        "partial": timed_out > 0,
+        **_dedup_stats(items, duplicates, fallbacks),
+    }
 
-        news_list.append(
-            NewsArticle(
-                title=item.get("title", ""),
-                link=link,
-                body=text
-            )
+
+def _ndjson(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+## 뉴스 검색 결과를 본문이 추출되는 대로 하나씩 보내는 스트리밍 api (NDJSON)
+@app.get("/search/stream")
+async def search_news_stream(request: Request, query, display):
+    """
+    /search 와 같은 검색을 하되, 기사 본문이 추출되는 대로 한 줄씩 NDJSON 으로 내보냅니다.
+    - 처음: {"type": "start", "query": ..., "requested": n}
+    - 기사: {"type": "article", "index": n, "title": ..., "link": ..., "body": ..., "alternative_links": [...]}
+      (끝나는 순서대로. index 는 검색 결과 순번이라 정렬하면 /search 와 같은 순서)
+    - 중복: {"type": "duplicate", "index": n, "duplicate_of": 대표 기사 index, "link": ...}
+      (본문이 먼저 보낸 기사와 거의 같은 기사. 먼저 끝난 기사가 대표가 된다)
+    - 마지막: {"type": "summary", "total": n, "timed_out": n, "partial": bool,
+              "duplicates": n, "dedup_rate": x, "skipped_fetches": n, "elapsed_ms": n}
+    """
+    # 검색 API 오류는 스트리밍 시작 전에 HTTP 오류로 응답
+    http = request.app.state.http
+    search_result = await search_naver_news_async(http, query, display)
+
+    if "items" not in search_result:
+        raise HTTPException(
+            status_code=500, detail="Invalid response from Naver API"
         )
 
-    return {"total": len(news_list), "articles": news_list}
+    items = search_result["items"]
+    fetch_indexes, duplicates = prefetch_duplicates(items)
+
+    def prefetch_links(rep):
+        return [items[i].get("link", "") for i in sorted(duplicates) if duplicates[i] == rep]
+
+    async def generate():
+        start = time.perf_counter()
+        yield _ndjson({"type": "start", "query": query, "requested": len(items)})
+
+        total = 0
+        finished = 0
+        body_index = NearDuplicateIndex(DEDUP_BODY_THRESHOLD)
+        fallbacks = duplicate_fallbacks(items, duplicates)
+        async with aclosing(iter_articles_async(http, items, indexes=fetch_indexes, fallbacks=fallbacks)) as articles:
+            async for index, item, text in articles:
+                finished += 1
+                if not text:
+                    continue
+                if index in duplicates:
+                    # 대표 기사 본문을 못 가져와서 같은 묶음의 다른 기사를 대신 가져온 경우
+                    promote_duplicate(duplicates, index)
+                rep = body_index.add(index, text) if DEDUP_ENABLED else None
+                if rep is not None:
+                    # 이 기사와 1차(제목)에서 묶인 기사도 함께 대표 기사의 다른 링크로 보낸다
+                    for dup_index in [index] + [i for i in sorted(duplicates) if duplicates[i] == index]:
+                        duplicates[dup_index] = rep
+                        yield _ndjson({
+                            "type": "duplicate",
+                            "index": dup_index,
+                            "duplicate_of": rep,
+                            "link": items[dup_index].get("link", ""),
+                        })
+                    continue
+                total += 1
+                article = NewsArticle(
+                    title=item.get("title", ""),
+                    link=item.get("link", ""),
+                    body=text,
+                    alternative_links=prefetch_links(index),
+                )
+                yield _ndjson({"type": "article", "index": index, **article.model_dump()})
+
+        timed_out = len(fetch_indexes) - finished
+        yield _ndjson({
+            "type": "summary",
+            "total": total,
+            "timed_out": timed_out,
+            "partial": timed_out > 0,
+            **_dedup_stats(items, duplicates, fallbacks),
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        })
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,201 @@
+"""음성 검색어 STT (무음 구간 분할 + 동시 변환 + 캐시)
+
+녹음 전체를 한 번에 Whisper 로 보내면 긴 녹음은 응답이 늦고, Streamlit 은 다시 실행(rerun)될 때마다 같은 녹음을 또 변환했다.
+1) 분할: WAV 를 FRAME_MS 단위 RMS(dBFS) 로 보고, STT_SILENCE_DB 보다 조용한 구간이 STT_MIN_SILENCE_MS 이상이면
+   그 가운데를 자른다. 조각은 STT_MIN_CHUNK_SECONDS 이상, STT_MAX_CHUNK_SECONDS 이하
+   (무음이 없으면 최대 길이 안에서 가장 조용한 곳을 자른다). 전부 무음인 조각은 보내지 않는다
+2) 변환: 조각을 동시에(STT_WORKERS) 변환하고, 끝날 때마다 그때까지의 결과를 순서대로 이어서 yield
+3) 캐시: 녹음 전체 / 조각마다 (모델, 오디오 바이트) 해시를 키로 결과를 저장 (cache.TTLCache)
+WAV 가 아닌 파일은 나누지 않고 한 번에 변환한다.
+"""
+import hashlib
+import io
+import os
+import threading
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+STT_MODEL = os.getenv("STT_MODEL", "whisper-1")
+# 조각 동시 변환 수
+STT_WORKERS = int(os.getenv("STT_WORKERS", "4"))
+# 이 dBFS 보다 조용하면 무음
+STT_SILENCE_DB = float(os.getenv("STT_SILENCE_DB", "-40"))
+# 이 길이(ms) 이상 무음이면 자를 수 있는 지점
+STT_MIN_SILENCE_MS = int(os.getenv("STT_MIN_SILENCE_MS", "400"))
+STT_MIN_CHUNK_SECONDS = float(os.getenv("STT_MIN_CHUNK_SECONDS", "2"))
+STT_MAX_CHUNK_SECONDS = float(os.getenv("STT_MAX_CHUNK_SECONDS", "30"))
+
+FRAME_MS = 30
+_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def audio_key(audio_bytes: bytes, model: str = STT_MODEL) -> str:
+    return hashlib.sha256(model.encode("utf-8") + b"\x00" + audio_bytes).hexdigest()
+
+
+def _frame_db(samples, frame_len):
+    """프레임별 RMS dBFS (samples: -1 ~ 1 float, 모노)"""
+    count = len(samples) // frame_len
+    frames = samples[:count * frame_len].reshape(count, frame_len)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def _read_wav(audio_bytes):
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+        params = wav.getparams()
+        raw = wav.readframes(params.nframes)
+    dtype = _DTYPES.get(params.sampwidth)
+    if dtype is None:
+        raise ValueError(f"지원하지 않는 샘플 크기: {params.sampwidth}")
+    data = np.frombuffer(raw, dtype=dtype).reshape(-1, params.nchannels).astype(np.float64)
+    if params.sampwidth == 1:
+        data = data - 128
+    mono = data.mean(axis=1) / float(2 ** (8 * params.sampwidth - 1))
+    return params, raw, mono
+
+
+def _write_wav(params, raw):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(params.nchannels)
+        wav.setsampwidth(params.sampwidth)
+        wav.setframerate(params.framerate)
+        wav.writeframes(raw)
+    return buffer.getvalue()
+
+
+def split_on_silence(audio_bytes, silence_db=STT_SILENCE_DB, min_silence_ms=STT_MIN_SILENCE_MS,
+                     min_chunk_seconds=STT_MIN_CHUNK_SECONDS, max_chunk_seconds=STT_MAX_CHUNK_SECONDS):
+    """
+    WAV 바이트를 무음 구간에서 나눈다.
+    반환: [{"start": 초, "end": 초, "wav": 조각 WAV 바이트}] (전부 무음인 조각은 제외)
+    WAV 가 아니면 ValueError / wave.Error
+    """
+    params, raw, mono = _read_wav(audio_bytes)
+    rate = params.framerate
+    frame_len = max(1, rate * FRAME_MS // 1000)
+    db = _frame_db(mono, frame_len)
+    total_frames = len(db)
+    if total_frames == 0:
+        return []
+
+    silent = db < silence_db
+    min_silence = max(1, min_silence_ms // FRAME_MS)
+    min_chunk = max(1, int(min_chunk_seconds * 1000 // FRAME_MS))
+    max_chunk = max(min_chunk + 1, int(max_chunk_seconds * 1000 // FRAME_MS))
+
+    # 자를 수 있는 지점: 충분히 긴 무음 구간의 가운데
+    candidates = []
+    run_start = None
+    for i, is_silent in enumerate(list(silent) + [False]):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_silence:
+                candidates.append((run_start + i) // 2)
+            run_start = None
+
+    cuts = []
+    start = 0
+    for candidate in candidates + [total_frames]:
+        # 최대 길이를 넘으면 그 안에서 가장 조용한 프레임에서 자른다
+        while candidate - start > max_chunk:
+            window = db[start + min_chunk:start + max_chunk]
+            cut = start + min_chunk + int(np.argmin(window))
+            cuts.append(cut)
+            start = cut
+        if candidate - start >= min_chunk and candidate < total_frames:
+            cuts.append(candidate)
+            start = candidate
+
+    bytes_per_frame = params.sampwidth * params.nchannels
+    segments = []
+    bounds = [0] + cuts + [total_frames]
+    for begin, end in zip(bounds, bounds[1:]):
+        if end <= begin or silent[begin:end].all():
+            continue
+        sample_begin = begin * frame_len
+        # 마지막 조각은 프레임 단위로 잘린 끝부분까지 포함
+        sample_end = params.nframes if end == total_frames else end * frame_len
+        segments.append({
+            "start": sample_begin / rate,
+            "end": sample_end / rate,
+            "wav": _write_wav(params, raw[sample_begin * bytes_per_frame:sample_end * bytes_per_frame]),
+        })
+    return segments
+
+
+class ChunkedTranscriber:
+    def __init__(self, client, model=STT_MODEL, workers=STT_WORKERS, cache=None):
+        self.client = client
+        self.model = model
+        self.workers = workers
+        self.cache = cache
+        self._lock = threading.Lock()
+        self.stats = {"segments": 0, "requests": 0, "cache_hits": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def cached(self, audio_bytes):
+        """녹음 전체의 캐시된 변환 결과 (없으면 None)"""
+        if self.cache is None:
+            return None
+        value, fresh = self.cache.get(audio_key(audio_bytes, self.model))
+        return value if fresh else None
+
+    def stream(self, audio_bytes, filename="audio.wav"):
+        """
+        변환하면서 그때까지의 결과(조각 순서대로 이은 문자열)를 yield 한다. 마지막 yield 가 전체 결과.
+        """
+        cached = self.cached(audio_bytes)
+        if cached is not None:
+            self._count("cache_hits")
+            yield cached
+            return
+
+        try:
+            segments = [segment["wav"] for segment in split_on_silence(audio_bytes)]
+            names = [f"segment-{i}.wav" for i in range(len(segments))]
+        except (ValueError, EOFError, wave.Error):
+            # WAV 가 아닌 파일 (mp3, m4a 등) 은 나누지 않는다
+            segments, names = [audio_bytes], [filename]
+        self.stats["segments"] = len(segments)
+
+        texts = [None] * len(segments)
+        with ThreadPoolExecutor(max_workers=max(1, self.workers), thread_name_prefix="stt") as pool:
+            futures = {
+                pool.submit(self._transcribe, segment, name): i
+                for i, (segment, name) in enumerate(zip(segments, names))
+            }
+            for future in as_completed(futures):
+                texts[futures[future]] = future.result()
+                yield self._join(texts)
+
+        text = self._join(texts)
+        if self.cache is not None:
+            self.cache.set(audio_key(audio_bytes, self.model), text)
+        if not segments:
+            yield text
+
+    def _join(self, texts):
+        return " ".join(text.strip() for text in texts if text and text.strip())
+
+    def _transcribe(self, audio_bytes, name):
+        key = audio_key(audio_bytes, self.model)
+        if self.cache is not None:
+            value, fresh = self.cache.get(key)
+            if fresh:
+                self._count("cache_hits")
+                return value
+
+        self._count("requests")
+        transcription = self.client.audio.transcriptions.create(model=self.model, file=(name, audio_bytes))
+        text = transcription.text or ""
+        if self.cache is not None:
+            self.cache.set(key, text)
+        return text
@@ -0,0 +1,370 @@
+"""뉴스 기사 AI 분석 (토큰 예산 + map-reduce 요약)
+
+기존에는 기사 목록 전체를 들여쓰기 JSON 으로 만들어 메시지 하나에 넣었기 때문에
+기사가 많거나 길면 컨텍스트 한도를 넘거나, 공백 / 반복 문구에 토큰을 낭비했다.
+1) 압축 직렬화: "[기사 n] 제목 (링크)" + 본문 줄. 공백 정리, 저작권 문구 / 여러 기사에 반복되는 줄 제거
+2) 토큰 계산: 기사마다 토큰 수를 센다 (tiktoken 이 있으면 정확히, 없으면 보수적으로 추정)
+3) 전체가 SUMMARY_MAX_INPUT_TOKENS 안에 들어가면 기존처럼 한 번에 분석 (스트리밍)
+4) 넘으면 map-reduce
+   - map: 기사를 SUMMARY_CHUNK_TOKENS 단위 조각으로 나눠서 조각마다 요약 (동시에 SUMMARY_MAP_WORKERS 개)
+   - reduce: 기사별 요약을 모아 사용자 프롬프트로 최종 분석 (스트리밍).
+     요약을 모아도 예산을 넘으면 요약끼리 한 번 더 합친다
+5) (선택) 응답 캐시: (모델, 메시지 전체, max_tokens) 해시를 키로 응답을 저장한다 (cache.TTLCache)
+   map 단계 입력은 기사 본문 조각뿐이다 (사용자 프롬프트, "[기사 n]" 번호 / 링크, 다른 기사와 겹치는 줄 제거와 무관)
+   -> 같은 기사면 프롬프트나 기사 순서가 바뀌어도 기사 요약은 캐시에서 재사용하고 reduce 1번만 새로 요청한다.
+   예산 안에 들어가는 기사도 한 번 분석한 기사 묶음에 프롬프트만 바꿔 다시 분석하면 map-reduce 로 바꿔서
+   기사 요약을 만들어 두고, 그 뒤로는 (기사 요약이 모두 캐시에 있으면) reduce 1번만 요청한다
+"""
+import functools
+import hashlib
+import html
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+# 요청 하나에 넣을 최대 입력 토큰 수 (프롬프트 + 기사). 넘으면 map-reduce
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", "12000"))
+# map 단계 조각 하나의 최대 토큰 수
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+# map 단계 요약 하나의 최대 출력 토큰 수
+SUMMARY_MAP_MAX_TOKENS = int(os.getenv("SUMMARY_MAP_MAX_TOKENS", "400"))
+# map 단계 동시 요청 수
+SUMMARY_MAP_WORKERS = int(os.getenv("SUMMARY_MAP_WORKERS", "4"))
+
+# 메시지 하나당 역할 / 구분자 토큰 (대략값)
+MESSAGE_OVERHEAD_TOKENS = 4
+# 같은 요약을 몇 번까지 다시 합칠지 (요약이 줄지 않는 경우 무한 반복 방지)
+MAX_COLLAPSE_ROUNDS = 3
+
+# map / 합치기 단계 프롬프트에는 사용자 프롬프트를 넣지 않는다 (프롬프트가 바뀌어도 요약 캐시 재사용)
+MAP_PROMPT = (
+    "다음은 뉴스 기사(또는 기사의 일부)입니다. 이후 여러 가지 분석 요청에 쓰일 수 있도록 "
+    "사실, 수치, 인물, 날짜, 인용을 빠짐없이 한국어로 간결하게 요약하세요. 기사에 없는 내용은 쓰지 마세요."
+)
+COLLAPSE_PROMPT = (
+    "다음은 여러 뉴스 기사의 요약입니다. 사실, 수치, 인물, 날짜를 잃지 않도록 "
+    "기사 번호를 유지하면서 하나의 요약으로 합치세요."
+)
+
+# 기사마다 붙는 저작권 / 기자 정보 같은 상투 문구
+_BOILERPLATE = re.compile(r"무단\s*전재|재배포\s*금지|copyright|all rights reserved|[ⓒ©]", re.IGNORECASE)
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_TAG = re.compile(r"<.*?>")
+_SPACES = re.compile(r"[ \t\u00a0\u200b]+")
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = OPENAI_MODEL) -> int:
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text))
+    # tiktoken 이 없으면 UTF-8 3바이트당 1토큰으로 추정 (한글 1자 = 1토큰, 영어는 실제보다 조금 많게)
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+def count_message_tokens(messages, model: str = OPENAI_MODEL) -> int:
+    return 3 + sum(MESSAGE_OVERHEAD_TOKENS + count_tokens(m["content"], model) for m in messages)
+
+
+def _clean_line(line):
+    return _SPACES.sub(" ", line).strip()
+
+
+def _is_boilerplate(line):
+    # 짧은 줄에 저작권 문구나 이메일(기자 정보)만 있는 경우
+    return len(line) < 80 and bool(_BOILERPLATE.search(line) or _EMAIL.search(line))
+
+
+def compact_articles(news_list):
+    """
+    기사 목록을 압축 직렬화용 [{"header": "[기사 n] 제목 (링크)", "lines": [본문 줄, ...], "body_lines": [...]}] 로 만든다.
+    빈 줄 / 상투 문구는 빼고, 여러 기사에 똑같이 나오는 줄은 처음 나온 기사의 lines 에만 남긴다
+    (통신사 기사를 그대로 옮긴 기사들도 사실 문장이 한 번은 남도록). body_lines 는 겹치는 줄도 남긴 기사 자체 본문
+    """
+    articles = []
+    for number, article in enumerate(news_list, start=1):
+        title = _clean_line(_TAG.sub("", html.unescape(article.get("title", ""))))
+        lines = [_clean_line(line) for line in (article.get("body") or "").splitlines()]
+        lines = [line for line in lines if line and not _is_boilerplate(line)]
+        link = article.get("link", "")
+        header = f"[기사 {number}] {title}" + (f" ({link})" if link else "")
+        articles.append({"header": header, "lines": lines, "body_lines": lines})
+
+    # 앞 기사에 이미 나온 줄 (언론사 안내문, 같은 통신사 원문 등)
+    seen = set()
+    for article in articles:
+        lines = [line for line in article["lines"] if line not in seen]
+        seen.update(article["lines"])
+        article["lines"] = lines
+    return articles
+
+
+def serialize_articles(articles):
+    return "\n\n".join(article["header"] + "\n" + "\n".join(article["lines"]) for article in articles)
+
+
+def _split_long_line(line, max_tokens, model):
+    tokens = count_tokens(line, model)
+    if tokens <= max_tokens:
+        return [line]
+    step = max(1, len(line) * max_tokens // tokens)
+    return [line[i:i + step] for i in range(0, len(line), step)]
+
+
+def split_article(article, max_tokens, model: str = OPENAI_MODEL):
+    """
+    기사 하나의 본문(body_lines)을 max_tokens 이하 조각으로 나눈다. 반환: [(조각 헤더, 조각 본문)]
+    조각 본문에는 헤더를 넣지 않는다 (map 요약 캐시 키가 기사 번호 / 순서와 무관하게 본문만으로 정해지도록)
+    """
+    header = article["header"]
+    budget = max(1, max_tokens - 8)
+
+    chunks, current, current_tokens = [], [], 0
+    for line in article["body_lines"]:
+        for piece in _split_long_line(line, budget, model):
+            piece_tokens = count_tokens(piece, model) + 1
+            if current and current_tokens + piece_tokens > budget:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current or not chunks:
+        chunks.append(current)
+
+    if len(chunks) == 1:
+        return [(header, "\n".join(chunks[0]))]
+    return [(f"{header} ({i}/{len(chunks)})", "\n".join(lines)) for i, lines in enumerate(chunks, start=1)]
+
+
+class MapReduceSummarizer:
+    def __init__(self, client, model=OPENAI_MODEL, max_input_tokens=SUMMARY_MAX_INPUT_TOKENS,
+                 chunk_tokens=SUMMARY_CHUNK_TOKENS, map_max_tokens=SUMMARY_MAP_MAX_TOKENS,
+                 map_workers=SUMMARY_MAP_WORKERS, cache=None):
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.max_input_tokens = max_input_tokens
+        self.chunk_tokens = min(chunk_tokens, max_input_tokens)
+        self.map_max_tokens = map_max_tokens
+        self.map_workers = map_workers
+
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "map_requests": 0,
+            "reduce_requests": 0,
+            "input_tokens": 0,  # 보낸 메시지의 토큰 수 (count_message_tokens 기준)
+            "usage_prompt_tokens": 0,  # API 응답 usage 기준
+            "usage_completion_tokens": 0,
+            "cache_hits": 0,  # 캐시에서 가져온 응답 수
+            "saved_tokens": 0,  # 캐시 hit 로 아낀 토큰 수 (처음 요청 때의 입력 + 출력)
+            "saved_seconds": 0.0,  # 캐시 hit 로 아낀 시간 (처음 요청 때의 소요시간)
+        }
+
+    def plan(self, news_list, prompt):
+        """
+        분석 계획. 반환: {"mode": "single" / "map_reduce", "articles": n, "input_tokens": n,
+                         "article_tokens": [기사별 토큰 수], "chunks": [(조각 헤더, map 조각 본문), ...],
+                         "cached_chunks": 캐시에 요약이 있는 조각 수, "messages": 한 번에 분석할 때의 메시지}
+        예산 안에 들어가도 같은 기사 묶음을 다른 프롬프트로 이미 분석했거나 기사 요약이 모두 캐시에 있으면 map_reduce
+        (같은 프롬프트의 분석 결과가 캐시에 있으면 그대로 single)
+        """
+        articles = compact_articles(news_list)
+        article_tokens = [count_tokens(serialize_articles([a]), self.model) for a in articles]
+        messages = self._messages(prompt, serialize_articles(articles))
+        input_tokens = count_message_tokens(messages, self.model)
+
+        chunks = [chunk for article in articles for chunk in split_article(article, self.chunk_tokens, self.model)]
+        cached_chunks = sum(self._peek(self._map_key(text)) for _, text in chunks)
+        articles_key = self._articles_key(articles)
+        if input_tokens > self.max_input_tokens:
+            mode = "map_reduce"
+        elif self._peek(self._cache_key(messages)):
+            mode = "single"
+        elif cached_chunks == len(chunks) or self._peek(articles_key):
+            # 프롬프트만 바뀐 경우: 기사 요약을 재사용하고 (없으면 이번에 만들어 두고) reduce 만 새로 요청
+            mode = "map_reduce"
+        else:
+            mode = "single"
+        return {
+            "mode": mode,
+            "articles": len(articles),
+            "input_tokens": input_tokens,
+            "article_tokens": article_tokens,
+            "chunks": chunks if mode == "map_reduce" else [],
+            "cached_chunks": cached_chunks if mode == "map_reduce" else 0,
+            "messages": messages,
+            "articles_key": articles_key,
+        }
+
+    def stream(self, news_list, prompt, plan=None):
+        """분석 결과를 조각(str)으로 yield 한다. (st.write_stream 에 그대로 넘길 수 있다)"""
+        plan = plan or self.plan(news_list, prompt)
+        if plan["mode"] == "single":
+            yield from self._stream_chat(plan["messages"], kind="reduce")
+            # 같은 기사 묶음을 다른 프롬프트로 다시 분석하면 기사 요약을 만들어 재사용하도록 표시
+            if self.cache is not None:
+                self.cache.set(plan["articles_key"], True)
+            return
+
+        summaries = self._map(plan["chunks"], MAP_PROMPT)
+        # 요약을 모아도 예산을 넘으면 요약끼리 합친다
+        for _ in range(MAX_COLLAPSE_ROUNDS):
+            messages = self._messages(prompt, "\n\n".join(summaries))
+            if count_message_tokens(messages, self.model) <= self.max_input_tokens:
+                break
+            groups = self._group(summaries)
+            if len(groups) >= len(summaries):
+                break
+            summaries = self._map([(None, group) for group in groups], COLLAPSE_PROMPT)
+        messages = self._messages(prompt, "\n\n".join(self._fit(prompt, summaries)))
+        yield from self._stream_chat(messages, kind="reduce")
+
+    # ---------------- 내부 ----------------
+    def _messages(self, system, user):
+        return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+    def _group(self, texts):
+        # chunk_tokens 를 넘지 않도록 요약들을 순서대로 묶는다
+        groups, current, current_tokens = [], [], 0
+        for text in texts:
+            tokens = count_tokens(text, self.model)
+            if current and current_tokens + tokens > self.chunk_tokens:
+                groups.append("\n\n".join(current))
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            groups.append("\n\n".join(current))
+        return groups
+
+    def _fit(self, prompt, summaries):
+        # 합치기로도 예산 안에 못 들어가면 (요약이 줄지 않는 경우) 요약마다 같은 몫만 남기고 자른다
+        share = (self.max_input_tokens - count_message_tokens(self._messages(prompt, ""), self.model)) // len(summaries)
+        while share > 0:
+            fitted = [_split_long_line(summary, share, self.model)[0] for summary in summaries]
+            if count_message_tokens(self._messages(prompt, "\n\n".join(fitted)), self.model) <= self.max_input_tokens:
+                return fitted
+            share = share * 9 // 10
+        return summaries[:1]
+
+    def _map(self, chunks, system):
+        """chunks: [(헤더 또는 None, 텍스트)] 를 하나씩 요약한다"""
+        def summarize(chunk):
+            header, text = chunk
+            if not text:
+                return header
+            summary = self._chat(self._messages(system, text), max_tokens=self.map_max_tokens)
+            # 조각 요약 앞에 기사 헤더를 붙여서 reduce 단계에서 출처를 알 수 있게 한다
+            return f"{header}\n{summary}" if header else summary
+
+        with ThreadPoolExecutor(max_workers=self.map_workers, thread_name_prefix="summary-map") as pool:
+            return list(pool.map(summarize, chunks))
+
+    def _record(self, messages, kind):
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[f"{kind}_requests"] += 1
+            self.stats["input_tokens"] += count_message_tokens(messages, self.model)
+
+    def _record_usage(self, usage):
+        if usage is None:
+            return
+        with self._lock:
+            self.stats["usage_prompt_tokens"] += usage.prompt_tokens or 0
+            self.stats["usage_completion_tokens"] += usage.completion_tokens or 0
+
+    def _cache_key(self, messages, max_tokens=None):
+        payload = json.dumps(
+            {"model": self.model, "messages": messages, "max_tokens": max_tokens}, ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _map_key(self, text):
+        return self._cache_key(self._messages(MAP_PROMPT, text), self.map_max_tokens)
+
+    def _articles_key(self, articles):
+        # 기사 순서와 무관한 기사 묶음 키 (기사별 본문 해시를 정렬)
+        bodies = sorted(hashlib.sha256("\n".join(a["body_lines"]).encode("utf-8")).hexdigest() for a in articles)
+        return "articles:" + hashlib.sha256(json.dumps([self.model, bodies]).encode("utf-8")).hexdigest()
+
+    def _peek(self, key):
+        """캐시에 (만료 전) 값이 있는지만 확인 (cache_hits 통계에는 넣지 않는다)"""
+        return self.cache is not None and self.cache.get(key)[1]
+
+    def _cached(self, key):
+        if self.cache is None:
+            return None
+        value, fresh = self.cache.get(key)
+        if not fresh:
+            return None
+        with self._lock:
+            self.stats["cache_hits"] += 1
+            self.stats["saved_tokens"] += value["prompt_tokens"] + value["completion_tokens"]
+            self.stats["saved_seconds"] += value["elapsed"]
+        return value["content"]
+
+    def _store(self, key, messages, content, usage, started):
+        if self.cache is None:
+            return
+        self.cache.set(key, {
+            "content": content,
+            "prompt_tokens": usage.prompt_tokens if usage else count_message_tokens(messages, self.model),
+            "completion_tokens": usage.completion_tokens if usage else count_tokens(content, self.model),
+            "elapsed": round(time.perf_counter() - started, 3),
+        })
+
+    def _chat(self, messages, max_tokens=None):
+        key = self._cache_key(messages, max_tokens)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        self._record(messages, "map")
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=self.model, messages=messages, max_tokens=max_tokens
+        )
+        self._record_usage(response.usage)
+        content = response.choices[0].message.content or ""
+        self._store(key, messages, content, response.usage, started)
+        return content
+
+    def _stream_chat(self, messages, kind):
+        key = self._cache_key(messages)
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        self._record(messages, kind)
+        started = time.perf_counter()
+        stream = self.client.chat.completions.create(
+            model=self.model, messages=messages, stream=True, stream_options={"include_usage": True}
+        )
+        parts, usage = [], None
+        for chunk in stream:
+            # include_usage: 마지막 청크에 choices 없이 usage 만 온다
+            if chunk.usage is not None:
+                usage = chunk.usage
+                self._record_usage(usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+        # 끝까지 받은 응답만 저장 (중간에 끊긴 스트림은 저장하지 않는다)
+        self._store(key, messages, "".join(parts), usage, started)
@@ -0,0 +1,120 @@
+"""OCR 마이크로 배처
+
+짧은 시간(window) 동안 들어온 단일 이미지 OCR 요청들을 모아서
+공유 Reader 로 한 번에 처리한다 (EasyOCR readtext_batched).
+요청한 쪽은 각자 자기 이미지의 결과만 돌려받는다.
+"""
+import asyncio
+import time
+
+import metrics
+from executor import ExecutorSaturated
+from workers import ocr_image_batch
+
+
+class MicroBatcher:
+    def __init__(self, reader_pool, executor, max_batch=8, window_ms=10, reader_timeout=None,
+                 preprocess_config=None):
+        self.reader_pool = reader_pool
+        self.executor = executor
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self.reader_timeout = reader_timeout
+        self.preprocess_config = preprocess_config
+        # 배처 앞에 쌓일 수 있는 최대 이미지 수 (이상이면 503)
+        self.max_pending = executor.capacity * max_batch
+
+        self._queue = None
+        self._task = None
+        self._inflight = set()
+        self._pending = 0
+        self._batches = 0
+        self._images = 0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in [self._task, *self._inflight]:
+            if task:
+                task.cancel()
+        if self._task:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, source):
+        """이미지 한 장(파일 경로 또는 bytes)을 배처에 넣고 해당 이미지의 readtext 결과를 기다린다."""
+        if self._pending >= self.max_pending:
+            raise ExecutorSaturated("OCR 배치 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending += 1
+        try:
+            # 배치는 배처 태스크에서 실행되므로, 단계별 시간을 기록할 요청 타이머를 함께 넘긴다
+            await self._queue.put((source, future, metrics.current_timer(), time.perf_counter()))
+            return await future
+        finally:
+            self._pending -= 1
+
+    async def _collect(self):
+        # 첫 요청이 올 때까지 기다린 뒤, window 동안 max_batch 까지 더 모은다
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # 배치 실행은 기다리지 않고 바로 다음 배치를 모은다 (동시성은 executor 가 제한)
+            task = asyncio.create_task(self._execute(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, batch):
+        sources = [source for source, *_ in batch]
+        timings = {}
+        try:
+            results = await self.executor.run(
+                ocr_image_batch, self.reader_pool, sources, self.reader_timeout, self.preprocess_config, timings
+            )
+        except Exception as e:
+            for _, future, *_ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._images += len(batch)
+        for idx, ((_, future, timer, submitted), result) in enumerate(zip(batch, results)):
+            if timer is not None:
+                # 배치 window + 실행 백엔드 대기열에서 기다린 시간 / 이 이미지의 디코딩 / 배치 전체 추론
+                metrics.record_stage("queue_wait", timings["started"] - submitted, timer)
+                metrics.record_stage("decode", timings["decode"][idx], timer)
+                metrics.record_stage("inference", timings["inference"], timer)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "max_batch": self.max_batch,
+            "window_ms": self.window * 1000,
+            "pending": self._pending,
+            "batches": self._batches,
+            "images": self._images,
+            "avg_batch_size": round(self._images / self._batches, 2) if self._batches else 0,
+        }
@@ -0,0 +1,95 @@
+"""동시 업로드 벤치마크: N개의 업로드를 병렬로 보내고 p50/p99 지연시간을 측정
+
+부하 중에 / (liveness) 지연시간도 함께 측정해서
+무거운 작업이 이벤트 루프를 막고 있는지 확인할 수 있다.
+
+사용 예:
+    python bench_concurrency.py --file sample.pdf --endpoint /parse-pdf --concurrency 8 --requests 64
+    python bench_concurrency.py --file sample.png --endpoint /ocr-image --concurrency 4 --requests 32
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _percentile(samples, q):
+    samples = sorted(samples)
+    if not samples:
+        return float("nan")
+    return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+
+def _print_latency(name, samples):
+    if not samples:
+        print(f"{name:<10} (no samples)")
+        return
+    print(f"{name:<10} n={len(samples):<5} mean={statistics.mean(samples) * 1000:9.1f}ms "
+          f"p50={_percentile(samples, 0.50) * 1000:9.1f}ms p99={_percentile(samples, 0.99) * 1000:9.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8002")
+    parser.add_argument("--endpoint", default="/parse-pdf", choices=["/parse-pdf", "/ocr-image"])
+    parser.add_argument("--file", required=True)
+    parser.add_argument("--concurrency", "-c", type=int, default=8, help="동시 업로드 수 (N)")
+    parser.add_argument("--requests", "-n", type=int, default=64, help="전체 요청 수")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        contents = f.read()
+    filename = os.path.basename(args.file)
+    url = args.url.rstrip("/") + args.endpoint
+
+    latencies = []
+    status_counts = {}
+    lock = threading.Lock()
+
+    def upload(_):
+        start = time.perf_counter()
+        resp = requests.post(url, files={"file": (filename, contents)})
+        elapsed = time.perf_counter() - start
+        with lock:
+            status_counts[resp.status_code] = status_counts.get(resp.status_code, 0) + 1
+            if resp.status_code == 200:
+                latencies.append(elapsed)
+
+    # 부하가 걸린 동안 liveness 엔드포인트 지연시간을 주기적으로 측정
+    probe_latencies = []
+    stop = threading.Event()
+
+    def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                requests.get(args.url.rstrip("/") + "/", timeout=30)
+                probe_latencies.append(time.perf_counter() - start)
+            except requests.RequestException:
+                pass
+            time.sleep(0.1)
+
+    probe_thread = threading.Thread(target=probe, daemon=True)
+    probe_thread.start()
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(upload, range(args.requests)))
+    wall = time.perf_counter() - wall_start
+
+    stop.set()
+    probe_thread.join()
+
+    print(f"{args.endpoint} concurrency={args.concurrency} requests={args.requests} wall={wall:.2f}s "
+          f"throughput={args.requests / wall:.2f} req/s")
+    print("status:", dict(sorted(status_counts.items())))
+    _print_latency("upload", latencies)
+    _print_latency("liveness", probe_latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""OCR 지연시간 벤치마크: cold reader vs warm reader
+
+- cold : 매 요청마다 easyocr.Reader 를 새로 만든 뒤 readtext (기존 방식)
+- warm : 미리 로드된 Reader 로 readtext 만 수행 (ReaderPool 방식)
+- --url 을 주면 실행 중인 서버의 /ocr-image 엔드포인트 지연시간도 함께 측정
+
+사용 예:
+    python bench_ocr_latency.py --image sample.png --runs 5
+    python bench_ocr_latency.py --image sample.png --runs 20 --url http://localhost:8002
+"""
+import argparse
+import os
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+
+def _summary(name, samples):
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<12} runs={len(samples):<4} mean={statistics.mean(samples) * 1000:9.1f}ms "
+          f"p50={p50 * 1000:9.1f}ms p99={p99 * 1000:9.1f}ms")
+
+
+def bench_cold(img_array, runs, langs, gpu):
+    import easyocr
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        reader = easyocr.Reader(langs, gpu=gpu)
+        reader.readtext(img_array, detail=1, paragraph=False)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_warm(img_array, runs, langs, gpu):
+    from reader_pool import ReaderPool
+
+    pool = ReaderPool(langs, size=1, gpu=gpu)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with pool.acquire() as reader:
+            reader.readtext(img_array, detail=1, paragraph=False)
+        samples.append(time.perf_counter() - start)
+    pool.close()
+    return samples
+
+
+def bench_http(image_path, runs, url):
+    import requests
+
+    with open(image_path, "rb") as f:
+        contents = f.read()
+    filename = os.path.basename(image_path)
+
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        resp = requests.post(url.rstrip("/") + "/ocr-image", files={"file": (filename, contents)})
+        resp.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True, help="OCR 대상 이미지 경로")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cold-runs", type=int, default=None, help="cold 측정 횟수 (기본: --runs)")
+    parser.add_argument("--gpu", action="store_true")
+    parser.add_argument("--url", default=None, help="서버 URL (예: http://localhost:8002)")
+    args = parser.parse_args()
+
+    langs = ["ko", "en"]
+    img_array = np.array(Image.open(args.image))
+
+    _summary("cold", bench_cold(img_array, args.cold_runs or args.runs, langs, args.gpu))
+    _summary("warm", bench_warm(img_array, args.runs, langs, args.gpu))
+    if args.url:
+        _summary("http(warm)", bench_http(args.image, args.runs, args.url))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""OCR 전처리 속도 / 정확도 트레이드오프 벤치마크
+
+샘플 이미지 디렉터리의 각 이미지를
+- raw        : 전처리 없이 원본 그대로 readtext
+- preprocess : PreprocessConfig 설정으로 전처리 후 readtext (좌표는 원본으로 복원)
+두 방식으로 OCR 하고 처리 시간과 정확도를 비교한다.
+
+정확도는 이미지와 같은 이름의 .txt 정답 파일(예: receipt.jpg -> receipt.txt)이 있으면 정답과,
+없으면 raw 결과와의 문자 단위 유사도(difflib)로 계산한다.
+
+사용 예:
+    python bench_preprocess.py --corpus ./samples
+    python bench_preprocess.py --corpus ./samples --max-side 1600 --no-grayscale
+    python bench_preprocess.py --corpus ./samples --max-side 0 --tile-size 2048
+"""
+import argparse
+import difflib
+import os
+import statistics
+import time
+
+import numpy as np
+from PIL import Image
+
+from preprocess import PreprocessConfig, map_results, prepare_image
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp')
+
+
+def _text(extracted_data):
+    return " ".join(str(item[1]) for item in extracted_data)
+
+
+def _similarity(a, b):
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def run_preprocessed(reader, path, config):
+    with Image.open(path) as image:
+        prepared = prepare_image(image, config)
+    tile_results = [reader.readtext(tile.array, detail=1, paragraph=False) for tile in prepared.tiles]
+    return map_results(prepared, tile_results), prepared
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", required=True, help="샘플 이미지 디렉터리")
+    parser.add_argument("--gpu", action="store_true")
+    parser.add_argument("--no-grayscale", action="store_true")
+    parser.add_argument("--target-text-height", type=int, default=24)
+    parser.add_argument("--max-side", type=int, default=2560)
+    parser.add_argument("--tile-size", type=int, default=0)
+    parser.add_argument("--tile-overlap", type=int, default=128)
+    args = parser.parse_args()
+
+    import easyocr
+
+    config = PreprocessConfig(
+        grayscale=not args.no_grayscale,
+        target_text_height=args.target_text_height,
+        max_side=args.max_side,
+        tile_size=args.tile_size,
+        tile_overlap=args.tile_overlap,
+    )
+    reader = easyocr.Reader(["ko", "en"], gpu=args.gpu)
+
+    paths = sorted(
+        os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    if not paths:
+        raise SystemExit(f"이미지 파일이 없습니다: {args.corpus}")
+
+    raw_times, pre_times, raw_scores, pre_scores = [], [], [], []
+    print(f"{'image':<30} {'size':>11} {'scale':>6} {'tiles':>5} {'raw(s)':>8} {'pre(s)':>8} "
+          f"{'speedup':>8} {'raw_acc':>8} {'pre_acc':>8}")
+
+    for path in paths:
+        with Image.open(path) as image:
+            raw_array = np.array(image)
+            size = f"{image.width}x{image.height}"
+
+        start = time.perf_counter()
+        raw_data = reader.readtext(raw_array, detail=1, paragraph=False)
+        raw_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pre_data, prepared = run_preprocessed(reader, path, config)
+        pre_time = time.perf_counter() - start
+
+        truth_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(truth_path):
+            with open(truth_path, encoding="utf-8") as f:
+                truth = " ".join(f.read().split())
+            raw_acc = _similarity(_text(raw_data), truth)
+        else:
+            # 정답이 없으면 raw 결과를 기준으로 본다
+            truth = _text(raw_data)
+            raw_acc = 1.0
+        pre_acc = _similarity(_text(pre_data), truth)
+
+        raw_times.append(raw_time)
+        pre_times.append(pre_time)
+        raw_scores.append(raw_acc)
+        pre_scores.append(pre_acc)
+        print(f"{os.path.basename(path)[:30]:<30} {size:>11} {prepared.scale:>6.2f} {len(prepared.tiles):>5} "
+              f"{raw_time:>8.2f} {pre_time:>8.2f} {raw_time / pre_time:>7.2f}x {raw_acc:>8.3f} {pre_acc:>8.3f}")
+
+    print("-" * 100)
+    print(f"total raw={sum(raw_times):.2f}s preprocess={sum(pre_times):.2f}s "
+          f"speedup={sum(raw_times) / sum(pre_times):.2f}x")
+    print(f"mean accuracy raw={statistics.mean(raw_scores):.3f} preprocess={statistics.mean(pre_scores):.3f}")
+
+
+if __name__ == "__main__":
+    main()
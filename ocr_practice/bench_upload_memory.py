@@ -0,0 +1,112 @@
+"""업로드 처리 방식별 요청당 최대 메모리(peak RSS) 벤치마크
+
+- read  : 기존 방식. contents = await file.read() -> io.BytesIO(contents) -> 파싱/디코딩
+- spool : 청크 단위 스풀링 -> (큰 파일) 임시 파일 mmap 으로 파싱 / 경로에서 바로 디코딩
+
+측정값이 서로 섞이지 않도록 방식마다 새 프로세스에서 한 번의 요청 처리를 흉내내고,
+시작 시점 RSS 와 최대 RSS(ru_maxrss), 그 차이를 출력한다. (Linux / macOS)
+
+사용 예:
+    python bench_upload_memory.py --file big.pdf
+    python bench_upload_memory.py --file photo.jpg --memory-limit-mb 1
+"""
+import argparse
+import asyncio
+import io
+import os
+import subprocess
+import sys
+import time
+
+
+def _rss_mb(ru_maxrss):
+    # Linux 는 KB, macOS 는 byte 단위
+    return ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else ru_maxrss / 1024
+
+
+def _current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        import resource
+        return _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+class _LocalUpload:
+    """UploadFile 처럼 async read(size) 를 제공하는 로컬 파일 래퍼"""
+
+    def __init__(self, path):
+        self.filename = os.path.basename(path)
+        self._fp = open(path, "rb")
+
+    async def read(self, size=-1):
+        return self._fp.read(size)
+
+
+def run_child(mode, path, memory_limit_mb):
+    import resource
+
+    import numpy as np
+    import PyPDF2
+    from PIL import Image
+
+    from uploads import open_source, spool_upload
+
+    is_pdf = path.lower().endswith(".pdf")
+    baseline = _current_rss_mb()
+    start = time.perf_counter()
+
+    if mode == "read":
+        contents = asyncio.run(_LocalUpload(path).read())
+        if is_pdf:
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(contents))
+            pages = [page.extract_text() for page in pdf_reader.pages]
+        else:
+            image = Image.open(io.BytesIO(contents))
+            img_array = np.array(image)
+    else:
+        upload = asyncio.run(spool_upload(
+            _LocalUpload(path),
+            max_bytes=1 << 40,
+            memory_limit=memory_limit_mb * 1024 * 1024,
+        ))
+        with open_source(upload.source) as stream:
+            if is_pdf:
+                pdf_reader = PyPDF2.PdfReader(stream)
+                pages = [page.extract_text() for page in pdf_reader.pages]
+            else:
+                img_array = np.array(Image.open(stream))
+        upload.close()
+
+    elapsed = time.perf_counter() - start
+    peak = _rss_mb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    print(f"{mode:<6} baseline={baseline:8.1f}MB peak={peak:8.1f}MB "
+          f"per_request={peak - baseline:8.1f}MB elapsed={elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", required=True, help="PDF 또는 이미지 파일")
+    parser.add_argument("--memory-limit-mb", type=int, default=8, help="이 크기보다 크면 디스크로 스풀링")
+    parser.add_argument("--mode", choices=["read", "spool"], default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_child(args.mode, args.file, args.memory_limit_mb)
+        return
+
+    size_mb = os.path.getsize(args.file) / (1024 * 1024)
+    print(f"file={args.file} size={size_mb:.1f}MB")
+    here = os.path.dirname(os.path.abspath(__file__))
+    for mode in ("read", "spool"):
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--file", args.file,
+             "--memory-limit-mb", str(args.memory_limit_mb), "--mode", mode],
+            cwd=here,
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
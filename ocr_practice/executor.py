@@ -0,0 +1,120 @@
+"""CPU 바운드 작업 실행 백엔드
+
+PDF 파싱(PyPDF2)과 OCR(EasyOCR)은 CPU 를 오래 쓰는 동기 작업이라
+async 엔드포인트 안에서 그대로 호출하면 uvicorn 이벤트 루프 전체가 멈춘다.
+작업을 스레드 풀 / 프로세스 풀로 넘기고, 대기 중인 작업 수가 한도를 넘으면
+ExecutorSaturated 를 던져서 엔드포인트가 503 으로 응답하도록 한다.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import metrics
+
+
+class ExecutorSaturated(Exception):
+    """실행 중 + 대기 중인 작업 수가 한도를 넘은 경우"""
+
+
+def _timed_call(fn, *args):
+    # 워커에서 실제로 실행이 시작 / 끝난 시각을 결과와 함께 돌려준다
+    # (프로세스 풀에서도 비교할 수 있도록 perf_counter 대신 time.time 사용)
+    started = time.time()
+    result = fn(*args)
+    return result, started, time.time()
+
+
+class JobExecutor:
+    def __init__(self, name, kind="thread", max_workers=4, max_queue=16):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"지원하지 않는 executor 종류입니다: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def capacity(self):
+        # 동시에 실행 가능한 개수 + 대기열 길이
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn, *args, stage="inference"):
+        """
+        fn(*args) 를 풀에서 실행하고 결과를 기다린다. 포화 상태면 즉시 ExecutorSaturated.
+        요청 측정 중이면 대기열에서 기다린 시간은 queue_wait, 실행 시간은 stage 로 기록한다.
+        """
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise ExecutorSaturated(
+                    f"{self.name} 작업 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요."
+                )
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            submitted = time.time()
+            result, started, finished = await loop.run_in_executor(self._pool, _timed_call, fn, *args)
+            metrics.record_stage("queue_wait", max(0.0, started - submitted))
+            metrics.record_stage(stage, finished - started)
+            return result
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def run_unordered(self, fn, args_list, window=None, stage="inference"):
+        """
+        args_list 의 인자들로 fn 을 실행하면서 끝나는 순서대로 결과를 yield 한다.
+        한 번에 window 개(기본: 워커 수)까지만 풀에 넣어서 한 요청이 대기열을 독차지하지 않게 한다.
+        이미 응답을 스트리밍 중인 경우에 쓰므로, 포화 상태면 503 대신 자리가 날 때까지 기다린다.
+        """
+        window = window or self.max_workers
+        args_iter = iter(args_list)
+        pending = set()
+
+        async def run_when_free(args):
+            while True:
+                try:
+                    return await self.run(fn, *args, stage=stage)
+                except ExecutorSaturated:
+                    await asyncio.sleep(0.05)
+
+        def fill():
+            for args in args_iter:
+                pending.add(asyncio.ensure_future(run_when_free(args)))
+                if len(pending) >= window:
+                    break
+
+        fill()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                for task in done:
+                    yield task.result()
+                fill()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": pending,
+            "running": min(pending, self.max_workers),
+            "queued": max(0, pending - self.max_workers),
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
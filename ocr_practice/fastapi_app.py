@@ -1,16 +1,232 @@
-from typing import Any
+from typing import Any, Optional
+import asyncio
+from contextlib import asynccontextmanager
+import json
+import os
+import shutil
+import time
+import uuid
 
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import PyPDF2
-import easyocr
-import io
-import numpy as np
-from PIL import Image
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 import uvicorn
 
-app = FastAPI(title="PDF & OCR API")
+import metrics
+from batcher import MicroBatcher
+from executor import ExecutorSaturated, JobExecutor
+from jobs import JobRunner, JobStore, public_job, validate_callback_url
+from preprocess import PreprocessConfig
+from reader_pool import ReaderPool, ReaderPoolTimeout
+from result_cache import ResultCache, make_cache_key
+from uploads import InvalidUpload, UploadTooLarge, read_multipart
+from workers import (
+    count_pdf_pages,
+    extract_pdf_page_range,
+    extract_pdf_pages,
+    extract_pdf_pages_timed,
+    render_pdf_page,
+)
+
+# OCR 설정 (환경변수로 조정 가능)
+OCR_LANGS = ["ko", "en"]
+OCR_READER_POOL_SIZE = int(os.getenv("OCR_READER_POOL_SIZE", "1"))
+OCR_READER_TIMEOUT = float(os.getenv("OCR_READER_TIMEOUT", "30"))
+OCR_USE_GPU = os.getenv("OCR_USE_GPU", "0") == "1"
+
+# 실행 백엔드 설정
+# - PDF 파싱은 순수 파이썬(GIL)이라 기본값을 프로세스 풀로 둔다
+# - OCR 은 Reader 가 서버 프로세스에 로드되어 있으므로 스레드 풀 고정 (torch 연산은 GIL 을 놓는다)
+PDF_EXECUTOR_KIND = os.getenv("PDF_EXECUTOR_KIND", "process")
+PDF_EXECUTOR_WORKERS = int(os.getenv("PDF_EXECUTOR_WORKERS", str(os.cpu_count() or 2)))
+PDF_EXECUTOR_QUEUE = int(os.getenv("PDF_EXECUTOR_QUEUE", "16"))
+OCR_EXECUTOR_WORKERS = int(os.getenv("OCR_EXECUTOR_WORKERS", str(OCR_READER_POOL_SIZE)))
+OCR_EXECUTOR_QUEUE = int(os.getenv("OCR_EXECUTOR_QUEUE", "16"))
+# 스트리밍 PDF 파싱 시 워커 프로세스 하나가 한 번에 맡는 페이지 수
+PDF_STREAM_PAGES_PER_TASK = int(os.getenv("PDF_STREAM_PAGES_PER_TASK", "4"))
+
+# 마이크로 배칭 설정: window 동안 들어온 이미지를 최대 max_batch 장까지 묶어서 OCR
+OCR_BATCH_MAX_SIZE = int(os.getenv("OCR_BATCH_MAX_SIZE", "8"))
+OCR_BATCH_WINDOW_MS = float(os.getenv("OCR_BATCH_WINDOW_MS", "10"))
+
+# 스캔 PDF OCR 대체 설정: 추출된 텍스트가 PDF_OCR_MIN_CHARS 글자 미만인 페이지는
+# PDF_OCR_DPI 로 래스터화해서 OCR (pypdfium2 필요)
+PDF_OCR_FALLBACK = os.getenv("PDF_OCR_FALLBACK", "0") == "1"
+PDF_OCR_MIN_CHARS = int(os.getenv("PDF_OCR_MIN_CHARS", "10"))
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "200"))
+
+# 결과 캐시 설정 (RESULT_CACHE_DIR 를 빈 값으로 두면 디스크 캐시 사용 안 함)
+RESULT_CACHE_MEMORY_ITEMS = int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", "256"))
+RESULT_CACHE_DIR = os.getenv(
+    "RESULT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache")
+)
+RESULT_CACHE_DISK_MAX_MB = int(os.getenv("RESULT_CACHE_DISK_MAX_MB", "512"))
+
+# OCR 전처리 설정 (OCR_PREPROCESS, OCR_GRAYSCALE, OCR_MAX_SIDE, OCR_TILE_SIZE 등 환경변수)
+OCR_PREPROCESS_CONFIG = PreprocessConfig.from_env()
+
+# 캐시 키에 포함되는 엔진 옵션 (옵션이 바뀌면 이전 결과를 재사용하지 않는다)
+PDF_ENGINE_OPTIONS = {"engine": "pypdf2"}
+OCR_ENGINE_OPTIONS = {
+    "engine": "easyocr", "langs": OCR_LANGS, "detail": 1, "paragraph": False,
+    "preprocess": OCR_PREPROCESS_CONFIG.as_dict(),
+}
+
+# 업로드 설정: UPLOAD_MEMORY_LIMIT_MB 보다 큰 업로드는 UPLOAD_SPOOL_DIR 의 임시 파일로 저장
+UPLOAD_MAX_MB = int(os.getenv("UPLOAD_MAX_MB", "200"))
+# 요청 본문(multipart 전체) 최대 크기. Content-Length 가 이보다 크면 본문을 읽기 전에 413
+# (기본값은 파일 하나 최대 크기 + multipart 헤더 / 폼 필드 여유분)
+UPLOAD_MAX_REQUEST_MB = int(os.getenv("UPLOAD_MAX_REQUEST_MB", str(UPLOAD_MAX_MB + 1)))
+UPLOAD_MEMORY_LIMIT_MB = int(os.getenv("UPLOAD_MEMORY_LIMIT_MB", "8"))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR") or None
+
+# 비동기 작업 큐 설정 (작업 목록은 SQLite, 입력 파일은 JOB_DIR 에 보관)
+JOB_DIR = os.getenv("JOB_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".jobs"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# callback_url 로 허용할 호스트 (쉼표 구분). 비우면 공인 IP 로 연결되는 주소만 허용
+JOB_CALLBACK_ALLOWED_HOSTS = frozenset(
+    host.strip().lower() for host in os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+)
+
+ALLOWED_IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp']
+
+# 요청 / 단계별 소요시간을 측정할 엔드포인트 (GET /metrics 로 노출)
+METRICS_ENDPOINTS = [
+    "/parse-pdf", "/parse-pdf-stream", "/ocr-image", "/ocr-images", "/jobs/parse-pdf", "/jobs/ocr-image",
+]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.result_cache = ResultCache(
+        memory_items=RESULT_CACHE_MEMORY_ITEMS,
+        disk_dir=RESULT_CACHE_DIR or None,
+        disk_max_bytes=RESULT_CACHE_DISK_MAX_MB * 1024 * 1024,
+    )
+    # EasyOCR reader 초기화 (한국어, 영어) - 서버 시작 시 한 번만 모델 로드
+    app.state.reader_pool = ReaderPool(OCR_LANGS, size=OCR_READER_POOL_SIZE, gpu=OCR_USE_GPU)
+    app.state.pdf_executor = JobExecutor(
+        "pdf", kind=PDF_EXECUTOR_KIND, max_workers=PDF_EXECUTOR_WORKERS, max_queue=PDF_EXECUTOR_QUEUE
+    )
+    app.state.ocr_executor = JobExecutor(
+        "ocr", kind="thread", max_workers=OCR_EXECUTOR_WORKERS, max_queue=OCR_EXECUTOR_QUEUE
+    )
+    app.state.ocr_batcher = MicroBatcher(
+        app.state.reader_pool,
+        app.state.ocr_executor,
+        max_batch=OCR_BATCH_MAX_SIZE,
+        window_ms=OCR_BATCH_WINDOW_MS,
+        reader_timeout=OCR_READER_TIMEOUT,
+        preprocess_config=OCR_PREPROCESS_CONFIG,
+    )
+    await app.state.ocr_batcher.start()
+
+    os.makedirs(os.path.join(JOB_DIR, "files"), exist_ok=True)
+    app.state.job_store = JobStore(os.path.join(JOB_DIR, "jobs.db"))
+    app.state.job_runner = JobRunner(
+        app.state.job_store,
+        handlers={"parse-pdf": _run_pdf_job, "ocr-image": _run_ocr_job},
+        workers=JOB_WORKERS,
+        on_finished=_cleanup_job_files,
+        callback_allowed_hosts=JOB_CALLBACK_ALLOWED_HOSTS,
+    )
+    await app.state.job_runner.start()
+    yield
+    await app.state.job_runner.stop()
+    app.state.job_store.close()
+    await app.state.ocr_batcher.stop()
+    app.state.pdf_executor.shutdown()
+    app.state.ocr_executor.shutdown()
+    app.state.reader_pool.close()
+
+
+def _saturated(e: ExecutorSaturated) -> HTTPException:
+    # 대기열이 가득 차면 503 + Retry-After 로 클라이언트에게 재시도를 유도
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+async def _read_form(request: Request):
+    """
+    multipart 본문을 직접 스트리밍 파싱해서 파일 부분을 메모리/임시 파일에 한 번만 저장
+    (UploadFile 파라미터를 쓰면 Starlette 가 본문 전체를 먼저 받아 두므로 최대 크기 검사가 늦고 디스크에 두 번 쓴다)
+    Content-Length 또는 읽은 크기가 최대 크기를 넘으면 413, 형식이 잘못됐으면 400
+    """
+    try:
+        with metrics.stage("upload_read"):
+            return await read_multipart(
+                request,
+                max_bytes=UPLOAD_MAX_MB * 1024 * 1024,
+                max_request_bytes=UPLOAD_MAX_REQUEST_MB * 1024 * 1024,
+                memory_limit=UPLOAD_MEMORY_LIMIT_MB * 1024 * 1024,
+                spool_dir=UPLOAD_SPOOL_DIR,
+            )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _form_file(form, name: str = "file"):
+    try:
+        return form.file(name)
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _form_bool(form, name: str, default: bool) -> bool:
+    value = form.fields.get(name)
+    if value is None or value == "":
+        return default
+    if value.lower() in ("1", "true", "yes", "on"):
+        return True
+    if value.lower() in ("0", "false", "no", "off"):
+        return False
+    raise HTTPException(status_code=400, detail=f"'{name}' 는 true / false 여야 합니다.")
+
+
+def _multipart_body(files: dict, fields: dict = None) -> dict:
+    """본문을 직접 파싱하는 엔드포인트의 OpenAPI 문서 (/docs 에서 파일 업로드 폼이 보이도록)"""
+    properties = {name: {"type": "string", "format": "binary"} for name in files}
+    properties = {
+        name: {"type": "array", "items": properties[name]} if many else properties[name]
+        for name, many in files.items()
+    }
+    properties.update(fields or {})
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {
+        "schema": {"type": "object", "properties": properties, "required": list(files)}
+    }}}}
+
+
+async def _cache_lookup(upload, options: dict, response: Response):
+    """
+    업로드 내용(SHA-256) + 엔진 옵션으로 캐시를 조회하고, X-Cache 헤더(HIT-MEMORY / HIT-DISK / MISS)를 붙인다.
+    반환: (cache_key, 캐시된 결과 또는 None)
+    """
+    key = make_cache_key(upload.sha256, options)
+    # 디스크 캐시 조회가 이벤트 루프를 막지 않도록 스레드에서 수행
+    cached, tier = await asyncio.to_thread(app.state.result_cache.get, key)
+    response.headers["X-Cache"] = f"HIT-{tier.upper()}" if tier else "MISS"
+    return key, cached
+
+
+async def _cache_store(key: str, payload: dict):
+    await asyncio.to_thread(app.state.result_cache.set, key, payload)
+
+
+def _json_response(payload: dict, response: Response = None) -> Response:
+    """
+    JSON 직렬화를 직접 해서 serialize 단계 시간을 잰다 (FastAPI 기본 JSONResponse 와 같은 형식).
+    response 에 붙여둔 헤더(X-Cache 등)는 그대로 옮긴다.
+    """
+    with metrics.stage("serialize"):
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+app = FastAPI(title="PDF & OCR API", lifespan=lifespan)
 
 # CORS 설정 (Streamlit과 통신을 위해)
 app.add_middleware(
@@ -20,132 +236,543 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# EasyOCR reader 초기화 (한국어, 영어)
-reader = easyocr.Reader(['ko', 'en'], gpu=False)
-
+app.add_middleware(metrics.MetricsMiddleware, paths=METRICS_ENDPOINTS)
 
 @app.get("/")
 async def root():
     return {"message": "PDF & OCR API is running"}
 
 
-@app.post("/parse-pdf")
-async def parse_pdf(file: UploadFile = File(...)):
+@app.get("/ocr-readers")
+async def ocr_readers():
+    """Reader 풀 상태 (전체 / 사용 중 / 대기 중)"""
+    return app.state.reader_pool.stats()
+
+
+@app.get("/executors")
+async def executors():
+    """실행 백엔드 상태 (실행 중 / 대기 중 작업 수)"""
+    return {
+        "pdf": app.state.pdf_executor.stats(),
+        "ocr": app.state.ocr_executor.stats(),
+        "ocr_batcher": app.state.ocr_batcher.stats(),
+    }
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """결과 캐시 hit / miss 통계"""
+    return app.state.result_cache.stats()
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """
+    Prometheus 텍스트 형식 지표
+    - ocr_request_duration_seconds{endpoint, file_type, status}: 요청 전체 소요시간 히스토그램
+    - ocr_stage_duration_seconds{endpoint, file_type, stage}: 단계별 소요시간 히스토그램
+      (upload_read, queue_wait, decode, inference, serialize)
+    - 실행 백엔드 / Reader 풀 / 결과 캐시 현재 상태
+    """
+    executor_stats = {"pdf": app.state.pdf_executor.stats(), "ocr": app.state.ocr_executor.stats()}
+    reader_stats = app.state.reader_pool.stats()
+    batcher_stats = app.state.ocr_batcher.stats()
+    cache = app.state.result_cache.stats()
+
+    lines = []
+    lines += metrics.render_gauges(
+        "ocr_executor_pending", "Running + queued tasks per executor.",
+        [({"executor": name}, s["pending"]) for name, s in executor_stats.items()],
+    )
+    lines += metrics.render_gauges(
+        "ocr_reader_pool_in_use", "Readers currently borrowed from the pool.", [({}, reader_stats["in_use"])]
+    )
+    lines += metrics.render_gauges(
+        "ocr_batcher_pending", "Images waiting in the micro batcher.", [({}, batcher_stats["pending"])]
+    )
+    lines += metrics.render_gauges(
+        "ocr_batcher_batches_total", "Batches executed by the micro batcher.", [({}, batcher_stats["batches"])],
+        metric_type="counter",
+    )
+    lines += metrics.render_gauges(
+        "ocr_batcher_images_total", "Images processed by the micro batcher.", [({}, batcher_stats["images"])],
+        metric_type="counter",
+    )
+    lines += metrics.render_gauges(
+        "ocr_result_cache_lookups_total", "Result cache lookups by outcome.",
+        [({"result": "memory_hit"}, cache["memory_hits"]), ({"result": "disk_hit"}, cache["disk_hits"]),
+         ({"result": "miss"}, cache["misses"])],
+        metric_type="counter",
+    )
+    return Response(content=metrics.render(lines), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _check_pdf_filename(filename: str):
+    # 파일 확장자 검증
+    if not filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다.")
+
+
+def _page_header(page_number: int) -> str:
+    return f"\n--- 페이지 {page_number} ---\n"
+
+
+@metrics.stage("serialize")
+def _pdf_payload(filename: str, pages: list[str], page_details: list[dict] = None) -> dict:
+    """
+    페이지별 텍스트를 JSON 응답 형태로 가공
+    page_details 가 있으면 페이지마다 추가 정보(사용한 엔진, 소요시간 등)를 덧붙인다.
+    """
+    page_texts = []
+    text_parts = []
+    total_pages = len(pages)
+    
+    for page_num, page_text in enumerate(pages):
+        page_entry = {
+            "page_number": page_num + 1,
+            "text": page_text
+        }
+        if page_details:
+            page_entry.update(page_details[page_num])
+        page_texts.append(page_entry)
+        # 문자열 += 반복 대신 조각을 모아두었다가 한 번에 join
+        text_parts.append(_page_header(page_num + 1))
+        text_parts.append(page_text)
+
+    extracted_text = "".join(text_parts)
+    
+    return {
+        "success": True,
+        "filename": filename,
+        "total_pages": total_pages,
+        "extracted_text": extracted_text,
+        "pages": page_texts,
+        "text_length": len(extracted_text)
+    }
+
+
+async def _extract_pdf_hybrid(source):
+    """
+    텍스트 레이어가 있는 페이지는 PyPDF2 로 바로 추출하고(빠른 경로),
+    텍스트가 거의 없는 페이지(스캔본)는 래스터화한 뒤 공유 Reader 로 OCR 한다.
+    반환: (페이지별 텍스트 목록, 페이지별 {"engine", "elapsed_ms"} 목록)
+    """
+    timed_pages = await app.state.pdf_executor.run(extract_pdf_pages_timed, source)
+    texts = [text for text, _ in timed_pages]
+    details = [{"engine": "text", "elapsed_ms": round(ms, 1)} for _, ms in timed_pages]
+
+    scanned = [idx for idx, text in enumerate(texts) if len(text.strip()) < PDF_OCR_MIN_CHARS]
+    if not scanned:
+        return texts, details
+
+    async def ocr_page(page_index, img_array, render_ms):
+        start = time.perf_counter()
+        extracted_data = await app.state.ocr_batcher.submit(img_array)
+        ocr_ms = (time.perf_counter() - start) * 1000
+        texts[page_index] = " ".join(str(item[1]) for item in extracted_data)
+        details[page_index] = {
+            "engine": "ocr",
+            "elapsed_ms": round(details[page_index]["elapsed_ms"] + render_ms + ocr_ms, 1),
+        }
+
+    # 래스터화는 프로세스 풀에서 페이지 단위로, 끝나는 대로 OCR 배처(스레드 풀 + 공유 Reader)로 넘긴다
+    ocr_tasks = []
+    render_args = [(source, idx, PDF_OCR_DPI) for idx in scanned]
+    async for page_index, img_array, render_ms in app.state.pdf_executor.run_unordered(
+        render_pdf_page, render_args, stage="decode"
+    ):
+        ocr_tasks.append(asyncio.create_task(ocr_page(page_index, img_array, render_ms)))
+    await asyncio.gather(*ocr_tasks)
+
+    return texts, details
+
+
+def _pdf_engine_options(ocr_fallback: bool) -> dict:
+    """PDF 결과 캐시 키에 들어가는 엔진 옵션 (OCR 대체 여부에 따라 결과가 다르다)"""
+    if not ocr_fallback:
+        return PDF_ENGINE_OPTIONS
+    return {**PDF_ENGINE_OPTIONS, "ocr_fallback": OCR_ENGINE_OPTIONS,
+            "ocr_min_chars": PDF_OCR_MIN_CHARS, "ocr_dpi": PDF_OCR_DPI}
+
+
+@app.post("/parse-pdf", openapi_extra=_multipart_body({"file": False}))
+async def parse_pdf(
+    request: Request,
+    response: Response,
+    ocr_fallback: bool = Query(PDF_OCR_FALLBACK),
+):
     """
     PDF 파일을 업로드받아 PyPDF2로 텍스트를 추출합니다.
+    ocr_fallback=true 이면 텍스트 레이어가 없는 스캔 페이지는 OCR 로 추출하고,
+    페이지마다 사용한 엔진(text / ocr)과 소요시간(elapsed_ms)을 함께 반환합니다.
     """
+    form = None
     try:
-        # 파일 확장자 검증
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다.")
-        
-        # PDF 파일 읽기
-        contents = await file.read()
-        pdf_file = io.BytesIO(contents)
+        # PDF 파일 읽기 (청크 단위로 스풀링, 큰 파일은 임시 파일로)
+        form = await _read_form(request)
+        upload = _form_file(form)
+        _check_pdf_filename(upload.filename)
+        metrics.set_file_types([upload.filename])
+
+        # 같은 파일을 이전에 파싱한 적이 있으면 캐시된 결과 반환
+        cache_key, cached = await _cache_lookup(upload, _pdf_engine_options(ocr_fallback), response)
+        if cached is not None:
+            return _json_response({**cached, "filename": upload.filename}, response)
+
+        if ocr_fallback:
+            texts, details = await _extract_pdf_hybrid(upload.source)
+            result = _pdf_payload(upload.filename, texts, details)
+            result["ocr_pages"] = sum(1 for d in details if d["engine"] == "ocr")
+            await _cache_store(cache_key, result)
+            return _json_response(result, response)
         
         # PyPDF2로 텍스트 추출
         ########################################
         ### 필수과제 1-(2): PyPDF2로 텍스트 추출
 
+        # 이벤트 루프를 막지 않도록 PDF 파싱은 실행 백엔드(풀)에서 수행
+        # (디스크에 저장된 업로드는 경로만 넘기고 워커가 mmap 으로 연다)
+        pages = await app.state.pdf_executor.run(extract_pdf_pages, upload.source)
         
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        
-        extracted_text = ""
-        page_texts = []
-        total_pages = len(pdf_reader.pages)
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            page_texts.append({
-                "page_number": page_num + 1,
-                "text": page_text
-            })
-            extracted_text += f"\n--- 페이지 {page_num + 1} ---\n"
-            extracted_text += page_text
-        
-        return {
-            "success": True,
-            "filename": file.filename,
-            "total_pages": total_pages,
-            "extracted_text": extracted_text,
-            "pages": page_texts,
-            "text_length": len(extracted_text)
-        }
+        result = _pdf_payload(upload.filename, pages)
+        await _cache_store(cache_key, result)
+        return _json_response(result, response)
     
+    except HTTPException:
+        raise
+    except ReaderPoolTimeout as e:
+        # ocr_fallback 로 스캔 페이지를 OCR 하다가 Reader 를 빌리지 못한 경우
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorSaturated as e:
+        raise _saturated(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF 파싱 중 오류 발생: {str(e)}")
+    finally:
+        if form is not None:
+            form.close()
+
+
+def _ndjson(record: dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
 
 
-@app.post("/ocr-image")
-async def ocr_image(file: UploadFile = File(...)):
+@app.post("/parse-pdf-stream", openapi_extra=_multipart_body({"file": False}))
+async def parse_pdf_stream(request: Request):
+    """
+    PDF 페이지를 여러 워커 프로세스에서 병렬로 추출하고, 페이지가 끝나는 대로 NDJSON 으로 내보냅니다.
+    - 처음: {"type": "start", "filename": ..., "total_pages": n}
+    - 페이지: {"type": "page", "page_number": n, "text": "..."}  (끝나는 순서대로, 번호 순서 보장 X)
+    - 마지막: {"type": "summary", "filename": ..., "total_pages": n, "text_length": n}
+    - 도중 오류: {"type": "error", "detail": "..."}
+    text_length 는 /parse-pdf 의 extracted_text 길이와 같습니다.
+    """
+    form = await _read_form(request)
+    try:
+        upload = _form_file(form)
+        _check_pdf_filename(upload.filename)
+    except HTTPException:
+        form.close()
+        raise
+    metrics.set_file_types([upload.filename])
+
+    # 페이지 수를 먼저 확인 (여기서 포화 상태면 스트리밍 시작 전에 503)
+    try:
+        total_pages = await app.state.pdf_executor.run(count_pdf_pages, upload.source, stage="decode")
+    except ExecutorSaturated as e:
+        upload.close()
+        raise _saturated(e)
+    except Exception as e:
+        upload.close()
+        raise HTTPException(status_code=500, detail=f"PDF 파싱 중 오류 발생: {str(e)}")
+
+    # 워커에는 업로드 경로(또는 작은 파일이면 bytes)와 페이지 범위만 넘긴다
+    step = max(1, PDF_STREAM_PAGES_PER_TASK)
+    ranges = [(upload.source, start, min(start + step, total_pages)) for start in range(0, total_pages, step)]
+
+    async def generate():
+        yield _ndjson({"type": "start", "filename": upload.filename, "total_pages": total_pages})
+
+        text_length = 0
+        try:
+            async for chunk in app.state.pdf_executor.run_unordered(extract_pdf_page_range, ranges):
+                for page_number, page_text in chunk:
+                    text_length += len(_page_header(page_number)) + len(page_text)
+                    yield _ndjson({"type": "page", "page_number": page_number, "text": page_text})
+        except Exception as e:
+            yield _ndjson({"type": "error", "detail": f"PDF 파싱 중 오류 발생: {str(e)}"})
+            return
+        finally:
+            # 스트리밍이 끝나거나 도중에 클라이언트가 끊으면 임시 파일 정리
+            upload.close()
+
+        yield _ndjson({
+            "type": "summary",
+            "filename": upload.filename,
+            "total_pages": total_pages,
+            "text_length": text_length
+        })
+
+    # 첫 청크를 보내기 전에 클라이언트가 끊으면 generate() 가 시작되지 않아 위 finally 가 돌지 않으므로
+    # 응답이 끝날 때도 정리한다 (close 는 여러 번 불러도 된다)
+    return StreamingResponse(generate(), media_type="application/x-ndjson", background=BackgroundTask(upload.close))
+
+
+def _check_image_filename(filename: str):
+    # 파일 확장자 검증
+    if not any(filename.lower().endswith(ext) for ext in ALLOWED_IMAGE_EXTENSIONS):
+        raise HTTPException(
+            status_code=400, 
+            detail="이미지 파일만 업로드 가능합니다. (jpg, jpeg, png, bmp, gif, webp)"
+        )
+
+
+@metrics.stage("serialize")
+def _ocr_payload(filename: str, extracted_data) -> dict:
+    """readtext 결과를 JSON 응답 형태로 가공"""
+    result_simple = [item[1] for item in extracted_data]
+
+    # result_simple = []
+    # for item in extracted_data:
+    #   result_simple.append(item[1])
+    #  ====> 간단히 줄여 쓴 문법
+    # result_simple = [item[1] for item in extracted_data] 
+
+    
+    # item[1]인 이유 
+    # ---> extracted_data는 리스트 형태 [ [bbox, text, confidence], [], [] ]
+    # bbox = 글자 영역 좌표값, text = 실제 텍스트, confidence = 신뢰도 
+
+
+    # 모든 텍스트를 하나로 합치기
+    full_text = " ".join(result_simple)
+    
+    # extracted_data를 return했더니 Numpy오류 발생하여 int형 변환
+    # numpy.int32, numpy.float32 와 같은 Numpy객체라 json 변환 X
+    # -> json 변환 가능한 형태로 가공
+    
+    detailed_results = []
+    for bbox, text, conf in extracted_data:
+        bbox_py = [[int(x), int(y)] for x, y in bbox]
+        detailed_results.append({
+            "bbox": bbox_py,
+            "text": str(text),
+            "confidence": float(conf)
+        })
+
+    return {
+        "success": True,
+        "filename": filename,
+        "extracted_text": full_text,
+        "detailed_results": detailed_results,
+        "total_detections": len(detailed_results)
+    }
+
+
+@app.post("/ocr-image", openapi_extra=_multipart_body({"file": False}))
+async def ocr_image(request: Request, response: Response):
     """
     이미지 파일을 업로드받아 EasyOCR로 텍스트를 추출합니다.
     """
+    form = None
     try:
-        # 파일 확장자 검증
-        allowed_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp']
-        if not any(file.filename.lower().endswith(ext) for ext in allowed_extensions):
-            raise HTTPException(
-                status_code=400, 
-                detail="이미지 파일만 업로드 가능합니다. (jpg, jpeg, png, bmp, gif, webp)"
-            )
-        
-        # 이미지 파일 읽기
-        contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-        
-        # numpy array로 변환
-        img_array = np.array(image)
+        # 이미지 파일 읽기 (청크 단위로 스풀링, 큰 파일은 임시 파일로)
+        form = await _read_form(request)
+        upload = _form_file(form)
+        _check_image_filename(upload.filename)
+        metrics.set_file_types([upload.filename])
+
+        # 같은 이미지를 이전에 OCR 한 적이 있으면 캐시된 결과 반환
+        cache_key, cached = await _cache_lookup(upload, OCR_ENGINE_OPTIONS, response)
+        if cached is not None:
+            return _json_response({**cached, "filename": upload.filename}, response)
         
         ########################################
         ### 필수과제 2-(2): EasyOCR로 텍스트 추출
 
-        reader = easyocr.Reader(["ko", "en"])
-        extracted_data = reader.readtext(img_array, detail=1, paragraph=False)
+        # 동시에 들어온 다른 요청들과 함께 마이크로 배처에서 묶어서 OCR
+        # (디코딩 + readtext 는 스레드 풀에서, 미리 로드된 Reader 를 빌려 수행)
+        extracted_data = await app.state.ocr_batcher.submit(upload.source)
+
+        result = _ocr_payload(upload.filename, extracted_data)
+        await _cache_store(cache_key, result)
+        return _json_response(result, response)
     
-        result_simple = [item[1] for item in extracted_data]
+    except HTTPException:
+        raise
+    except ReaderPoolTimeout as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorSaturated as e:
+        raise _saturated(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"OCR 처리 중 오류 발생: {str(e)}")
+    finally:
+        if form is not None:
+            form.close()
 
-        # result_simple = []
-        # for item in extracted_data:
-        #   result_simple.append(item[1])
-        #  ====> 간단히 줄여 쓴 문법
-        # result_simple = [item[1] for item in extracted_data] 
 
-        
-        # item[1]인 이유 
-        # ---> extracted_data는 리스트 형태 [ [bbox, text, confidence], [], [] ]
-        # bbox = 글자 영역 좌표값, text = 실제 텍스트, confidence = 신뢰도 
+@app.post("/ocr-images", openapi_extra=_multipart_body({"files": True}))
+async def ocr_images(request: Request):
+    """
+    여러 장의 이미지를 한 번에 업로드받아 EasyOCR로 텍스트를 추출합니다.
+    이미지마다 /ocr-image 와 같은 형태의 결과를 results 에 담아 반환합니다.
+    요청 전체 크기는 UPLOAD_MAX_REQUEST_MB 까지입니다.
+    """
+    form = await _read_form(request)
+    try:
+        _form_file(form, "files")
+        uploads = form.files["files"]
+        for upload in uploads:
+            _check_image_filename(upload.filename)
+        metrics.set_file_types([upload.filename for upload in uploads])
 
+        # 모든 이미지를 한꺼번에 배처에 넣어서 같은 배치로 묶이도록 한다
+        outcomes = await asyncio.gather(
+            *[app.state.ocr_batcher.submit(upload.source) for upload in uploads],
+            return_exceptions=True,
+        )
+    finally:
+        form.close()
 
-        # 모든 텍스트를 하나로 합치기
-        full_text = " ".join(result_simple)
-        
-        # extracted_data를 return했더니 Numpy오류 발생하여 int형 변환
-        # numpy.int32, numpy.float32 와 같은 Numpy객체라 json 변환 X
-        # -> json 변환 가능한 형태로 가공
-        
-        detailed_results = []
-        for bbox, text, conf in extracted_data:
-            bbox_py = [[int(x), int(y)] for x, y in bbox]
-            detailed_results.append({
-                "bbox": bbox_py,
-                "text": str(text),
-                "confidence": float(conf)
+    results = []
+    for upload, outcome in zip(uploads, outcomes):
+        if isinstance(outcome, ExecutorSaturated):
+            raise _saturated(outcome)
+        if isinstance(outcome, ReaderPoolTimeout):
+            raise HTTPException(status_code=503, detail=str(outcome))
+        if isinstance(outcome, Exception):
+            results.append({
+                "success": False,
+                "filename": upload.filename,
+                "error": f"OCR 처리 중 오류 발생: {str(outcome)}"
             })
-        
+            continue
+        results.append(_ocr_payload(upload.filename, outcome))
 
-        return {
-            "success": True,
-            "filename": file.filename,
-            "extracted_text": full_text,
-            "detailed_results": detailed_results,
-            "total_detections": len(detailed_results)
-        }
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"OCR 처리 중 오류 발생: {str(e)}")
+    return _json_response({
+        "success": all(r["success"] for r in results),
+        "total_images": len(results),
+        "results": results
+    })
+
+
+# ==================== 비동기 작업 큐 ====================
+
+async def _run_pdf_job(job: dict) -> dict:
+    # 작업 처리 시간은 endpoint="job:parse-pdf" 로 따로 기록
+    with metrics.track("job:parse-pdf", metrics.file_type_of(job["filename"])):
+        # 옵션이 없는 작업(options 컬럼 이전)은 /parse-pdf 와 같은 서버 기본값
+        ocr_fallback = job["options"].get("ocr_fallback", PDF_OCR_FALLBACK)
+        cache_key = make_cache_key(job["sha256"], _pdf_engine_options(ocr_fallback))
+        cached, _ = await asyncio.to_thread(app.state.result_cache.get, cache_key)
+        if cached is not None:
+            return {**cached, "filename": job["filename"]}
+
+        if ocr_fallback:
+            texts, details = await _extract_pdf_hybrid(job["source_path"])
+            result = _pdf_payload(job["filename"], texts, details)
+            result["ocr_pages"] = sum(1 for d in details if d["engine"] == "ocr")
+        else:
+            pages = await app.state.pdf_executor.run(extract_pdf_pages, job["source_path"])
+            result = _pdf_payload(job["filename"], pages)
+        await _cache_store(cache_key, result)
+        return result
+
+
+async def _run_ocr_job(job: dict) -> dict:
+    with metrics.track("job:ocr-image", metrics.file_type_of(job["filename"])):
+        cache_key = make_cache_key(job["sha256"], OCR_ENGINE_OPTIONS)
+        cached, _ = await asyncio.to_thread(app.state.result_cache.get, cache_key)
+        if cached is not None:
+            return {**cached, "filename": job["filename"]}
+
+        extracted_data = await app.state.ocr_batcher.submit(job["source_path"])
+        result = _ocr_payload(job["filename"], extracted_data)
+        await _cache_store(cache_key, result)
+        return result
+
+
+def _cleanup_job_files(job: dict):
+    # 결과는 DB 에 남아 있으므로 처리가 끝난 입력 파일은 삭제
+    shutil.rmtree(os.path.dirname(job["source_path"]), ignore_errors=True)
+
+
+async def _submit_job(kind: str, upload, callback_url: Optional[str], options: dict = None) -> dict:
+    if callback_url:
+        try:
+            # 호스트 주소 조회(DNS)가 있어 스레드에서
+            await asyncio.to_thread(validate_callback_url, callback_url, JOB_CALLBACK_ALLOWED_HOSTS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    job_id = uuid.uuid4().hex
+    # 재시작 후에도 처리할 수 있도록 입력 파일을 작업 디렉터리에 보관
+    # (스풀된 임시 파일은 복사하지 않고 옮긴다)
+    job_dir = os.path.join(JOB_DIR, "files", job_id)
+    os.makedirs(job_dir, exist_ok=True)
+    ext = os.path.splitext(upload.filename)[1]
+    source_path = await asyncio.to_thread(upload.persist, os.path.join(job_dir, f"input{ext}"))
+
+    await asyncio.to_thread(
+        app.state.job_store.create,
+        kind, upload.filename, source_path, upload.sha256, callback_url, job_id, options,
+    )
+    app.state.job_runner.notify()
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+
+_CALLBACK_URL_FIELD = {"callback_url": {"type": "string"}}
+
+
+@app.post("/jobs/parse-pdf", status_code=202, openapi_extra=_multipart_body(
+    {"file": False}, {**_CALLBACK_URL_FIELD, "ocr_fallback": {"type": "boolean", "default": PDF_OCR_FALLBACK}}
+))
+async def submit_pdf_job(request: Request):
+    """
+    PDF 파싱 작업을 제출하고 바로 job_id 를 반환합니다.
+    결과는 GET /jobs/{job_id} 로 조회하거나, callback_url 을 주면 완료 시 POST 로 전달됩니다.
+    ocr_fallback 은 /parse-pdf 와 같습니다 (스캔 페이지는 OCR).
+    """
+    form = await _read_form(request)
+    try:
+        upload = _form_file(form)
+        _check_pdf_filename(upload.filename)
+        metrics.set_file_types([upload.filename])
+        ocr_fallback = _form_bool(form, "ocr_fallback", PDF_OCR_FALLBACK)
+        return await _submit_job(
+            "parse-pdf", upload, form.fields.get("callback_url") or None, {"ocr_fallback": ocr_fallback}
+        )
+    finally:
+        form.close()
+
+
+@app.post("/jobs/ocr-image", status_code=202, openapi_extra=_multipart_body({"file": False}, _CALLBACK_URL_FIELD))
+async def submit_ocr_job(request: Request):
+    """
+    이미지 OCR 작업을 제출하고 바로 job_id 를 반환합니다.
+    결과는 GET /jobs/{job_id} 로 조회하거나, callback_url 을 주면 완료 시 POST 로 전달됩니다.
+    """
+    form = await _read_form(request)
+    try:
+        upload = _form_file(form)
+        _check_image_filename(upload.filename)
+        metrics.set_file_types([upload.filename])
+        return await _submit_job("ocr-image", upload, form.fields.get("callback_url") or None)
+    finally:
+        form.close()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """작업 상태 조회 (queued / running / succeeded / failed). 완료되면 result 에 결과가 담깁니다."""
+    job = await asyncio.to_thread(app.state.job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return public_job(job)
+
+
+@app.get("/jobs")
+async def job_counts():
+    """상태별 작업 개수"""
+    return await asyncio.to_thread(app.state.job_store.counts)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,271 @@
+"""비동기 OCR 작업 큐
+
+큰 PDF / 고해상도 이미지는 동기 엔드포인트에서 처리하면 ingress 타임아웃을 넘길 수 있다.
+작업을 제출하면 바로 job_id 를 돌려주고, 서버 안의 워커들이 순서대로 처리한다.
+- 작업 상태와 결과는 SQLite 에 저장 -> 서버가 재시작돼도 대기 중인 작업이 사라지지 않음
+- 클라이언트는 GET /jobs/{id} 로 폴링하거나, callback_url 로 결과를 받는다
+  (서버가 내부망으로 요청을 보내는 통로가 되지 않도록 callback_url 은 validate_callback_url 로 검사)
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import socket
+import sqlite3
+import threading
+import time
+import urllib.request
+import uuid
+from urllib.parse import urlsplit
+
+from executor import ExecutorSaturated
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class JobStore:
+    """작업 목록을 저장하는 SQLite 저장소 (스레드 안전)"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    source_path TEXT NOT NULL,
+                    sha256 TEXT,
+                    callback_url TEXT,
+                    options TEXT,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            # options 컬럼이 없던 이전 DB
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "options" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN options TEXT")
+
+    def create(self, kind, filename, source_path, sha256=None, callback_url=None, job_id=None, options=None):
+        """options: 작업 처리 옵션 dict (예: parse-pdf 의 ocr_fallback)"""
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, filename, source_path, sha256, callback_url, options, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, filename, source_path, sha256, callback_url,
+                 json.dumps(options) if options else None, QUEUED, time.time()),
+            )
+        return job_id
+
+    def claim_next(self):
+        """가장 오래된 queued 작업 하나를 running 으로 바꾸고 반환 (없으면 None)"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+        job = dict(row)
+        job["options"] = json.loads(job["options"]) if job["options"] else {}
+        return job
+
+    def finish(self, job_id, result):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+                (SUCCEEDED, json.dumps(result, ensure_ascii=False), time.time(), job_id),
+            )
+
+    def fail(self, job_id, error):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                (FAILED, error, time.time(), job_id),
+            )
+
+    def requeue_running(self):
+        """재시작 시 처리 도중 멈춘(running) 작업을 다시 queued 로 돌린다."""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+            )
+        return cur.rowcount
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["options"] = json.loads(job["options"]) if job["options"] else {}
+        return job
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def public_job(job: dict) -> dict:
+    """클라이언트에게 보여줄 작업 정보 (내부 파일 경로 등은 제외)"""
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "filename": job["filename"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+def validate_callback_url(url, allowed_hosts=()):
+    """
+    callback_url 검사. 문제가 있으면 ValueError
+    - http / https 만
+    - allowed_hosts 가 있으면 그 호스트만 (내부 서비스로 보내야 하면 여기에 등록)
+    - 없으면 호스트의 모든 주소가 공인 IP 여야 한다 (loopback / 사설망 / link-local 등 거부)
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url 은 http(s):// 주소여야 합니다.")
+    host = parts.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"허용되지 않은 callback 호스트입니다: {host}")
+        return
+    try:
+        infos = socket.getaddrinfo(host, parts.port or (443 if parts.scheme == "https" else 80), proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, ValueError) as e:
+        raise ValueError(f"callback 호스트를 찾을 수 없습니다: {host} ({e})")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise ValueError(f"내부 주소로는 callback 을 보낼 수 없습니다: {host} ({address})")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # 리다이렉트로 검사하지 않은 (내부) 주소로 넘어가지 않도록
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _post_callback(url, payload, allowed_hosts=()):
+    # 제출 뒤 DNS 가 바뀌었을 수 있으므로 보내기 직전에 다시 검사
+    validate_callback_url(url, allowed_hosts)
+    data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"}, method="POST")
+    with _callback_opener.open(req, timeout=10) as resp:
+        resp.read()
+
+
+class JobRunner:
+    """
+    JobStore 에서 queued 작업을 꺼내 처리하는 워커 풀.
+    handlers: {kind: async def handler(job) -> result(dict)}
+    실제 무거운 연산은 handler 안에서 기존 실행 백엔드(프로세스/스레드 풀)로 넘긴다.
+    callback_allowed_hosts: callback 을 보낼 수 있는 호스트 (비우면 공인 IP 주소만, validate_callback_url)
+    """
+
+    def __init__(self, store, handlers, workers=2, poll_interval=1.0, on_finished=None, callback_allowed_hosts=()):
+        self.store = store
+        self.callback_allowed_hosts = callback_allowed_hosts
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.on_finished = on_finished  # 작업이 끝난 뒤 호출 (입력 파일 정리 등)
+        self._wakeup = None
+        self._tasks = []
+
+    async def start(self):
+        requeued = await asyncio.to_thread(self.store.requeue_running)
+        if requeued:
+            logger.warning("재시작 전에 처리 중이던 작업 %d개를 다시 대기열에 넣었습니다.", requeued)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        """새 작업이 들어왔음을 워커에게 알린다."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self):
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._process(job)
+
+    async def _process(self, job):
+        handler = self.handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise ValueError(f"알 수 없는 작업 종류입니다: {job['kind']}")
+            while True:
+                try:
+                    result = await handler(job)
+                    break
+                except ExecutorSaturated:
+                    # 실행 백엔드가 바쁘면 작업을 실패 처리하지 않고 잠시 후 다시 시도
+                    await asyncio.sleep(self.poll_interval)
+            await asyncio.to_thread(self.store.finish, job["id"], result)
+        except asyncio.CancelledError:
+            # 서버 종료로 중단된 작업은 running 상태로 남고, 다음 시작 때 다시 대기열로 돌아간다
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.store.fail, job["id"], str(e))
+
+        if self.on_finished:
+            self.on_finished(job)
+
+        if job.get("callback_url"):
+            finished = await asyncio.to_thread(self.store.get, job["id"])
+            try:
+                await asyncio.to_thread(
+                    _post_callback, job["callback_url"], public_job(finished), self.callback_allowed_hosts
+                )
+            except Exception as e:
+                logger.warning("callback 전송 실패 (%s): %s", job["id"], e)
@@ -0,0 +1,99 @@
+"""OCR 처리량(images/sec) 측정용 부하 스크립트
+
+- single : /ocr-image 로 단일 이미지 요청을 동시에 보낸다 (서버 마이크로 배처가 묶어서 처리)
+- batch  : /ocr-images 로 --batch-size 장씩 묶어서 보낸다
+
+사용 예:
+    python load_ocr_batch.py --images ./scans --mode single --concurrency 16 --total 200
+    python load_ocr_batch.py --images ./scans --mode batch --batch-size 8 --concurrency 2 --total 200
+"""
+import argparse
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp')
+
+
+def load_images(path):
+    if os.path.isfile(path):
+        paths = [path]
+    else:
+        paths = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    if not paths:
+        raise SystemExit(f"이미지 파일이 없습니다: {path}")
+
+    images = []
+    for p in paths:
+        with open(p, "rb") as f:
+            images.append((os.path.basename(p), f.read()))
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8002")
+    parser.add_argument("--images", required=True, help="이미지 파일 또는 이미지가 들어있는 디렉터리")
+    parser.add_argument("--mode", choices=["single", "batch"], default="single")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--concurrency", "-c", type=int, default=8)
+    parser.add_argument("--total", "-n", type=int, default=100, help="보낼 전체 이미지 수")
+    args = parser.parse_args()
+
+    images = load_images(args.images)
+    image_cycle = itertools.cycle(images)
+    base_url = args.url.rstrip("/")
+
+    if args.mode == "single":
+        requests_payload = [[next(image_cycle)] for _ in range(args.total)]
+    else:
+        requests_payload = []
+        remaining = args.total
+        while remaining > 0:
+            size = min(args.batch_size, remaining)
+            requests_payload.append([next(image_cycle) for _ in range(size)])
+            remaining -= size
+
+    done_images = 0
+    failed_requests = 0
+    lock = threading.Lock()
+
+    def send(batch):
+        nonlocal done_images, failed_requests
+        if args.mode == "single":
+            name, contents = batch[0]
+            resp = requests.post(base_url + "/ocr-image", files={"file": (name, contents)})
+        else:
+            files = [("files", (name, contents)) for name, contents in batch]
+            resp = requests.post(base_url + "/ocr-images", files=files)
+        with lock:
+            if resp.status_code == 200:
+                done_images += len(batch)
+            else:
+                failed_requests += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(send, requests_payload))
+    elapsed = time.perf_counter() - start
+
+    print(f"mode={args.mode} concurrency={args.concurrency} requests={len(requests_payload)} "
+          f"images={done_images} failed_requests={failed_requests}")
+    print(f"elapsed={elapsed:.2f}s throughput={done_images / elapsed:.2f} images/s")
+
+    try:
+        stats = requests.get(base_url + "/executors", timeout=5).json().get("ocr_batcher")
+        print("batcher:", stats)
+    except requests.RequestException:
+        pass
+
+
+if __name__ == "__main__":
+    main()
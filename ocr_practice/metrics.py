@@ -0,0 +1,193 @@
+"""요청 / 단계별 소요시간 측정과 Prometheus 텍스트 형식 출력
+
+요청마다 RequestTimer 를 contextvar 에 올려두고, 처리 중인 코드가 단계별 시간을 기록한다.
+- upload_read : 업로드 스풀링
+- queue_wait  : 실행 백엔드 / 마이크로 배처 대기열에서 기다린 시간
+- decode      : 이미지 디코딩 + 전처리
+- inference   : 모델 추론(readtext) / PDF 텍스트 추출
+- serialize   : 응답 JSON 가공 + 직렬화
+요청이 끝나면 endpoint, file_type 라벨을 붙여 히스토그램에 반영한다.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            items = [(labels, list(series)) for labels, series in items]
+        for label_values, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = _format_labels(self.label_names + ("le",), label_values + (repr(float(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.label_names + ("le",), label_values + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            base = _format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{base} {series[-2]}")
+            lines.append(f"{self.name}_count{base} {series[-1]}")
+        return lines
+
+
+def render_gauges(name, help_text, samples, metric_type="gauge"):
+    """samples: [(labels dict, value)] -> Prometheus 텍스트 줄 목록 (스크랩 시점에 값을 읽는 지표용)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "ocr_request_duration_seconds",
+    "End-to-end request duration.",
+    ("endpoint", "file_type", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "ocr_stage_duration_seconds",
+    "Duration of each processing stage (upload_read, queue_wait, decode, inference, serialize).",
+    ("endpoint", "file_type", "stage"),
+)
+
+
+def file_type_of(filename):
+    ext = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if ext == "jpg":
+        ext = "jpeg"
+    return ext or "unknown"
+
+
+class RequestTimer:
+    def __init__(self, endpoint, file_type="unknown"):
+        self.endpoint = endpoint
+        self.file_type = file_type
+        self._lock = threading.Lock()
+        self._stages = {}  # stage -> 요청 하나에서 쓴 시간 합계 (이미지 여러 장이면 더한 값)
+
+    def set_file_types(self, filenames):
+        types = {file_type_of(name) for name in filenames}
+        self.file_type = types.pop() if len(types) == 1 else "mixed"
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+
+    def finish(self, status, seconds):
+        with self._lock:
+            stages = list(self._stages.items())
+        for stage, stage_seconds in stages:
+            STAGE_SECONDS.observe(stage_seconds, self.endpoint, self.file_type, stage)
+        REQUEST_SECONDS.observe(seconds, self.endpoint, self.file_type, str(status))
+
+
+_current_timer = contextvars.ContextVar("ocr_request_timer", default=None)
+
+
+def current_timer():
+    return _current_timer.get()
+
+
+def set_file_types(filenames):
+    timer = current_timer()
+    if timer is not None:
+        timer.set_file_types(filenames)
+
+
+def record_stage(stage, seconds, timer=None):
+    timer = timer or current_timer()
+    if timer is not None:
+        timer.record(stage, seconds)
+
+
+@contextmanager
+def stage(name):
+    """with metrics.stage("upload_read"): ... 또는 @metrics.stage("serialize") 형태로 현재 요청의 단계 시간을 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+@contextmanager
+def track(endpoint, file_type="unknown"):
+    """HTTP 요청 밖(작업 큐 등)에서 처리 단위 하나를 측정할 때 사용"""
+    timer = RequestTimer(endpoint, file_type)
+    token = _current_timer.set(timer)
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield timer
+        status = "ok"
+    finally:
+        _current_timer.reset(token)
+        timer.finish(status, time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """지정한 경로의 요청마다 RequestTimer 를 만들고, 응답이 끝나면(스트리밍 포함) 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app, paths):
+        self.app = app
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer(scope["path"])
+        token = _current_timer.set(timer)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_timer.reset(token)
+            timer.finish(status, time.perf_counter() - start)
+
+
+def render(extra_lines=()):
+    lines = REQUEST_SECONDS.render() + STAGE_SECONDS.render() + list(extra_lines)
+    return "\n".join(lines) + "\n"
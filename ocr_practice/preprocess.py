@@ -0,0 +1,177 @@
+"""EasyOCR 입력 이미지 전처리
+
+원본 이미지를 그대로 readtext 에 넣으면 12MP 휴대폰 사진처럼 큰 이미지는 필요 이상으로 느리다.
+1) EXIF 회전 정보 적용 (세로로 찍은 사진이 눕혀져 들어오지 않도록)
+2) 흑백 변환 (EasyOCR 은 내부적으로 흑백 이미지를 사용)
+3) 축소: DPI 정보가 있으면 본문 글자 높이가 target_text_height 픽셀이 되도록,
+   그리고 긴 변이 max_side 를 넘지 않도록 (확대는 하지 않음)
+4) (선택) 아주 큰 이미지는 겹치는 타일로 나눠서 OCR
+
+OCR 결과 좌표는 map_bbox 로 원본(EXIF 회전 적용 후) 이미지 좌표로 되돌린다.
+"""
+import os
+
+import numpy as np
+from PIL import Image, ImageOps
+
+
+class PreprocessConfig:
+    def __init__(
+        self,
+        enabled=True,
+        exif_transpose=True,
+        grayscale=True,
+        target_text_height=24,
+        assumed_text_pt=10,
+        max_side=2560,
+        tile_size=0,
+        tile_overlap=128,
+    ):
+        self.enabled = enabled
+        self.exif_transpose = exif_transpose
+        self.grayscale = grayscale
+        # DPI 기준 축소: 본문 글자(assumed_text_pt 포인트)가 target_text_height 픽셀이 되도록
+        self.target_text_height = target_text_height
+        self.assumed_text_pt = assumed_text_pt
+        # 긴 변 최대 길이 (0 이면 제한 없음). EasyOCR detector 기본 canvas_size 가 2560
+        self.max_side = max_side
+        # 타일 크기 (0 이면 타일링 안 함). 축소 후에도 이보다 큰 이미지는 타일로 나눈다
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            enabled=os.getenv("OCR_PREPROCESS", "1") == "1",
+            exif_transpose=os.getenv("OCR_EXIF_TRANSPOSE", "1") == "1",
+            grayscale=os.getenv("OCR_GRAYSCALE", "1") == "1",
+            target_text_height=int(os.getenv("OCR_TARGET_TEXT_HEIGHT", "24")),
+            assumed_text_pt=float(os.getenv("OCR_ASSUMED_TEXT_PT", "10")),
+            max_side=int(os.getenv("OCR_MAX_SIDE", "2560")),
+            tile_size=int(os.getenv("OCR_TILE_SIZE", "0")),
+            tile_overlap=int(os.getenv("OCR_TILE_OVERLAP", "128")),
+        )
+
+    def as_dict(self):
+        # 결과 캐시 키에 포함 (전처리 설정이 바뀌면 이전 결과를 재사용하지 않음)
+        return dict(vars(self))
+
+
+class Tile:
+    """
+    전처리된 이미지 조각 하나.
+    (x, y): 전처리된 이미지 안에서 이 타일의 왼쪽 위 좌표
+    core: 이 타일이 책임지는 영역 (x0, y0, x1, y1). 겹치는 부분에서 중복 검출을 거르는 데 사용
+    """
+
+    def __init__(self, array, x, y, core):
+        self.array = array
+        self.x = x
+        self.y = y
+        self.core = core
+
+
+class PreparedImage:
+    def __init__(self, tiles, scale, original_size):
+        self.tiles = tiles
+        self.scale = scale  # 전처리 이미지 크기 / 원본 크기
+        self.original_size = original_size  # (width, height), EXIF 회전 적용 후
+
+
+def compute_scale(size, dpi, config):
+    """원본 크기와 DPI 로 축소 비율을 계산한다. (1.0 이하)"""
+    width, height = size
+    scale = 1.0
+
+    if dpi and dpi > 0 and config.target_text_height > 0 and config.assumed_text_pt > 0:
+        # 해당 DPI 에서 assumed_text_pt 포인트 글자의 픽셀 높이
+        text_height_px = config.assumed_text_pt / 72 * dpi
+        scale = min(scale, config.target_text_height / text_height_px)
+
+    if config.max_side > 0:
+        scale = min(scale, config.max_side / max(width, height))
+
+    return scale
+
+
+def _image_dpi(image):
+    dpi = image.info.get("dpi")
+    if not dpi:
+        return None
+    try:
+        return float(min(dpi))
+    except (TypeError, ValueError):
+        return None
+
+
+def _split_tiles(array, tile_size, overlap):
+    height, width = array.shape[:2]
+    if tile_size <= 0 or max(width, height) <= tile_size:
+        return [Tile(array, 0, 0, (0, 0, width, height))]
+
+    step = max(1, tile_size - overlap)
+    xs = list(range(0, max(1, width - overlap), step))
+    ys = list(range(0, max(1, height - overlap), step))
+    half = overlap // 2
+
+    tiles = []
+    for y in ys:
+        for x in xs:
+            x1 = min(x + tile_size, width)
+            y1 = min(y + tile_size, height)
+            # 이웃 타일과 겹치는 부분은 절반씩 나눠서 책임진다
+            core = (
+                0 if x == 0 else x + half,
+                0 if y == 0 else y + half,
+                width if x1 == width else x1 - half,
+                height if y1 == height else y1 - half,
+            )
+            tiles.append(Tile(array[y:y1, x:x1], x, y, core))
+    return tiles
+
+
+def prepare_image(image, config):
+    """PIL 이미지를 전처리해서 OCR 에 넣을 타일 목록과 좌표 변환 정보를 만든다."""
+    if not config.enabled:
+        array = np.array(image)
+        height, width = array.shape[:2]
+        return PreparedImage([Tile(array, 0, 0, (0, 0, width, height))], 1.0, (width, height))
+
+    dpi = _image_dpi(image)
+    if config.exif_transpose:
+        image = ImageOps.exif_transpose(image)
+
+    image = image.convert("L" if config.grayscale else "RGB")
+    original_size = image.size
+
+    scale = compute_scale(original_size, dpi, config)
+    if scale < 1.0:
+        new_size = (max(1, round(original_size[0] * scale)), max(1, round(original_size[1] * scale)))
+        image = image.resize(new_size, Image.LANCZOS)
+        # 반올림 오차를 반영한 실제 비율
+        scale = new_size[0] / original_size[0]
+
+    array = np.array(image)
+    return PreparedImage(_split_tiles(array, config.tile_size, config.tile_overlap), scale, original_size)
+
+
+def map_results(prepared, tile_results):
+    """
+    타일별 readtext 결과를 원본 이미지 좌표의 결과 하나로 합친다.
+    tile_results: prepared.tiles 와 같은 순서의 readtext 결과 목록
+    """
+    merged = []
+    for tile, extracted_data in zip(prepared.tiles, tile_results):
+        x0, y0, x1, y1 = tile.core
+        for bbox, text, conf in extracted_data:
+            points = [(float(x) + tile.x, float(y) + tile.y) for x, y in bbox]
+
+            # 겹치는 영역의 중복 검출 제거: 박스 중심이 이 타일의 core 안에 있을 때만 채택
+            cx = sum(p[0] for p in points) / len(points)
+            cy = sum(p[1] for p in points) / len(points)
+            if not (x0 <= cx < x1 and y0 <= cy < y1):
+                continue
+
+            original = [[round(x / prepared.scale), round(y / prepared.scale)] for x, y in points]
+            merged.append((original, text, conf))
+    return merged
@@ -0,0 +1,66 @@
+"""EasyOCR Reader 풀
+
+easyocr.Reader 는 생성할 때마다 detector / recognizer 가중치를 다시 로드하기 때문에
+요청마다 만들면 이미지 한 장 처리에 수 초가 걸린다.
+서버 시작 시점에 Reader 를 미리 로드해두고, 요청에서는 빌려 쓰고 반납한다.
+풀 크기가 곧 동시에 OCR 을 돌릴 수 있는 최대 개수가 된다.
+"""
+import queue
+import threading
+from contextlib import contextmanager
+
+import easyocr
+
+
+class ReaderPoolTimeout(Exception):
+    """정해진 시간 안에 사용 가능한 Reader 를 얻지 못한 경우"""
+
+
+class ReaderPool:
+    def __init__(self, langs, size=1, gpu=False):
+        if size < 1:
+            raise ValueError("ReaderPool size는 1 이상이어야 합니다.")
+        self.langs = list(langs)
+        self.size = size
+        self.gpu = gpu
+        self._readers = queue.Queue(maxsize=size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+
+        # 모델 로드는 여기서 한 번만 수행 (warm reader)
+        for _ in range(size):
+            self._readers.put(easyocr.Reader(self.langs, gpu=gpu))
+
+    @contextmanager
+    def acquire(self, timeout=None):
+        """
+        Reader 하나를 빌려온다. 모두 사용 중이면 timeout 초까지 기다린다.
+        with pool.acquire() as reader:
+            reader.readtext(...)
+        """
+        try:
+            reader = self._readers.get(timeout=timeout)
+        except queue.Empty:
+            raise ReaderPoolTimeout(f"{timeout}초 안에 사용 가능한 OCR Reader가 없습니다.")
+
+        with self._lock:
+            self._in_use += 1
+        try:
+            yield reader
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._readers.put(reader)
+
+    def stats(self):
+        with self._lock:
+            in_use = self._in_use
+        return {"size": self.size, "in_use": in_use, "available": self.size - in_use}
+
+    def close(self):
+        # Reader 참조를 정리해서 모델 메모리가 해제되도록 한다
+        while True:
+            try:
+                self._readers.get_nowait()
+            except queue.Empty:
+                break
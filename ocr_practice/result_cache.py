@@ -0,0 +1,158 @@
+"""업로드 내용 기반(content-addressed) 결과 캐시
+
+같은 파일을 다시 올리면 PyPDF2 / EasyOCR 을 다시 돌리지 않고 이전 결과를 돌려준다.
+- 키: 업로드 바이트의 SHA-256 + 엔진 옵션(엔진 이름, 언어 등)
+- 1단계: 메모리 LRU (항목 개수 제한)
+- 2단계: 디스크 (JSON 파일, 전체 용량 제한. 넘으면 가장 오래 안 쓴 파일부터 삭제)
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+def make_cache_key(content_sha256: str, options: dict) -> str:
+    """업로드 해시와 엔진 옵션을 합쳐서 캐시 키를 만든다."""
+    options_json = json.dumps(options, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{content_sha256}:{options_json}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, memory_items=256, disk_dir=None, disk_max_bytes=512 * 1024 * 1024):
+        self.memory_items = memory_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> value (가장 최근 사용이 뒤쪽)
+        self._disk_index = OrderedDict()  # key -> 파일 크기 (가장 최근 사용이 뒤쪽)
+        self._disk_bytes = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    # ---------------- 디스크 ----------------
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        # 재시작 시 기존 캐시 파일을 마지막 사용 시각(mtime) 순서로 인덱스에 올린다
+        entries = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                if not name.endswith(".json"):
+                    continue
+                st = os.stat(os.path.join(root, name))
+                entries.append((st.st_mtime, name[:-5], st.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+    def _disk_get(self, key):
+        if key not in self._disk_index:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self._disk_bytes -= self._disk_index.pop(key)
+            return None
+        self._disk_index.move_to_end(key)
+        os.utime(path)  # 재시작 후에도 LRU 순서를 유지하도록 mtime 갱신
+        return value
+
+    def _disk_set(self, key, value):
+        data = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if len(data) > self.disk_max_bytes:
+            return
+
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+        self._disk_index[key] = len(data)
+        self._disk_bytes += len(data)
+
+        # 용량 초과 시 가장 오래 사용하지 않은 항목부터 삭제
+        while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+            old_key, size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= size
+            self._counters["disk_evictions"] += 1
+            try:
+                os.remove(self._disk_path(old_key))
+            except OSError:
+                pass
+
+    # ---------------- 메모리 ----------------
+    def _memory_set(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    # ---------------- 공개 API ----------------
+    def get(self, key):
+        """
+        캐시 조회. 반환: (value, tier)
+        tier 는 "memory" / "disk" / None(miss)
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return self._memory[key], "memory"
+
+            if self.disk_dir:
+                value = self._disk_get(key)
+                if value is not None:
+                    # 디스크에서 찾은 값은 메모리로 올려둔다
+                    self._memory_set(key, value)
+                    self._counters["disk_hits"] += 1
+                    return value, "disk"
+
+            self._counters["misses"] += 1
+            return None, None
+
+    def set(self, key, value):
+        with self._lock:
+            self._memory_set(key, value)
+            if self.disk_dir:
+                self._disk_set(key, value)
+            self._counters["stores"] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            memory_items = len(self._memory)
+            disk_items = len(self._disk_index)
+            disk_bytes = self._disk_bytes
+
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_items": memory_items,
+            "memory_max_items": self.memory_items,
+            "disk_enabled": bool(self.disk_dir),
+            "disk_items": disk_items,
+            "disk_bytes": disk_bytes,
+            "disk_max_bytes": self.disk_max_bytes,
+        }
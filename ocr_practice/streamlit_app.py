@@ -2,10 +2,67 @@ import streamlit as st
 import requests
 from PIL import Image
 import io
+import json
+import time
 
 # FastAPI 서버 URL 설정
 FASTAPI_URL = "http://localhost:8002"
 
+# 이 크기보다 큰 파일은 동기 요청 대신 작업 큐(/jobs)로 보내고 결과를 폴링
+LARGE_FILE_MB = 10
+JOB_POLL_INTERVAL = 1.0
+# 작업을 기다리는 최대 시간(초). 넘기면 폴링을 멈추고 작업 ID 만 알려준다 (작업은 서버에서 계속 진행)
+JOB_POLL_TIMEOUT = 600
+# 상태 조회가 연속으로 이 횟수만큼 실패하면 (서버 다운 등) 폴링을 멈춘다
+JOB_POLL_MAX_ERRORS = 5
+REQUEST_TIMEOUT = 30
+
+
+def run_as_job(job_endpoint, files, status_text):
+    """
+    작업 큐에 파일을 제출하고 끝날 때까지 상태를 폴링한다.
+    JOB_POLL_TIMEOUT 초가 지나거나 상태 조회가 계속 실패하면 기다리기를 그만둔다.
+    반환: 작업 결과(dict). 실패하거나 기다리기를 그만두면 None
+    """
+    try:
+        resp = requests.post(FASTAPI_URL + job_endpoint, files=files, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        st.error(f"작업 제출 실패: {e}")
+        return None
+    if resp.status_code != 202:
+        st.error(f"작업 제출 실패: {resp.text}")
+        return None
+
+    job = resp.json()
+    job_url = FASTAPI_URL + f"/jobs/{job['job_id']}"
+    status_box = st.empty()
+    deadline = time.monotonic() + JOB_POLL_TIMEOUT
+    errors = 0
+    while job["status"] not in ("succeeded", "failed"):
+        status_box.info(f"{status_text} (작업 ID: {job['job_id']}, 상태: {job['status']})")
+        if time.monotonic() > deadline:
+            status_box.empty()
+            st.warning(f"{JOB_POLL_TIMEOUT}초 안에 작업이 끝나지 않았습니다. 결과는 나중에 {job_url} 에서 확인하세요.")
+            return None
+        time.sleep(JOB_POLL_INTERVAL)
+        try:
+            resp = requests.get(job_url, timeout=REQUEST_TIMEOUT)
+            resp.raise_for_status()
+            job = resp.json()
+            errors = 0
+        except requests.RequestException as e:
+            errors += 1
+            if errors >= JOB_POLL_MAX_ERRORS:
+                status_box.empty()
+                st.error(f"작업 상태를 확인할 수 없습니다 ({e}). 결과는 나중에 {job_url} 에서 확인하세요.")
+                return None
+    status_box.empty()
+
+    if job["status"] == "failed":
+        st.error(f"작업 실패: {job['error']}")
+        return None
+    return job["result"]
+
 # 페이지 설정
 st.set_page_config(
     page_title="PDF & OCR 웹앱",
@@ -35,24 +92,79 @@ with pdf_col1:
     if pdf_file is not None:
         st.success(f"✅ 파일 선택됨: {pdf_file.name}")
         st.info(f"파일 크기: {pdf_file.size / 1024:.2f} KB")
+
+        # 스트리밍 모드: 페이지가 추출되는 대로 바로 화면에 표시
+        stream_mode = st.checkbox("페이지별 스트리밍 (추출되는 대로 표시)", value=True, key="pdf_stream_mode")
         
         # 파싱 버튼
         if st.button("📋 PDF 파싱 시작", key="parse_pdf_btn", use_container_width=True):
             
-            with st.spinner("PDF 파싱 중..."):
-                # FastAPI로 파일 전송
-                files = {
-                    "file": (pdf_file.name, pdf_file.getvalue(), "application/pdf")
-                }
-                ########################################
-                ### 필수과제 1-(1): streamlit -> fastapi로 사용자가 업로드한 pdf 파일 파싱 요청
-                pdf_parse_url = FASTAPI_URL + "/parse-pdf"
+            # FastAPI로 파일 전송
+            files = {
+                "file": (pdf_file.name, pdf_file.getvalue(), "application/pdf")
+            }
+
+            if pdf_file.size > LARGE_FILE_MB * 1024 * 1024:
+                # 큰 파일은 요청 타임아웃을 피하기 위해 작업 큐로 처리
+                result = run_as_job("/jobs/parse-pdf", files, "큰 PDF 파일을 작업 큐에서 파싱 중...")
+                if result:
+                    st.session_state.pdf_result = result
+            elif stream_mode:
+                # NDJSON 응답을 한 줄씩 읽으면서 오른쪽 컬럼에 페이지를 바로 그린다
+                live = pdf_col2.empty()
+                box = live.container()
+                progress = box.progress(0.0, text="PDF 파싱 중...")
+                total_pages = 0
+                pages = []
+                summary = None
+
+                with requests.post(FASTAPI_URL + "/parse-pdf-stream", files=files, stream=True) as resp:
+                    if resp.status_code != 200:
+                        st.error(f"PDF 파싱 실패: {resp.text}")
+                    else:
+                        for line in resp.iter_lines():
+                            if not line:
+                                continue
+                            record = json.loads(line)
+                            if record["type"] == "start":
+                                total_pages = record["total_pages"]
+                            elif record["type"] == "page":
+                                pages.append({"page_number": record["page_number"], "text": record["text"]})
+                                with box.expander(f"{record['page_number']} 페이지"):
+                                    st.text(record["text"])
+                                progress.progress(min(1.0, len(pages) / max(1, total_pages)),
+                                                  text=f"{len(pages)} / {total_pages} 페이지 추출됨")
+                            elif record["type"] == "summary":
+                                summary = record
+                            elif record["type"] == "error":
+                                st.error(record["detail"])
+
+                if summary:
+                    # 스트리밍이 끝나면 /parse-pdf 와 같은 형태로 모아서 저장 (페이지 번호 순 정렬)
+                    pages.sort(key=lambda p: p["page_number"])
+                    extracted_text = "".join(
+                        f"\n--- 페이지 {p['page_number']} ---\n{p['text']}" for p in pages
+                    )
+                    st.session_state.pdf_result = {
+                        "success": True,
+                        "filename": summary["filename"],
+                        "total_pages": summary["total_pages"],
+                        "extracted_text": extracted_text,
+                        "pages": pages,
+                        "text_length": summary["text_length"]
+                    }
+                    live.empty()
+            else:
+                with st.spinner("PDF 파싱 중..."):
+                    ########################################
+                    ### 필수과제 1-(1): streamlit -> fastapi로 사용자가 업로드한 pdf 파일 파싱 요청
+                    pdf_parse_url = FASTAPI_URL + "/parse-pdf"
 
-                resp = requests.post(pdf_parse_url, files = files)
+                    resp = requests.post(pdf_parse_url, files = files)
 
-                st.session_state.pdf_result = resp.json()
+                    st.session_state.pdf_result = resp.json()
 
-                ########################################
+                    ########################################
 
 with pdf_col2:
     st.subheader("📝 추출된 텍스트")
@@ -90,13 +202,13 @@ with pdf_col2:
 
             pages = result["pages"]
 
-            for page_num, page in enumerate(pages):
-                with st.expander(f"{page_num + 1} 페이지"):
+            for page in pages:
+                with st.expander(f"{page['page_number']} 페이지"):
                     st.text_area(
                                 "추출된 텍스트",
-                                value=page,
+                                value=page["text"],
                                 height=400,
-                                key="pdf_page_text"
+                                key=f"pdf_page_text_{page['page_number']}"
                             )
 
     else:
@@ -139,16 +251,22 @@ with ocr_col1:
                 files = {
                     "file": (image_file.name, image_file.getvalue(), f"image/{image_file.type}")
                 }
-                ########################################
-                ### 필수과제 2-(1): streamlit -> fastapi로 사용자가 업로드한 이미지 파일 파싱 요청
+                if image_file.size > LARGE_FILE_MB * 1024 * 1024:
+                    # 큰 이미지는 요청 타임아웃을 피하기 위해 작업 큐로 처리
+                    result = run_as_job("/jobs/ocr-image", files, "큰 이미지를 작업 큐에서 OCR 처리 중...")
+                    if result:
+                        st.session_state.ocr_result = result
+                else:
+                    ########################################
+                    ### 필수과제 2-(1): streamlit -> fastapi로 사용자가 업로드한 이미지 파일 파싱 요청
 
-                img_parse_url = FASTAPI_URL + "/ocr-image"
+                    img_parse_url = FASTAPI_URL + "/ocr-image"
 
-                resp = requests.post(img_parse_url, files = files)
+                    resp = requests.post(img_parse_url, files = files)
 
-                st.session_state.ocr_result = resp.json()
+                    st.session_state.ocr_result = resp.json()
 
-                ########################################
+                    ########################################
 
 with ocr_col2:
     st.subheader("📝 추출된 텍스트")
@@ -0,0 +1,302 @@
+"""업로드 파일 스풀링
+
+await file.read() 로 전체를 읽으면 업로드 하나당 파일 크기만큼 메모리를 차지한다.
+청크 단위로 읽으면서
+- 최대 크기를 넘으면 바로 중단하고 (413)
+- 작은 파일은 메모리에, 큰 파일은 임시 파일(디스크)에 저장하고
+- 읽는 동안 SHA-256 도 함께 계산한다 (결과 캐시 키로 사용)
+디스크에 저장된 PDF 는 mmap 으로 열어서 파싱하고, 이미지는 파일 경로에서 바로 디코딩한다.
+
+UploadFile(File(...)) 파라미터를 쓰면 Starlette 가 multipart 본문 전체를 먼저 임시 파일로 받아 두므로
+최대 크기 검사가 다 받은 뒤에야 되고 디스크에 두 번 쓰게 된다. read_multipart 는 요청 본문(request.stream())을
+직접 파싱하면서 파일 부분을 바로 스풀링한다.
+- Content-Length 가 최대 요청 크기를 넘으면 본문을 읽기 전에 거부
+- 읽는 중에도 요청 / 파일 크기를 세어서 넘는 순간 중단 (Content-Length 가 없는 chunked 요청 포함)
+"""
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+CHUNK_SIZE = 1024 * 1024
+# multipart 의 파일이 아닌 필드(callback_url 등) 하나의 최대 크기
+MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """업로드 크기가 최대 허용 크기를 넘은 경우"""
+
+
+class InvalidUpload(Exception):
+    """multipart 요청 형식이 잘못됐거나 필요한 필드가 없는 경우"""
+
+
+class SpooledUpload:
+    def __init__(self, filename):
+        self.filename = filename
+        self.size = 0
+        self.sha256 = None
+        self.path = None  # 디스크에 저장된 경우 임시 파일 경로
+        self.data = None  # 메모리에 저장된 경우 bytes
+
+    @property
+    def source(self):
+        """
+        워커 함수에 넘길 입력: 디스크에 있으면 파일 경로(str), 메모리에 있으면 bytes.
+        프로세스 풀에 경로만 넘기면 파일 내용을 pickle 로 복사하지 않아도 된다.
+        """
+        return self.path if self.path is not None else self.data
+
+    def persist(self, dest_path):
+        """
+        업로드 내용을 dest_path 로 옮겨서 보관한다 (작업 큐처럼 요청이 끝난 뒤에도 필요할 때).
+        임시 파일이면 이동만 하고, 메모리에 있으면 파일로 쓴다.
+        """
+        if self.path is not None:
+            shutil.move(self.path, dest_path)
+            self.path = None
+        else:
+            with open(dest_path, "wb") as f:
+                f.write(self.data)
+            self.data = None
+        return dest_path
+
+    def close(self):
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+        self.data = None
+
+
+class _Spooler:
+    """
+    청크를 받는 대로 SpooledUpload 에 쓴다.
+    memory_limit 보다 커지면 그때부터 spool_dir 의 임시 파일로 옮겨 쓰고, max_bytes 를 넘으면 UploadTooLarge.
+    """
+
+    def __init__(self, filename, max_bytes, memory_limit, spool_dir=None):
+        self.upload = SpooledUpload(filename)
+        self.max_bytes = max_bytes
+        self.memory_limit = memory_limit
+        self.spool_dir = spool_dir
+        self._digest = hashlib.sha256()
+        self._chunks = []
+        self._fp = None
+
+    def write(self, chunk):
+        upload = self.upload
+        upload.size += len(chunk)
+        if upload.size > self.max_bytes:
+            raise UploadTooLarge(
+                f"업로드 파일이 너무 큽니다. (최대 {self.max_bytes // (1024 * 1024)} MB)"
+            )
+        self._digest.update(chunk)
+
+        if self._fp is None and upload.size > self.memory_limit:
+            # 메모리 한도를 넘었으므로 지금까지 모은 청크를 디스크로 옮긴다
+            fd, upload.path = tempfile.mkstemp(prefix="upload-", dir=self.spool_dir)
+            self._fp = os.fdopen(fd, "wb")
+            for buffered in self._chunks:
+                self._fp.write(buffered)
+            self._chunks = []
+
+        if self._fp is not None:
+            self._fp.write(chunk)
+        else:
+            self._chunks.append(chunk)
+
+    def finish(self) -> SpooledUpload:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        else:
+            self.upload.data = b"".join(self._chunks)
+            self._chunks = []
+        self.upload.sha256 = self._digest.hexdigest()
+        return self.upload
+
+    def abort(self):
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        self._chunks = []
+        self.upload.close()
+
+
+async def spool_upload(file, max_bytes, memory_limit, spool_dir=None) -> SpooledUpload:
+    """
+    UploadFile(또는 async read(size) 가 있는 객체)을 청크 단위로 읽어서 SpooledUpload 로 만든다.
+    memory_limit 보다 커지면 그때부터 spool_dir 의 임시 파일로 옮겨 쓴다.
+    max_bytes 를 넘으면 UploadTooLarge.
+    """
+    spooler = _Spooler(file.filename, max_bytes, memory_limit, spool_dir)
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            spooler.write(chunk)
+    except BaseException:
+        spooler.abort()
+        raise
+    return spooler.finish()
+
+
+class MultipartForm:
+    """read_multipart 결과. fields: {이름: 문자열}, files: {이름: [SpooledUpload, ...]}"""
+
+    def __init__(self):
+        self.fields = {}
+        self.files = {}
+
+    def file(self, name) -> SpooledUpload:
+        uploads = self.files.get(name)
+        if not uploads:
+            raise InvalidUpload(f"'{name}' 파일 필드가 필요합니다.")
+        return uploads[0]
+
+    def close(self):
+        for uploads in self.files.values():
+            for upload in uploads:
+                upload.close()
+
+
+class _MultipartReader:
+    """python-multipart 파서 콜백: 파일 부분은 _Spooler 로 바로 쓰고, 나머지 필드는 문자열로 모은다"""
+
+    def __init__(self, form, max_bytes, memory_limit, spool_dir):
+        self.form = form
+        self.max_bytes = max_bytes
+        self.memory_limit = memory_limit
+        self.spool_dir = spool_dir
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._name = None
+        self._spooler = None
+        self._data = bytearray()
+        self.finished = False
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._name = None
+        self._spooler = None
+        self._data = bytearray()
+
+    def on_header_field(self, data, start, end):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise InvalidUpload('multipart 부분에 Content-Disposition name 이 없습니다.')
+        self._name = options[b"name"].decode("utf-8", errors="replace")
+        if b"filename" in options:
+            filename = options[b"filename"].decode("utf-8", errors="replace")
+            self._spooler = _Spooler(filename, self.max_bytes, self.memory_limit, self.spool_dir)
+
+    def on_part_data(self, data, start, end):
+        if self._spooler is not None:
+            self._spooler.write(data[start:end])
+            return
+        if len(self._data) + end - start > MAX_FIELD_BYTES:
+            raise InvalidUpload(f"'{self._name}' 필드가 너무 깁니다. (최대 {MAX_FIELD_BYTES // 1024} KB)")
+        self._data += data[start:end]
+
+    def on_part_end(self):
+        if self._spooler is not None:
+            self.form.files.setdefault(self._name, []).append(self._spooler.finish())
+            self._spooler = None
+        else:
+            self.form.fields[self._name] = self._data.decode("utf-8", errors="replace")
+
+    def on_end(self):
+        self.finished = True
+
+    def abort(self):
+        if self._spooler is not None:
+            self._spooler.abort()
+            self._spooler = None
+
+
+async def read_multipart(request, max_bytes, max_request_bytes, memory_limit, spool_dir=None) -> MultipartForm:
+    """
+    multipart/form-data 요청 본문을 스트리밍으로 파싱한다. 파일 하나는 max_bytes, 요청 전체는 max_request_bytes 까지.
+    넘으면 UploadTooLarge, 형식이 잘못됐으면 InvalidUpload. 반환한 MultipartForm 은 다 쓴 뒤 close() 해야 한다.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise InvalidUpload("multipart/form-data 요청이어야 합니다.")
+    too_large = UploadTooLarge(f"요청 본문이 너무 큽니다. (최대 {max_request_bytes // (1024 * 1024)} MB)")
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_request_bytes:
+        # 본문을 읽기 전에 거부
+        raise too_large
+
+    form = MultipartForm()
+    reader = _MultipartReader(form, max_bytes, memory_limit, spool_dir)
+    callbacks = {
+        name: getattr(reader, name)
+        for name in ("on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+                     "on_headers_finished", "on_part_data", "on_part_end", "on_end")
+    }
+    parser = MultipartParser(params[b"boundary"], callbacks)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes:
+                raise too_large
+            parser.write(chunk)
+        parser.finalize()
+        if not reader.finished:
+            # 마지막 boundary 전에 본문이 끝남 (클라이언트가 도중에 끊은 경우 등)
+            raise InvalidUpload("multipart 본문이 도중에 끝났습니다.")
+    except BaseException as e:
+        reader.abort()
+        form.close()
+        if isinstance(e, (UploadTooLarge, InvalidUpload)) or not isinstance(e, Exception):
+            raise
+        # python-multipart 파싱 오류 (잘린 본문, 잘못된 boundary 등)
+        raise InvalidUpload(f"multipart 본문을 읽을 수 없습니다: {e}") from e
+    return form
+
+
+@contextmanager
+def open_source(source):
+    """
+    워커 함수 입력(source)을 읽기용 바이너리 스트림으로 연다.
+    - 파일 경로: mmap 으로 매핑 (페이지 캐시를 그대로 사용하므로 힙에 복사본이 생기지 않음)
+    - bytes: BytesIO (bytes 버퍼를 공유하므로 복사하지 않음)
+    """
+    if isinstance(source, (bytes, bytearray)):
+        yield io.BytesIO(source)
+        return
+
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # 빈 파일은 mmap 할 수 없다
+            yield io.BytesIO(b"")
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
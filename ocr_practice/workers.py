@@ -0,0 +1,144 @@
+"""풀(스레드/프로세스)에서 실행되는 작업 함수 모음
+
+프로세스 풀에서 실행하려면 pickle 가능한 모듈 최상위 함수여야 하므로
+fastapi_app.py 와 분리해 둔다.
+"""
+import time
+
+import numpy as np
+import PyPDF2
+from PIL import Image
+
+try:
+    # 스캔 PDF 페이지 래스터화용 (선택 설치: pip install pypdfium2)
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+from preprocess import PreparedImage, PreprocessConfig, map_results, prepare_image
+from uploads import open_source
+
+# source: 업로드 파일의 임시 파일 경로(str) 또는 bytes (uploads.SpooledUpload.source)
+
+
+def extract_pdf_pages(source) -> list[str]:
+    """PDF 에서 페이지별 텍스트를 추출한다."""
+    with open_source(source) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        return [page.extract_text() for page in pdf_reader.pages]
+
+
+def extract_pdf_pages_timed(source) -> list[tuple[str, float]]:
+    """PDF 에서 페이지별 (텍스트, 추출 소요시간 ms) 를 추출한다."""
+    with open_source(source) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        pages = []
+        for page in pdf_reader.pages:
+            start = time.perf_counter()
+            text = page.extract_text()
+            pages.append((text, (time.perf_counter() - start) * 1000))
+        return pages
+
+
+def render_pdf_page(source, page_index: int, dpi: int):
+    """
+    PDF 한 페이지를 흑백 이미지(numpy array)로 래스터화한다. (텍스트 레이어가 없는 스캔 페이지 OCR 용)
+    반환: (page_index, 이미지 array, 렌더링 소요시간 ms)
+    """
+    if pdfium is None:
+        raise RuntimeError("스캔 PDF OCR 에는 pypdfium2 가 필요합니다. (pip install pypdfium2)")
+
+    start = time.perf_counter()
+    pdf = pdfium.PdfDocument(source)
+    try:
+        bitmap = pdf[page_index].render(scale=dpi / 72, grayscale=True)
+        array = np.array(bitmap.to_pil())
+    finally:
+        pdf.close()
+    return page_index, array, (time.perf_counter() - start) * 1000
+
+
+def count_pdf_pages(source) -> int:
+    """PDF 전체 페이지 수"""
+    with open_source(source) as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def extract_pdf_page_range(source, start: int, end: int) -> list[tuple[int, str]]:
+    """
+    [start, end) 범위 페이지의 텍스트를 추출한다. (페이지 번호는 1부터)
+    페이지 단위 병렬 추출에서 워커 프로세스 하나가 맡는 작업 단위.
+    """
+    with open_source(source) as stream:
+        pdf_reader = PyPDF2.PdfReader(stream)
+        return [(idx + 1, pdf_reader.pages[idx].extract_text()) for idx in range(start, end)]
+
+
+def decode_image(source, preprocess_config=None) -> PreparedImage:
+    """이미지를 열어서 전처리(EXIF 회전, 흑백, 축소, 타일링)까지 마친 PreparedImage 를 만든다."""
+    config = preprocess_config or PreprocessConfig(enabled=False)
+    if isinstance(source, np.ndarray):
+        # 이미 디코딩된 이미지 (예: 래스터화된 PDF 페이지)
+        return prepare_image(Image.fromarray(source), config)
+    with open_source(source) as stream:
+        image = Image.open(stream)
+        return prepare_image(image, config)
+
+
+def ocr_image_batch(reader_pool, sources: list, timeout=None, preprocess_config=None, timings=None):
+    """
+    여러 장의 이미지를 Reader 하나로 한 번에 OCR 한다.
+    이미지마다 전처리 후 타일(또는 이미지 전체) 단위로 나누고,
+    readtext_batched 는 크기가 같은 입력끼리만 묶을 수 있으므로 shape 별로 묶어서 실행한다.
+    한 장뿐인 그룹은 readtext 로 처리한다.
+    Reader 가 현재 프로세스에 로드되어 있으므로 스레드 풀에서만 실행한다.
+
+    timings 에 dict 를 넘기면 단계별 소요시간(초)을 채워준다.
+      started: 실행 시작 시각(perf_counter), decode: 이미지별 디코딩 + 전처리 시간 목록,
+      inference: 배치 전체 readtext 시간
+
+    반환: 입력 순서대로 readtext 결과 [ [bbox, text, confidence], ... ] 또는 디코딩 실패 시 Exception
+          (bbox 는 원본 이미지 좌표로 변환된 값)
+    """
+    started = time.perf_counter()
+    results = [None] * len(sources)
+    decode_seconds = [0.0] * len(sources)
+    prepared = {}
+    tile_results = {}
+    groups = {}
+    for idx, source in enumerate(sources):
+        start = time.perf_counter()
+        try:
+            prepared[idx] = decode_image(source, preprocess_config)
+        except Exception as e:
+            results[idx] = e
+            continue
+        finally:
+            decode_seconds[idx] = time.perf_counter() - start
+        tile_results[idx] = [None] * len(prepared[idx].tiles)
+        for tile_idx, tile in enumerate(prepared[idx].tiles):
+            groups.setdefault(tile.array.shape, []).append((idx, tile_idx, tile.array))
+
+    with reader_pool.acquire(timeout=timeout) as reader:
+        inference_start = time.perf_counter()
+        for items in groups.values():
+            if len(items) == 1:
+                idx, tile_idx, img_array = items[0]
+                tile_results[idx][tile_idx] = reader.readtext(img_array, detail=1, paragraph=False)
+                continue
+            batched = reader.readtext_batched(
+                [img_array for _, _, img_array in items], detail=1, paragraph=False
+            )
+            for (idx, tile_idx, _), extracted_data in zip(items, batched):
+                tile_results[idx][tile_idx] = extracted_data
+        inference_seconds = time.perf_counter() - inference_start
+
+    # 타일 좌표 / 축소 비율을 되돌려서 원본 이미지 좌표로 합친다
+    for idx, image in prepared.items():
+        results[idx] = map_results(image, tile_results[idx])
+
+    if timings is not None:
+        timings["started"] = started
+        timings["decode"] = decode_seconds
+        timings["inference"] = inference_seconds
+    return results
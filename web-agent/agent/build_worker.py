@@ -0,0 +1,197 @@
+"""프로젝트별 빌드 워커: Gradle daemon 을 살려 두고 재사용 + 빌드 출력 스트리밍 + 바뀐 모듈 테스트만 실행
+
+- warm daemon: --daemon 과 긴 idle timeout 으로 빌드하고, 프로젝트를 다시 만들기 전(LLM 변환 중)에 warm() 으로 미리 띄운다
+- 스트리밍: 출력을 모아 두지 않고 한 줄씩 on_line 으로 넘긴다 (tools.run_cmd, BUILD_TIMEOUT 초 넘기면 종료)
+- 테스트 범위: sync_tree 변경 내역으로 결정 (바뀐 것 없음 -> 생략, 모듈 파일만 -> 그 모듈 테스트, 공통 파일 -> 전체)
+- 소요시간: 빌드마다 cold / warm 여부, 최대 메모리와 함께 BUILD_TIMINGS_FILE 에 한 줄(JSON)씩 기록
+빌드 명령은 기본 OS 에 맞는 Gradle Wrapper(./gradlew, gradlew.bat)이고 BUILD_COMMAND 로 바꿀 수 있다
+(예: 확인용 stub: BUILD_COMMAND="python bench/stub_gradle.py").
+"""
+from __future__ import annotations
+import json
+import os
+import shlex
+import threading
+import time
+from pathlib import Path
+
+from agent.generator import render_reservation_module
+from agent.tools import Canceled, gradlew_command, run_cmd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+BUILD_COMMAND = os.getenv("BUILD_COMMAND")
+BUILD_TIMEOUT = float(os.getenv("BUILD_TIMEOUT", "1800"))
+# 마지막 빌드 후 이 시간(초) 안이면 daemon 이 살아 있다고 보고 warm 으로 기록 (Gradle idle timeout 도 같게 맞춤)
+GRADLE_DAEMON_IDLE_SECONDS = int(os.getenv("GRADLE_DAEMON_IDLE_SECONDS", "10800"))
+BUILD_TIMINGS_FILE = Path(os.getenv("BUILD_TIMINGS_FILE", str(BASE_DIR / "generated" / "build_timings.jsonl")))
+
+# 프로젝트 디렉터리에 남기는 마지막 빌드 상태 (CLI 처럼 프로세스가 매번 새로 떠도 warm / 성공 여부를 이어 가기 위해)
+STATE_NAME = ".agent-build.json"
+GRADLE_ARGS = [
+    "--daemon",
+    "--build-cache",
+    "--console=plain",
+    f"-Dorg.gradle.daemon.idletimeout={GRADLE_DAEMON_IDLE_SECONDS * 1000}",
+]
+
+_timings_lock = threading.Lock()
+
+
+def plan_build(changes: dict[str, list[str]], base_package: str, modules: list[dict]) -> dict:
+    """
+    변경 내역으로 돌릴 Gradle task 를 정한다.
+    반환: {"tasks": [...], "tests": [엔티티 이름], "reason": 설명}  tasks 가 비면 빌드 생략
+    - 추가/수정된 파일이 모두 어떤 모듈의 생성 파일이면 그 모듈 테스트만 (--tests *Entity*, 생성된 EntityControllerTest)
+    - 모듈에 속하지 않는 파일(템플릿, 홈 페이지, css 등)이 바뀌면 전체 테스트
+    - 삭제만 있으면(지워진 모듈) 컴파일만
+    """
+    written = changes["added"] + changes["updated"]
+    if not written and not changes["deleted"]:
+        return {"tasks": [], "tests": [], "reason": "no changes"}
+    if not written:
+        return {"tasks": ["testClasses"], "tests": [], "reason": "files deleted only"}
+
+    owners = {}
+    for module in modules:
+        for rel in render_reservation_module(base_package, module):
+            owners[rel] = module["entityName"]
+    shared = [rel for rel in written if rel not in owners]
+    if shared:
+        return {"tasks": ["test"], "tests": [], "reason": f"shared file changed: {shared[0]}"}
+
+    tests = sorted({owners[rel] for rel in written})
+    tasks = ["test"]
+    for entity in tests:
+        tasks += ["--tests", f"*{entity}*"]
+    return {"tasks": tasks, "tests": tests, "reason": f"modules changed: {', '.join(tests)}"}
+
+
+def record_timing(entry: dict, path: Path | None = None) -> None:
+    path = path or BUILD_TIMINGS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _timings_lock, path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def timing_summary(path: Path | None = None) -> dict:
+    """기록된 빌드 소요시간 cold / warm 별 횟수, 평균(초)"""
+    path = path or BUILD_TIMINGS_FILE
+    groups = {"cold": [], "warm": []}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            entry = json.loads(line)
+            if entry.get("kind") == "build":
+                groups["warm" if entry["warm"] else "cold"].append(entry["seconds"])
+    return {
+        name: {"count": len(values), "avg_seconds": round(sum(values) / len(values), 3) if values else None}
+        for name, values in groups.items()
+    }
+
+
+class BuildWorker:
+    """프로젝트 하나의 빌드를 직렬화하고 daemon 상태를 추적한다 (get_worker 로 프로젝트당 하나)"""
+
+    def __init__(self, project_dir: Path, command: str | None = None):
+        self.project_dir = project_dir
+        command = command or BUILD_COMMAND
+        self.command = shlex.split(command, posix=os.name != "nt") if command else None
+        self._lock = threading.Lock()
+        self._warm_thread = None
+
+    def _load_state(self) -> dict:
+        try:
+            return json.loads((self.project_dir / STATE_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state: dict) -> None:
+        (self.project_dir / STATE_NAME).write_text(json.dumps(state), encoding="utf-8")
+
+    def is_warm(self) -> bool:
+        last_run = self._load_state().get("last_run")
+        return last_run is not None and time.time() - last_run < GRADLE_DAEMON_IDLE_SECONDS
+
+    def warm(self) -> threading.Thread | None:
+        """daemon 이 식었으면 백그라운드에서 가벼운 task(help)로 미리 띄운다. 이미 warm 이면 None"""
+        if not self.project_dir.exists() or self.is_warm():
+            return None
+        if self._warm_thread is not None and self._warm_thread.is_alive():
+            return self._warm_thread
+        self._warm_thread = threading.Thread(target=self._warm, daemon=True)
+        self._warm_thread.start()
+        return self._warm_thread
+
+    def _warm(self) -> None:
+        # 백그라운드 스레드라 예외가 조용히 사라지지 않도록 남긴다 (실제 빌드에서 다시 드러난다)
+        try:
+            self._locked_run(["help"], "warmup", lambda line: None)
+        except Exception as e:
+            print(f"[BUILD] warmup failed: {type(e).__name__}: {e}")
+
+    def build(self, changes: dict[str, list[str]], base_package: str, modules: list[dict], on_line=print,
+              cancel: threading.Event | None = None) -> dict:
+        """
+        변경 내역에 맞는 task 만 실행. 실패하면 RuntimeError, cancel 이 set 되면 빌드를 죽이고 tools.Canceled.
+        지난 빌드가 실패했거나 기록이 없으면 변경 내역과 관계없이 전체 테스트.
+        반환: plan_build 결과 + {"skipped", "warm", "seconds"}
+        """
+        plan = plan_build(changes, base_package, modules)
+        if not self._load_state().get("ok"):
+            plan = {"tasks": ["test"], "tests": [], "reason": "no successful build yet"}
+        if not plan["tasks"]:
+            on_line(f"[BUILD] skipped ({plan['reason']})")
+            return {**plan, "skipped": True, "warm": self.is_warm(), "seconds": 0.0}
+
+        on_line(f"[BUILD] {' '.join(plan['tasks'])} ({plan['reason']})")
+        result, warm = self._locked_run(plan["tasks"], "build", on_line, cancel)
+        if result["returncode"] != 0:
+            reason = "timed out" if result["timed_out"] else f"exit {result['returncode']}"
+            raise RuntimeError(f"Build failed ({reason}): {' '.join(result['cmd'])}")
+        return {**plan, "skipped": False, "warm": warm, "seconds": result["seconds"],
+                "peak_rss_kb": result["peak_rss_kb"]}
+
+    def _locked_run(self, tasks: list[str], kind: str, on_line, cancel: threading.Event | None = None) -> tuple[dict, bool]:
+        with self._lock:
+            warm = self.is_warm()
+            command = self.command or gradlew_command(self.project_dir)
+            canceled = started = False
+            start = time.perf_counter()
+            # 실행 전에 실패(gradlew 없음 / 실행 권한 없음 등)하거나 취소돼도 상태와 소요시간은 남긴다
+            result = {"returncode": None, "seconds": 0.0, "peak_rss_kb": None, "timed_out": False}
+            try:
+                result = run_cmd(
+                    [*command, *GRADLE_ARGS, *tasks], cwd=self.project_dir,
+                    on_line=lambda line, stream: on_line(line), timeout=BUILD_TIMEOUT, check=False, cancel=cancel,
+                )
+                started = True
+            except Exception as e:
+                canceled = started = isinstance(e, Canceled)
+                result["seconds"] = round(time.perf_counter() - start, 3)
+                raise
+            finally:
+                state = self._load_state()
+                # 명령이 뜨지도 못했으면 daemon 도 없으므로 warm 으로 치지 않는다
+                if started:
+                    state["last_run"] = time.time()
+                if kind == "build":
+                    state["ok"] = result["returncode"] == 0
+                self._save_state(state)
+                record_timing({
+                    "ts": round(time.time(), 3), "project": self.project_dir.name, "kind": kind, "tasks": tasks,
+                    "warm": warm, "seconds": result["seconds"], "peak_rss_kb": result["peak_rss_kb"],
+                    "returncode": result["returncode"], "timed_out": result["timed_out"], "canceled": canceled,
+                })
+            return result, warm
+
+
+_workers: dict[Path, BuildWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_worker(project_dir: Path) -> BuildWorker:
+    key = project_dir.resolve()
+    with _workers_lock:
+        if key not in _workers:
+            _workers[key] = BuildWorker(key)
+        return _workers[key]
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from pathlib import Path
 
+from agent.tools import sync_tree
+
 def _plural(module_name: str) -> str:
     return f"{module_name}s"
 
@@ -22,7 +24,26 @@ def _html_input(field: dict) -> str:
     return f'<input type="text" name="{name}" placeholder="{name}" required />'
 
 
-def generate_reservation_module(project_dir: Path, base_package: str, spec: dict) -> None:
+def _java_dir(base_package: str) -> str:
+    return "src/main/java/" + base_package.replace(".", "/")
+
+def _test_dir(base_package: str) -> str:
+    return "src/test/java/" + base_package.replace(".", "/")
+
+def _sample_value(field: dict, updated: bool) -> tuple[str | None, str]:
+    """테스트용 값: (요청 파라미터 문자열, 기대하는 Java 값). Boolean false 는 체크박스처럼 파라미터를 보내지 않는다(None)"""
+    name = field["name"]
+    jtype = field["type"]
+    if jtype == "Boolean":
+        return (None, "Boolean.FALSE") if updated else ("true", "Boolean.TRUE")
+    if jtype in ("Integer", "Long"):
+        number = 2 if updated else 1
+        return str(number), f"{jtype}.valueOf({number})"
+    text = f"{'updated' if updated else 'sample'}-{name}"
+    return text, f'"{text}"'
+
+def render_reservation_module(base_package: str, spec: dict) -> dict[str, str]:
+    """모듈 하나의 Entity/Repository/Service/Controller/View/Test 를 {프로젝트 기준 상대경로: 내용} 으로 반환"""
     module_name = spec["moduleName"]
     entity_name = spec["entityName"]
     fields = spec["fields"]
@@ -32,18 +53,9 @@ def generate_reservation_module(project_dir: Path, base_package: str, spec: dict
     list_attr = plural                   # model attribute name
     redirect_to = f"redirect:{route}"
 
-    src_java = project_dir / "src" / "main" / "java"
-    src_res = project_dir / "src" / "main" / "resources"
-
-    base_path = Path(*base_package.split("."))
-    domain_dir = src_java / base_path / "domain"
-    repo_dir = src_java / base_path / "repository"
-    service_dir = src_java / base_path / "service"
-    web_dir = src_java / base_path / "web"
-    view_dir = src_res / "templates" / module_name
-
-    for d in [domain_dir, repo_dir, service_dir, web_dir, view_dir]:
-        d.mkdir(parents=True, exist_ok=True)
+    java_dir = _java_dir(base_package)
+    view_dir = f"src/main/resources/templates/{module_name}"
+    files = {}
 
     # ===== 1) Entity (getter + setter) =====
     field_decls = "\n".join([f"    private {f['type']} {f['name']};" for f in fields])
@@ -91,7 +103,7 @@ public class {entity_name} {{
 {setters}
 }}
 """
-    (domain_dir / f"{entity_name}.java").write_text(entity_code, encoding="utf-8")
+    files[f"{java_dir}/domain/{entity_name}.java"] = entity_code
 
     # ===== 2) Repository =====
     repo_code = f"""package {base_package}.repository;
@@ -102,7 +114,7 @@ import org.springframework.data.jpa.repository.JpaRepository;
 public interface {entity_name}Repository extends JpaRepository<{entity_name}, Long> {{
 }}
 """
-    (repo_dir / f"{entity_name}Repository.java").write_text(repo_code, encoding="utf-8")
+    files[f"{java_dir}/repository/{entity_name}Repository.java"] = repo_code
 
     # ===== 3) Service (findById + update) =====
     create_params = ", ".join([f"{f['type']} {f['name']}" for f in fields])
@@ -151,7 +163,7 @@ public class {entity_name}Service {{
     }}
 }}
 """
-    (service_dir / f"{entity_name}Service.java").write_text(service_code, encoding="utf-8")
+    files[f"{java_dir}/service/{entity_name}Service.java"] = service_code
 
     # ===== 4) Controller (list/create/delete + edit/update) =====
     req_params = []
@@ -219,7 +231,7 @@ public class {entity_name}Controller {{
     }}
 }}
 """
-    (web_dir / f"{entity_name}Controller.java").write_text(controller_code, encoding="utf-8")
+    files[f"{java_dir}/web/{entity_name}Controller.java"] = controller_code
 
     # ===== 5) View: list.html (CSS 적용) =====
     inputs_html = "\n       ".join([_html_input(f) for f in fields])
@@ -270,7 +282,7 @@ public class {entity_name}Controller {{
 </body>
 </html>
 """
-    (view_dir / "list.html").write_text(view_code, encoding="utf-8")
+    files[f"{view_dir}/list.html"] = view_code
 
     # ===== 6) View: edit.html (CSS 적용) =====
     edit_inputs = []
@@ -313,25 +325,100 @@ public class {entity_name}Controller {{
 </body>
 </html>
 """
-    (view_dir / "edit.html").write_text(edit_view, encoding="utf-8")
+    files[f"{view_dir}/edit.html"] = edit_view
 
+    # ===== 7) Test (목록 화면 + 추가/수정/삭제, build_worker 가 --tests *Entity* 로 이 모듈만 실행) =====
+    def request_params(updated: bool) -> str:
+        params = []
+        for f in fields:
+            value, _ = _sample_value(f, updated)
+            if value is not None:
+                params.append(f'\n                        .param("{f["name"]}", "{value}")')
+        return "".join(params)
 
+    def assertions(var: str, updated: bool) -> str:
+        return "\n".join([
+            f"        assertEquals({_sample_value(f, updated)[1]}, {var}.get{_cap(f['name'])}());" for f in fields
+        ])
 
+    test_code = f"""package {base_package}.web;
 
-def generate_home_page(project_dir: Path, base_package: str, modules: list[dict]):
+import {base_package}.domain.{entity_name};
+import {base_package}.service.{entity_name}Service;
+import org.junit.jupiter.api.Test;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.boot.test.autoconfigure.web.servlet.AutoConfigureMockMvc;
+import org.springframework.boot.test.context.SpringBootTest;
+import org.springframework.test.web.servlet.MockMvc;
+import org.springframework.transaction.annotation.Transactional;
+
+import java.util.Comparator;
+
+import static org.junit.jupiter.api.Assertions.assertEquals;
+import static org.springframework.test.web.servlet.request.MockMvcRequestBuilders.get;
+import static org.springframework.test.web.servlet.request.MockMvcRequestBuilders.post;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.redirectedUrl;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.status;
+import static org.springframework.test.web.servlet.result.MockMvcResultMatchers.view;
+
+@SpringBootTest
+@AutoConfigureMockMvc
+@Transactional
+class {entity_name}ControllerTest {{
+
+    @Autowired
+    private MockMvc mockMvc;
+
+    @Autowired
+    private {entity_name}Service service;
+
+    @Test
+    void listPageRenders() throws Exception {{
+        mockMvc.perform(get("{route}"))
+                .andExpect(status().isOk())
+                .andExpect(view().name("{module_name}/list"));
+    }}
+
+    @Test
+    void createEditDelete() throws Exception {{
+        int before = service.findAll().size();
+
+        mockMvc.perform(post("{route}"){request_params(False)})
+                .andExpect(redirectedUrl("{route}"));
+        assertEquals(before + 1, service.findAll().size());
+        {entity_name} created = service.findAll().stream().max(Comparator.comparing({entity_name}::getId)).orElseThrow();
+{assertions("created", False)}
+
+        mockMvc.perform(get("{route}/" + created.getId() + "/edit"))
+                .andExpect(status().isOk())
+                .andExpect(view().name("{module_name}/edit"));
+
+        mockMvc.perform(post("{route}/" + created.getId() + "/edit"){request_params(True)})
+                .andExpect(redirectedUrl("{route}"));
+        {entity_name} updated = service.findById(created.getId());
+{assertions("updated", True)}
+
+        mockMvc.perform(post("{route}/" + created.getId() + "/delete"))
+                .andExpect(redirectedUrl("{route}"));
+        assertEquals(before, service.findAll().size());
+    }}
+}}
+"""
+    files[f"{_test_dir(base_package)}/web/{entity_name}ControllerTest.java"] = test_code
+    return files
+
+
+def generate_reservation_module(project_dir: Path, base_package: str, spec: dict) -> None:
+    sync_tree(project_dir, render_reservation_module(base_package, spec), prune=False)
+
+
+def render_home_page(base_package: str, modules: list[dict]) -> dict[str, str]:
     """
     [홈 페이지 생성]
     - modules 목록을 기반으로 / (index) 화면에 링크를 자동 생성
     """
-    src_java = project_dir / "src" / "main" / "java"
-    src_res = project_dir / "src" / "main" / "resources"
-    base_path = Path(*base_package.split("."))
-
-    web_dir = src_java / base_path / "web"
-    view_dir = src_res / "templates"
-
-    web_dir.mkdir(parents=True, exist_ok=True)
-    view_dir.mkdir(parents=True, exist_ok=True)
+    java_dir = _java_dir(base_package)
+    view_dir = "src/main/resources/templates"
 
     # 링크 데이터 생성: (Label, path)
     links = []
@@ -341,6 +428,7 @@ def generate_home_page(project_dir: Path, base_package: str, modules: list[dict]
         path = f"/{plural}"
         label = plural[:1].upper() + plural[1:] #Reservations, Todos
         links.append((label, path))
+    links_code = ",\n".join([f'      new String[]{{"{label}", "{path}"}}' for (label, path) in links])
 
     controller_code = f"""package {base_package}.web;
 
@@ -362,13 +450,13 @@ public class HomeController {{
     @GetMapping("/")
     public String home(Model model) {{
         model.addAttribute("links", List.of(
-        {",\n".join([f'      new String[]{{"{label}", "{path}"}}' for (label, path) in links])}
+        {links_code}
         ));
         return "index";
     }}
 }}
 """
-    (web_dir / "HomeController.java").write_text(controller_code, encoding="utf-8")
+    files = {f"{java_dir}/web/HomeController.java": controller_code}
 
     # ==== index.html ====
     index_html = """<!DOCTYPE html>
@@ -392,13 +480,15 @@ public class HomeController {{
 </body>
 </html>
 """
-    (view_dir / "index.html").write_text(index_html, encoding="utf-8")
+    files[f"{view_dir}/index.html"] = index_html
+    return files
 
-"""[공통 CSS 생성] 모든 화면에서 사용하는 기본 스타일"""
-def ensure_app_css(project_dir: Path) -> None:
-    css_dir = project_dir / "src" / "main" / "resources" / "static"
-    css_dir.mkdir(parents=True, exist_ok=True)
 
+def generate_home_page(project_dir: Path, base_package: str, modules: list[dict]):
+    sync_tree(project_dir, render_home_page(base_package, modules), prune=False)
+
+"""[공통 CSS 생성] 모든 화면에서 사용하는 기본 스타일"""
+def render_app_css() -> dict[str, str]:
     css = """/* app.css - generated */
 :root { --bg:#0b1220; --card:#121a2b; --text:#e6eaf2; --muted:#a7b0c3; --line:#25314d; --btn:#3b82f6; --btn2:#22c55e; --danger:#ef4444; }
 
@@ -424,19 +514,25 @@ button { padding:10px 12px; border:0; border-radius: 10px; cursor:pointer; font-
 .actions { display:flex; gap:8px; }
 .small { padding:8px 10px; font-size: 13px; border-radius: 10px; }
 """
-    (css_dir / "app.css").write_text(css, encoding="utf-8")
+    return {"src/main/resources/static/app.css": css}
 
-# --------------------------- #
-"""spec에따라 project 생성"""
-def generate_project_from_spec(project_dir: Path, spec: dict):
-    base_package = spec["project"]["basePackage"]
-    modules = spec["modules"]
 
+def ensure_app_css(project_dir: Path) -> None:
+    sync_tree(project_dir, render_app_css(), prune=False)
+
+"""spec의 모듈 목록으로 생성할 파일 전체 {상대경로: 내용} (css + 모듈들 + 홈 페이지)"""
+def render_project_files(base_package: str, modules: list[dict]) -> dict[str, str]:
+    files = render_app_css()
     for module in modules:
-        generate_reservation_module(
-            project_dir=project_dir,
-            base_package=base_package,
-            spec=module
-        )
-    generate_home_page(project_dir, base_package, modules)
-    ensure_app_css(project_dir)
\ No newline at end of file
+        files.update(render_reservation_module(base_package, module))
+    files.update(render_home_page(base_package, modules))
+    return files
+
+# --------------------------- #
+"""spec에따라 project 생성
+    템플릿 없이 생성 코드만 쓰므로 기존 파일은 지우지 않는다 (prune=False)
+    반환 : 변경 내역 (tools.sync_tree)
+"""
+def generate_project_from_spec(project_dir: Path, spec: dict) -> dict[str, list[str]]:
+    base_package = spec["project"]["basePackage"]
+    return sync_tree(project_dir, render_project_files(base_package, spec["modules"]), prune=False)
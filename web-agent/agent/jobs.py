@@ -0,0 +1,560 @@
+"""Agent 실행 작업 큐 (SQLite) + 워커 프로세스 풀
+
+/api/run 과 Discord 요청을 요청 안에서 바로 실행하면 요청이 길어지고, 동시에 들어온 요청이 같은
+generated/<project> 와 spec 파일을 함께 고친다.
+- 작업 / 진행 로그는 SQLite 에 저장 -> 서버가 재시작돼도 대기 중인 작업이 사라지지 않음
+- 워커는 별도 프로세스 N 개 (JOB_WORKERS). API 서버와 따로 띄울 수도 있다: python -m agent.jobs --workers 4
+- 프로젝트 잠금: 작업마다 lock_key(project:<이름>) 를 두고, 같은 lock_key 의 작업이 running 이면 꺼내지 않는다
+  -> 같은 프로젝트 작업은 들어온 순서대로 하나씩, 다른 프로젝트는 동시에.
+  new project 모드는 LLM 이 이름을 정한 뒤 lock_project() 로 잠근다
+- 취소: queued 는 바로 canceled, running 은 cancel_requested 를 보고 워커가 빌드 프로세스 그룹을 죽인다
+- 복구: 풀 시작 시와 JOB_ORPHAN_CHECK_SECONDS 마다, 잡은 워커(worker_pid)가 죽은 running 작업만 다시 queued 로
+- 종료: 풀을 멈출 때 제한 시간 안에 끝나지 않은 작업은 취소와 같은 경로로 빌드 프로세스 그룹을 죽이고 다시 queued 로
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from agent.tools import IS_WINDOWS, Canceled
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+JOB_DB = Path(os.getenv("JOB_DB", str(BASE_DIR / ".jobs" / "jobs.db")))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# 빈 큐 확인 / 취소 요청 확인 간격(초)
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "0.5"))
+# 쉬는 워커가 죽은 워커의 작업을 찾아 다시 대기열에 넣는 간격(초)
+JOB_ORPHAN_CHECK_SECONDS = float(os.getenv("JOB_ORPHAN_CHECK_SECONDS", "30"))
+# 풀 종료 시 중단 요청을 받은 워커가 빌드를 정리하고 나갈 때까지 기다리는 시간(초). 넘기면 강제 종료
+JOB_STOP_GRACE_SECONDS = float(os.getenv("JOB_STOP_GRACE_SECONDS", "10"))
+# 진행 로그를 DB 에 모아 쓰는 간격(초) / 줄 수
+LOG_FLUSH_SECONDS = 0.5
+LOG_FLUSH_LINES = 50
+DEFAULT_HANDLER = "agent.jobs:run_agent_job"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELED = "canceled"
+FINISHED = (SUCCEEDED, FAILED, CANCELED)
+
+
+class JobStore:
+    """작업 / 진행 로그 SQLite 저장소. 프로세스마다 하나씩 열어 쓴다 (스레드 안전, 쓰기는 BEGIN IMMEDIATE)"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    instruction TEXT NOT NULL,
+                    spec TEXT NOT NULL,
+                    lock_key TEXT,
+                    notify TEXT,
+                    status TEXT NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker_pid INTEGER,
+                    log_count INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_logs (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    line TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+                """
+            )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def create(self, instruction: str, spec: str, lock_key: str | None = None, notify: dict | None = None,
+               kind: str = "run", job_id: str | None = None) -> str:
+        job_id = job_id or uuid.uuid4().hex
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, instruction, spec, lock_key, notify, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, instruction, spec, lock_key, json.dumps(notify) if notify else None, QUEUED, time.time()),
+            )
+        return job_id
+
+    def claim_next(self, worker_pid: int) -> dict | None:
+        """같은 lock_key 작업이 running 이 아닌 것 중 가장 오래된 queued 작업을 running 으로 바꾸고 반환 (없으면 None)"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                """
+                SELECT * FROM jobs
+                WHERE status = ? AND (lock_key IS NULL OR lock_key NOT IN (
+                    SELECT lock_key FROM jobs WHERE status = ? AND lock_key IS NOT NULL
+                ))
+                ORDER BY created_at LIMIT 1
+                """,
+                (QUEUED, RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_pid = ?, started_at = ? WHERE id = ?",
+                (RUNNING, worker_pid, time.time(), row["id"]),
+            )
+        return self._decode(row)
+
+    def acquire_lock(self, job_id: str, lock_key: str) -> bool:
+        """실행 중에 lock_key 를 잡는다 (new project 모드). 다른 running 작업이 잡고 있으면 False"""
+        with self._transaction() as conn:
+            holder = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? AND lock_key = ? AND id != ? LIMIT 1",
+                (RUNNING, lock_key, job_id),
+            ).fetchone()
+            if holder is not None:
+                return False
+            conn.execute("UPDATE jobs SET lock_key = ? WHERE id = ?", (lock_key, job_id))
+        return True
+
+    def append_logs(self, job_id: str, lines: list[str]) -> None:
+        if not lines:
+            return
+        now = time.time()
+        with self._transaction() as conn:
+            start = conn.execute("SELECT log_count FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO job_logs (job_id, seq, line, ts) VALUES (?, ?, ?, ?)",
+                [(job_id, start + i + 1, line, now) for i, line in enumerate(lines)],
+            )
+            conn.execute("UPDATE jobs SET log_count = ? WHERE id = ?", (start + len(lines), job_id))
+
+    def logs(self, job_id: str, after: int = 0, limit: int = 1000) -> list[dict]:
+        """seq > after 인 진행 로그 [{"seq", "line", "ts"}]"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, line, ts FROM job_logs WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def tail(self, job_id: str, count: int = 20) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT line FROM job_logs WHERE job_id = ? ORDER BY seq DESC LIMIT ?", (job_id, count)
+            ).fetchall()
+        return [row[0] for row in reversed(rows)]
+
+    def request_cancel(self, job_id: str) -> str | None:
+        """queued 는 바로 canceled, running 은 취소 요청만 표시. 반환: 바뀐 뒤 상태 (없는 작업이면 None)"""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row["status"] == QUEUED:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (CANCELED, "canceled before start", time.time(), job_id),
+                )
+                return CANCELED
+            if row["status"] == RUNNING:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            return row["status"]
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _set_finished(self, job_id: str, status: str, result: dict | None = None, error: str | None = None) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None, error,
+                 time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, result: dict) -> None:
+        self._set_finished(job_id, SUCCEEDED, result=result)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._set_finished(job_id, FAILED, error=error)
+
+    def mark_canceled(self, job_id: str, error: str) -> None:
+        self._set_finished(job_id, CANCELED, error=error)
+
+    def requeue(self, job_id: str) -> None:
+        """워커가 멈추면서 중단한 running 작업을 다시 queued 로 (다른 워커가 처음부터 다시 실행)"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_pid = NULL, started_at = NULL WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+
+    def requeue_running(self) -> int:
+        """
+        워커가 죽어 처리 도중 멈춘(running) 작업을 다시 queued 로 돌린다 (취소 요청된 작업은 canceled).
+        살아 있는 워커(다른 풀 / python -m agent.jobs / 다른 uvicorn 워커)가 처리 중인 작업은 건드리지 않는다.
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id, cancel_requested, worker_pid, started_at FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+            orphans = [row for row in rows if not _worker_alive(row["worker_pid"], row["started_at"])]
+            for row in orphans:
+                if row["cancel_requested"]:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                        (CANCELED, "canceled (worker exited)", time.time(), row["id"]),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker_pid = NULL, started_at = NULL WHERE id = ?",
+                        (QUEUED, row["id"]),
+                    )
+        return sum(not row["cancel_requested"] for row in orphans)
+
+    def queue_position(self, job_id: str) -> int | None:
+        """queued 작업 앞에 기다리는 작업 수 (queued 가 아니면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < (
+                    SELECT created_at FROM jobs WHERE id = ? AND status = ?
+                )
+                """,
+                (QUEUED, job_id, QUEUED),
+            ).fetchone()
+            exists = self._conn.execute("SELECT 1 FROM jobs WHERE id = ? AND status = ?", (job_id, QUEUED)).fetchone()
+        return row[0] if exists else None
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["notify"] = json.loads(job["notify"]) if job["notify"] else None
+        return job
+
+
+def _worker_alive(pid: int | None, started_at: float | None) -> bool:
+    """작업을 잡은 워커 프로세스가 아직 살아 있는지. 확인할 수 없으면 살아 있다고 보고 작업을 건드리지 않는다"""
+    if pid is None:
+        return False
+    if psutil is not None:
+        try:
+            proc = psutil.Process(pid)
+            # 같은 pid 를 재사용한 다른 프로세스(재부팅 후 등)는 작업을 잡은 뒤에 시작됐다
+            return proc.status() != psutil.STATUS_ZOMBIE and proc.create_time() <= (started_at or 0) + 1
+        except psutil.Error:
+            return False
+    if IS_WINDOWS:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rsplit(b")", 1)[1].split()[0] != b"Z"
+    except OSError:
+        return True
+
+
+def public_job(job: dict) -> dict:
+    """클라이언트에게 보여줄 작업 정보 (Discord 토큰 등은 제외)"""
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "instruction": job["instruction"],
+        "spec": job["spec"],
+        "project": job["lock_key"].split(":", 1)[1] if job["lock_key"] else None,
+        "status": job["status"],
+        "cancel_requested": bool(job["cancel_requested"]),
+        "log_count": job["log_count"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+
+class JobLog:
+    """진행 로그를 모아 두었다가 LOG_FLUSH_SECONDS / LOG_FLUSH_LINES 마다 DB 에 쓴다 (빌드 출력 한 줄마다 쓰지 않게)"""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._lines = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, line: str) -> None:
+        with self._lock:
+            self._lines.extend(line.splitlines() or [""])
+            due = len(self._lines) >= LOG_FLUSH_LINES or time.monotonic() - self._last_flush >= LOG_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._lines = self._lines, []
+            self._last_flush = time.monotonic()
+        self.store.append_logs(self.job_id, lines)
+
+
+def run_agent_job(job: dict, on_line, cancel: threading.Event, lock_project) -> dict:
+    """기본 작업 handler: server.run_agent_from_instruction 실행 (Discord 요청이면 진행 상황 / 결과도 Discord 로)"""
+    from fastapi.encoders import jsonable_encoder
+    from agent.server import DiscordProgress, result_message, run_agent_from_instruction
+
+    token = (job.get("notify") or {}).get("discord_token")
+    progress = DiscordProgress(token) if token else None
+
+    def emit(line: str) -> None:
+        on_line(line)
+        if progress:
+            progress.on_line(line)
+
+    try:
+        result = run_agent_from_instruction(job["instruction"], job["spec"], emit, cancel, lock_project)
+    except Canceled:
+        if progress:
+            progress.finish(f"🛑 취소됨 (job {job['id']})")
+        raise
+    except Exception as e:
+        if progress:
+            progress.finish(f"❌ 실패: {getattr(e, 'detail', None) or e} (job {job['id']})")
+        raise
+    if progress:
+        progress.finish(result_message(result))
+    return jsonable_encoder(result)
+
+
+def _load_handler(path: str):
+    module, name = path.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def _process(store: JobStore, job: dict, handler, poll_interval: float, abort=None) -> None:
+    """
+    작업 하나 실행. 취소 요청이나 abort(풀 종료) 가 오면 cancel 을 set 해서 handler 가 빌드 프로세스 그룹을 죽이게 한다.
+    abort 로 중단된 작업은 canceled 가 아니라 다시 queued 로 돌린다.
+    """
+    job_id = job["id"]
+    log = JobLog(store, job_id)
+    cancel = threading.Event()
+    done = threading.Event()
+
+    def watch_cancel():
+        while not done.wait(poll_interval):
+            if (abort is not None and abort.is_set()) or store.cancel_requested(job_id):
+                cancel.set()
+                return
+
+    def lock_project(project_name: str) -> None:
+        """new project 모드: 이름이 정해진 뒤 같은 프로젝트의 다른 작업이 끝날 때까지 기다린다"""
+        waiting = False
+        while not store.acquire_lock(job_id, f"project:{project_name}"):
+            if cancel.is_set():
+                raise Canceled(f"canceled while waiting for project {project_name}")
+            if not waiting:
+                log.append(f"[JOB] waiting for project lock: {project_name}")
+                waiting = True
+            time.sleep(poll_interval)
+
+    threading.Thread(target=watch_cancel, daemon=True).start()
+    log.append(f"[JOB] {job_id} started (pid {os.getpid()})")
+    try:
+        result = handler(job, log.append, cancel, lock_project)
+        log.flush()
+        store.finish(job_id, result)
+    except Canceled as e:
+        if abort is not None and abort.is_set() and not store.cancel_requested(job_id):
+            log.append(f"[JOB] worker stopping, requeued: {e}")
+            log.flush()
+            store.requeue(job_id)
+            return
+        log.append(f"[JOB] canceled: {e}")
+        log.flush()
+        store.mark_canceled(job_id, str(e))
+    except Exception as e:
+        error = str(getattr(e, "detail", None) or e)
+        log.append(f"[JOB] failed: {error}")
+        log.flush()
+        store.fail(job_id, error)
+    finally:
+        done.set()
+
+
+def _worker_main(db_path: str, handler_path: str, poll_interval: float, stop, abort) -> None:
+    # Ctrl+C 는 부모(풀)가 받아서 stop() 으로 정리한다. 워커가 먼저 KeyboardInterrupt 로 죽으면 빌드가 남는다
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    store = JobStore(Path(db_path))
+    handler = _load_handler(handler_path)
+    last_check = time.monotonic()
+    try:
+        while not stop.is_set():
+            job = store.claim_next(os.getpid())
+            if job is None:
+                if time.monotonic() - last_check >= JOB_ORPHAN_CHECK_SECONDS:
+                    last_check = time.monotonic()
+                    requeued = store.requeue_running()
+                    if requeued:
+                        print(f"[jobs] 워커가 종료돼 멈춘 작업 {requeued}개를 다시 대기열에 넣었습니다.")
+                stop.wait(poll_interval)
+                continue
+            _process(store, job, handler, poll_interval, abort)
+    finally:
+        store.close()
+
+
+def _kill_children(pid: int) -> None:
+    """강제 종료할 워커의 자식 프로세스(빌드 프로세스 그룹 포함)를 먼저 죽인다 (psutil 이 없으면 생략)"""
+    if psutil is None:
+        return
+    try:
+        children = psutil.Process(pid).children(recursive=True)
+    except psutil.Error:
+        return
+    for child in children:
+        with contextlib.suppress(psutil.Error):
+            child.kill()
+
+
+class JobWorkerPool:
+    """
+    작업 워커 프로세스 N 개. handler 는 "모듈:함수" 경로 (프로세스마다 import)
+    handler(job, on_line, cancel, lock_project) -> result(dict)
+    """
+
+    def __init__(self, db_path: Path = JOB_DB, workers: int = JOB_WORKERS, handler: str = DEFAULT_HANDLER,
+                 poll_interval: float = JOB_POLL_SECONDS):
+        self.db_path = db_path
+        self.workers = workers
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context("spawn")
+        self._stop = self._context.Event()
+        self._abort = self._context.Event()
+        self._processes = []
+
+    def start(self) -> None:
+        store = JobStore(self.db_path)
+        requeued = store.requeue_running()
+        store.close()
+        if requeued:
+            print(f"[jobs] 워커가 종료돼 멈춘 작업 {requeued}개를 다시 대기열에 넣었습니다.")
+        self._stop.clear()
+        self._abort.clear()
+        self._processes = [
+            self._context.Process(
+                target=_worker_main,
+                args=(str(self.db_path), self.handler, self.poll_interval, self._stop, self._abort),
+                name=f"job-worker-{i}", daemon=True,
+            )
+            for i in range(self.workers)
+        ]
+        for proc in self._processes:
+            proc.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        지금 작업을 마칠 때까지 timeout 초 기다린다. 남은 워커에는 중단을 알려서 빌드 프로세스 그룹을 죽이고
+        작업을 다시 대기열에 넣게 하고, JOB_STOP_GRACE_SECONDS 안에 나가지 않으면 자식 프로세스와 함께 강제 종료
+        (워커만 죽이면 새 세션으로 띄운 Gradle 이 남아서 다시 실행되는 작업과 같은 프로젝트 디렉터리를 고친다)
+        """
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for proc in self._processes:
+            proc.join(max(0.0, deadline - time.monotonic()))
+        if any(proc.is_alive() for proc in self._processes):
+            self._abort.set()
+            deadline = time.monotonic() + JOB_STOP_GRACE_SECONDS
+            for proc in self._processes:
+                proc.join(max(0.0, deadline - time.monotonic()))
+                if proc.is_alive():
+                    _kill_children(proc.pid)
+                    proc.terminate()
+                    proc.join()
+        self._processes = []
+
+    def alive(self) -> int:
+        return sum(proc.is_alive() for proc in self._processes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="web-agent 작업 워커 (API 서버와 따로 실행할 때)")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS)
+    parser.add_argument("--db", default=str(JOB_DB))
+    args = parser.parse_args()
+
+    pool = JobWorkerPool(Path(args.db), args.workers)
+    pool.start()
+    print(f"[jobs] workers={args.workers} db={args.db}")
+    try:
+        while pool.alive():
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
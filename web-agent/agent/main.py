@@ -1,9 +1,9 @@
 from __future__ import annotations
-import shutil
 from pathlib import Path
-from agent.tools import ensure_dir, copy_template, replace_in_files, run_cmd
+from agent.tools import ensure_dir, render_template, sync_tree, format_changes, run_cmd, gradlew_command, IS_WINDOWS
 import json
-from agent.generator import generate_reservation_module, generate_home_page, ensure_app_css
+from agent.generator import render_project_files
+from agent.build_worker import get_worker
 from agent.spec_editor import apply_instruction
 import argparse
 from agent.runner import run_agent_instructions
@@ -14,58 +14,72 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATE_DIR = BASE_DIR / "agent" / "templates" / "spring-thymeleaf"
 OUTPUT_DIR = BASE_DIR / "generated"
 
-def create_project(project_name: str, base_package: str) -> Path:
-    ensure_dir(OUTPUT_DIR)
-    dest = OUTPUT_DIR / project_name
-
-    copy_template(TEMPLATE_DIR, dest)
-
+"""생성될 프로젝트 파일 전체 {상대경로: 내용} (치환한 템플릿 + css + 모듈들 + 홈 페이지)"""
+def build_project_files(project_name: str, base_package: str, modules: list[dict]) -> dict[str, str | bytes]:
     replacements = {
         "__PROJECT_NAME__" : project_name,
         "__BASE_PACKAGE__" : base_package,
     }
-    replace_in_files(dest, replacements)
-    
-    replace_base_package_path(dest, base_package)    
-    return dest
+    # __BASE_PACKAGE_PATH__ 디렉터리는 실제 패키지 경로로
+    path_replacements = {"__BASE_PACKAGE_PATH__": base_package.replace(".", "/")}
+    files = render_template(TEMPLATE_DIR, replacements, path_replacements)
+    files.update(render_project_files(base_package, modules))
+    return files
+
+"""프로젝트를 spec 에 맞게 증분 생성
+    지우고 다시 만들지 않고, 내용이 바뀐 파일만 쓰고 지워진 모듈의 파일만 삭제한다
+    반환 : (프로젝트 디렉터리, 변경 내역)
+"""
+def create_project(project_name: str, base_package: str, modules: list[dict],
+                   on_line=print) -> tuple[Path, dict[str, list[str]]]:
+    ensure_dir(OUTPUT_DIR)
+    dest = OUTPUT_DIR / project_name
+
+    changes = sync_tree(dest, build_project_files(project_name, base_package, modules))
+    on_line(f"[Sync] {dest}\n{format_changes(changes)}")
+    return dest, changes
 
 
-"""Gradle Wrapper(gradlew.bat)가 없으면 생성하는 함수"""
+"""Gradle Wrapper(gradlew.bat / gradlew)가 없으면 생성하는 함수"""
 def ensure_gradle_wrapper(project_dir: Path) -> None:
-    if (project_dir / "gradlew.bat").exists():
+    if (project_dir / ("gradlew.bat" if IS_WINDOWS else "gradlew")).exists():
         return
     
     run_cmd(["gradle", "wrapper"], cwd=project_dir)
 
 """프로젝트 빌드/테스트 확인 함수
-    Gradle Wrapper로 프로젝트 테스트
+    프로젝트별 빌드 워커(warm Gradle daemon)로 바뀐 모듈의 테스트만 실행
+    반환 : 빌드 결과 (build_worker.BuildWorker.build)
 """
-def verify_project(project_dir: Path) -> None:
-    run_cmd(["gradlew.bat", "test"], cwd=project_dir)
+def verify_project(project_dir: Path, changes: dict[str, list[str]], base_package: str, modules: list[dict],
+                   on_line=print, cancel=None) -> dict:
+    return get_worker(project_dir).build(changes, base_package, modules, on_line=on_line, cancel=cancel)
+
+"""spec 의 프로젝트가 이미 생성돼 있으면 Gradle daemon 을 백그라운드에서 미리 띄운다 (LLM 변환과 겹치게)"""
+def warm_project(spec_path: Path) -> None:
+    try:
+        project_name = json.loads(spec_path.read_text(encoding="utf-8"))["projectName"]
+    except (OSError, ValueError, KeyError):
+        return
+    get_worker(OUTPUT_DIR / project_name).warm()
 
-def run_agent_full(spec_path: Path, instructions: list[str]) -> Path:
+def run_agent_full(spec_path: Path, instructions: list[str], on_line=print,
+                   cancel=None) -> tuple[Path, dict[str, list[str]], dict]:
     """
     지시 목록을 적용한 뒤 프로젝트를 생성하고 검증한다.
-    반환: 생성된 프로젝트 디렉터리 (Path).
+    on_line: 빌드 출력을 한 줄씩 받는 함수 (CLI: print, REST / Discord: 진행 상황 전달)
+    cancel: set 되면 빌드를 중단하는 threading.Event (jobs 취소)
+    반환: (생성된 프로젝트 디렉터리, 변경 내역 tools.sync_tree, 빌드 결과).
     """
     spec = run_agent_instructions(spec_path, instructions)
     project_name = spec["projectName"]
     base_package = spec["basePackage"]
+    modules = spec.get("modules") or [spec["module"]]
 
-    project_dir = create_project(project_name, base_package)
-    ensure_app_css(project_dir)
+    project_dir, changes = create_project(project_name, base_package, modules, on_line)
 
-    modules = spec.get("modules")
-    if modules:
-        for m in modules:
-            generate_reservation_module(project_dir, base_package, m)
-        generate_home_page(project_dir, base_package, modules)
-    else:
-        generate_reservation_module(project_dir, base_package, spec["module"])
-        generate_home_page(project_dir, base_package, [spec["module"]])
-
-    verify_project(project_dir)
-    return project_dir
+    build = verify_project(project_dir, changes, base_package, modules, on_line, cancel)
+    return project_dir, changes, build
 
 def main():
     parser = argparse.ArgumentParser()
@@ -98,39 +112,20 @@ def main():
         else:
             print(f"[Warn] instruction file not found: {path}")
     
-    project_dir = run_agent_full(spec_path, instructions)
+    warm_project(spec_path)
+    project_dir, _, build = run_agent_full(spec_path, instructions)
     if instructions:
         print(f"[Spec updated] {len(instructions)} instruction(s) applied")
-    print("\n Tests passed! Next: run the server with:")
+    if build["skipped"]:
+        print(f"\n Build skipped ({build['reason']}). Run the server with:")
+    elif "test" not in build["tasks"]:
+        print(f"\n Compiled, no tests run ({build['reason']}). Run the server with:")
+    elif build["tests"]:
+        print(f"\n Tests passed ({', '.join(build['tests'])} only)! Next: run the server with:")
+    else:
+        print("\n Tests passed! Next: run the server with:")
     print(f"   cd {project_dir}")
-    print("    gradlew.bat bootRun")
-
-def replace_base_package_path(project_dir: Path, base_package: str) -> None:
-    """__BASE_PACKAGE_PATH__디렉토리를 실제 패키지 경로로 변경"""
-    src_java = project_dir / "src" / "main" / "java"
-    placeholder = src_java / "__BASE_PACKAGE_PATH__"
-    if not placeholder.exists():
-        return
-
-    target = src_java / Path(*base_package.split("."))
-    
-    # target이 없으면 rename
-    if not target.exists():
-        target.parent.mkdir(parents=True, exist_ok=True)
-        placeholder.rename(target)
-        return
-    
-    # target이 이미 있으면 placeholder내부를 target으로 "merge"
-    for item in placeholder.rglob("*"):
-        rel = item.relative_to(placeholder)
-        dest = target / rel
-        if item.is_dir():
-            dest.mkdir(parents=True, exist_ok=True)
-        else:
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.move(str(item), str(dest))
-    
-    shutil.rmtree(placeholder)
+    print(f"    {' '.join(gradlew_command(project_dir))} bootRun")
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,16 @@
 """REST API 진입점: 지시 수신 -> Agent 실행 """
 from __future__ import annotations
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import collections
 import os
 import json
+import threading
+import time
 import httpx
 from nacl.signing import VerifyKey
 from nacl.exceptions import BadSignatureError
@@ -12,8 +18,16 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+from agent.jobs import FINISHED, JOB_DB, JOB_WORKERS, SUCCEEDED, CANCELED, JobStore, JobWorkerPool, public_job
+from agent.tools import Canceled
+
 DISCORD_PUBLIC_KEY = os.getenv("DISCORD_PUBLIC_KEY")
 DISCORD_APP_ID = os.getenv("DISCORD_APP_ID")
+# Discord 진행 상황 메시지 수정 간격(초)과 보여줄 빌드 출력 줄 수 (rate limit / 2000자 제한)
+DISCORD_PROGRESS_SECONDS = float(os.getenv("DISCORD_PROGRESS_SECONDS", "3"))
+DISCORD_PROGRESS_LINES = 12
+# /api/run/stream 이 작업 진행 로그를 DB 에서 읽는 간격(초)
+STREAM_POLL_SECONDS = 0.3
 
 # 프로젝트 루트 = web-agent
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,30 +40,162 @@ class RunResponse(BaseModel):
     status: str
     project_name: str
     project_dir: str
+    # 이번 실행에서 추가/수정/삭제된 파일 (프로젝트 기준 상대경로) + 그대로인 파일 수
+    added: list[str] = []
+    updated: list[str] = []
+    deleted: list[str] = []
+    unchanged: int = 0
+    # 빌드 결과 (build_worker.BuildWorker.build). new project 모드는 빌드하지 않아 None
+    build: dict | None = None
+
+def _run_response(project_name: str, project_dir: Path, changes: dict[str, list[str]], build: dict | None = None) -> RunResponse:
+    return RunResponse(
+        status="ok",
+        project_name=project_name,
+        project_dir=str(project_dir),
+        added=changes["added"],
+        updated=changes["updated"],
+        deleted=changes["deleted"],
+        unchanged=len(changes["unchanged"]),
+        build=build,
+    )
+
+_jobs: JobStore | None = None
 
-app = FastAPI(title="web Agent API", version="0.1.0")
+def job_store() -> JobStore:
+    global _jobs
+    if _jobs is None:
+        _jobs = JobStore(JOB_DB)
+    return _jobs
 
-""" 자연어 지시를 받아 spec 수정 + 프로젝트 생성 수행 """
-@app.post("/api/run", response_model=RunResponse)
-def api_run(req: RunRequest):
+""" 작업 워커 프로세스(JOB_WORKERS 개)를 서버와 함께 띄우고 내린다. 0 이면 python -m agent.jobs 로 따로 실행"""
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool = JobWorkerPool(JOB_DB, JOB_WORKERS) if JOB_WORKERS > 0 else None
+    if pool:
+        await asyncio.to_thread(pool.start)
     try:
-        return run_agent_from_instruction(req.instruction, req.spec)
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        yield
+    finally:
+        if pool:
+            await asyncio.to_thread(pool.stop)
+
+app = FastAPI(title="web Agent API", version="0.1.0", lifespan=lifespan)
+
+""" 작업 lock_key: spec 모드는 spec 의 projectName, new project 모드는 실행 중 LLM 이 이름을 정한 뒤 잠근다 (None)"""
+def _lock_key(instruction: str, spec: str) -> str | None:
+    if instruction.lower().startswith("new project"):
+        return None
+    spec_path = BASE_DIR / spec
+    if not spec_path.exists():
+        raise HTTPException(status_code=400, detail=f"Spec not found: {spec}")
+    try:
+        project_name = json.loads(spec_path.read_text(encoding="utf-8"))["projectName"]
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid spec: {spec} ({e})")
+    return f"project:{project_name}"
+
+def submit_job(instruction: str, spec: str = "specs/app.json", notify: dict | None = None) -> dict:
+    store = job_store()
+    job_id = store.create(instruction, spec, _lock_key(instruction, spec), notify)
+    job = public_job(store.get(job_id))
+    job["queue_position"] = store.queue_position(job_id)
+    job["status_url"] = f"/api/jobs/{job_id}"
+    return job
+
+""" 자연어 지시를 작업 큐에 넣고 바로 job_id 를 돌려준다 (202). 결과는 GET /api/jobs/{id}"""
+@app.post("/api/run", status_code=202)
+async def api_run(req: RunRequest):
+    return await asyncio.to_thread(submit_job, req.instruction, req.spec)
+
+""" /api/run 과 같이 작업을 넣고, 진행 상황(빌드 출력)을 한 줄씩 NDJSON 으로 보낸다
+    {"type": "job", ...} {"type": "log", "line": ...} ...
+    마지막 줄은 {"type": "result", ...RunResponse} / {"type": "error", ...} / {"type": "canceled", ...}
+    연결이 끊겨도 작업은 계속된다 (취소는 POST /api/jobs/{id}/cancel)
+"""
+@app.post("/api/run/stream")
+async def api_run_stream(req: RunRequest):
+    job = await asyncio.to_thread(submit_job, req.instruction, req.spec)
+    store = job_store()
+
+    async def events():
+        yield json.dumps({"type": "job", **job}, ensure_ascii=False) + "\n"
+        after = 0
+        while True:
+            current = await asyncio.to_thread(store.get, job["job_id"])
+            logs = await asyncio.to_thread(store.logs, job["job_id"], after)
+            for entry in logs:
+                yield json.dumps({"type": "log", "line": entry["line"]}, ensure_ascii=False) + "\n"
+                after = entry["seq"]
+            if current["status"] in FINISHED and after >= current["log_count"]:
+                break
+            if not logs:
+                await asyncio.sleep(STREAM_POLL_SECONDS)
+        if current["status"] == SUCCEEDED:
+            event = {"type": "result", **current["result"]}
+        elif current["status"] == CANCELED:
+            event = {"type": "canceled", "detail": current["error"]}
+        else:
+            event = {"type": "error", "status_code": 500, "detail": current["error"]}
+        yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+""" 작업 상태 + 대기 순서 + 진행 로그 마지막 몇 줄"""
+@app.get("/api/jobs/{job_id}")
+async def api_job(job_id: str, tail: int = 20):
+    store = job_store()
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    result = public_job(job)
+    result["queue_position"] = await asyncio.to_thread(store.queue_position, job_id)
+    result["progress"] = await asyncio.to_thread(store.tail, job_id, tail)
+    return result
+
+""" 진행 로그 (seq > after). 다음 요청은 마지막 seq 를 after 로"""
+@app.get("/api/jobs/{job_id}/log")
+async def api_job_log(job_id: str, after: int = 0):
+    store = job_store()
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "status": job["status"], "lines": await asyncio.to_thread(store.logs, job_id, after)}
+
+""" 작업 취소: 대기 중이면 바로 취소, 실행 중이면 워커가 빌드를 멈추고 canceled 로 끝낸다 (202)"""
+@app.post("/api/jobs/{job_id}/cancel")
+async def api_job_cancel(job_id: str):
+    status = await asyncio.to_thread(job_store().request_cancel, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if status in FINISHED and status != CANCELED:
+        raise HTTPException(status_code=409, detail=f"Job already {status}")
+    return JSONResponse(status_code=202, content={"job_id": job_id, "status": status})
+
+""" 상태별 작업 수"""
+@app.get("/api/jobs")
+async def api_jobs():
+    return {"counts": await asyncio.to_thread(job_store().counts), "workers": JOB_WORKERS}
 
 """서버 헬스 체크"""
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
 
-""" instruction + spec 으로 Agent 실행. /api/run 과 from-message/webhook 에서 사용"""
-def run_agent_from_instruction(instruction: str, spec: str= "specs/app.json") -> RunResponse:
+""" instruction + spec 으로 Agent 실행. 작업 큐 워커(agent.jobs.run_agent_job)에서 사용
+    cancel 이 set 되면 단계 사이 / 빌드 중에 tools.Canceled. lock_project(project_name) 은 new project 모드에서
+    이름이 정해진 뒤 프로젝트를 잠글 때 부른다 (작업 큐 워커가 넘김)
+"""
+def run_agent_from_instruction(instruction: str, spec: str= "specs/app.json", on_line=print,
+                               cancel: threading.Event | None = None, lock_project=None) -> RunResponse:
     from agent.llm_parser import _call_ollama, generate_full_spec_from_nl
-    from agent.main import run_agent_full
+    from agent.main import run_agent_full, warm_project
     from agent.generator import generate_project_from_spec
 
+    def check_cancel():
+        if cancel is not None and cancel.is_set():
+            raise Canceled("canceled")
+
      # new Mode 감지
     if instruction.lower().startswith("new project"):
         full_spec = generate_full_spec_from_nl(instruction)
@@ -58,24 +204,23 @@ def run_agent_from_instruction(instruction: str, spec: str= "specs/app.json") ->
         base_package = full_spec["project"]["basePackage"]
 
         project_dir = BASE_DIR / "generated" / project_name
-        project_dir.mkdir(parents=True, exist_ok=True)
-
-        generate_project_from_spec(project_dir, full_spec)
 
-        return RunResponse(
-            status="ok",
-            project_name=project_name,
-            project_dir=str(project_dir),
-        )
+        if lock_project:
+            lock_project(project_name)
+        check_cancel()
+        changes = generate_project_from_spec(project_dir, full_spec)
+        return _run_response(project_name, project_dir, changes)
 
     spec_path = BASE_DIR / spec
     if not spec_path.exists():
         raise HTTPException(status_code=400, detail=f"Spec not found: {spec}")
     
+    # LLM 변환 동안 Gradle daemon 을 미리 띄워 둔다
+    warm_project(spec_path)
     instructions = _call_ollama(instruction)
 
-    print("[NL]", instruction)
-    print("[INSTRUCTIONS]", instructions)
+    on_line(f"[NL] {instruction}")
+    on_line(f"[INSTRUCTIONS] {instructions}")
 
     if not instructions:
         raise HTTPException(
@@ -83,12 +228,9 @@ def run_agent_from_instruction(instruction: str, spec: str= "specs/app.json") ->
             detail="Failed to convert natural language to instructions. Is Ollama running?: ollama run llama3.2",
         )
     
-    project_dir = run_agent_full(spec_path, instructions)
-    return RunResponse(
-        status="ok",
-        project_name=project_dir.name,
-        project_dir=str(project_dir),
-    )
+    check_cancel()
+    project_dir, changes, build = run_agent_full(spec_path, instructions, on_line, cancel)
+    return _run_response(project_dir.name, project_dir, changes, build)
 
 """ discord 요청인지 확인 """
 def verify_discord_signature(request: Request, raw_body: bytes):
@@ -103,30 +245,59 @@ def verify_discord_signature(request: Request, raw_body: bytes):
     except BadSignatureError:
         raise HTTPException(status_code=401, detail="Invalid Discord signature")
 
-""" 결과를 Discord에 다시 보내는 함수 (비동기) """
-async def send_followup(interaction_token: str, content: str):
-    # Follow-up message endpoint
-    url = f"https://discord.com/api/v10/webhooks/{DISCORD_APP_ID}/{interaction_token}"
-    async with httpx.AsyncClient(timeout=10) as client:
-        await client.post(url, json={"content": content})
+class DiscordProgress:
+    """follow-up 메시지 하나를 만들어 두고, 빌드 출력 마지막 몇 줄로 DISCORD_PROGRESS_SECONDS 마다 고친다
+    작업 큐 워커 프로세스(sync)에서 쓰므로 httpx 동기 호출. 전송 실패는 작업을 멈추지 않는다
+    """
+    def __init__(self, interaction_token: str):
+        self.url = f"https://discord.com/api/v10/webhooks/{DISCORD_APP_ID}/{interaction_token}"
+        self.lines = collections.deque(maxlen=DISCORD_PROGRESS_LINES)
+        self.message_id = None
+        self.last_edit = 0.0
+        self.lock = threading.Lock()
 
-"""시간이 오래걸리는 작업을 수행하고 결과메시지를 만드는 함수"""
-def run_agent_and_notify(instruction: str, interaction_token: str):
-    try:
-        result = run_agent_from_instruction(instruction, "specs/app.json")
-        # result는 Pydantic 모델이면 dict으로 변환
-        msg = f"✅ 완료!\n- project: {result.project_name}\n- dir: {result.project_dir}"
-    except Exception as e:
-        msg = f"❌ 실패: {e}"
-    # background task는 sync라서 httpx async를 직접 못 쓰니 간단히 동기 호출로 바꿔도 됨
-    # 여기서는 가장 단순하게 새 이벤트루프 대신, httpx sync로 처리:
-    import httpx as _httpx
-    url = f"https://discord.com/api/v10/webhooks/{DISCORD_APP_ID}/{interaction_token}"
-    _httpx.post(url, json={"content": msg}, timeout=10)
+    def _send(self, content: str) -> None:
+        try:
+            if self.message_id is None:
+                resp = httpx.post(self.url, params={"wait": "true"}, json={"content": content}, timeout=10)
+                self.message_id = resp.json().get("id")
+            else:
+                httpx.patch(f"{self.url}/messages/{self.message_id}", json={"content": content}, timeout=10)
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"[Discord] progress update failed: {e}")
+
+    def on_line(self, line: str) -> None:
+        with self.lock:
+            self.lines.append(line[:150])
+            now = time.monotonic()
+            if now - self.last_edit < DISCORD_PROGRESS_SECONDS:
+                return
+            self.last_edit = now
+            tail = "\n".join(self.lines)
+        self._send(f"⏳ 실행 중...\n```\n{tail}\n```")
+
+    def finish(self, content: str) -> None:
+        with self.lock:
+            self._send(content)
+
+"""완료 결과를 Discord 메시지로 (진행 상황 메시지를 이 내용으로 고친다)"""
+def result_message(result: RunResponse) -> str:
+    msg = (
+        f"✅ 완료!\n- project: {result.project_name}\n- dir: {result.project_dir}\n"
+        f"- files: +{len(result.added)} ~{len(result.updated)} -{len(result.deleted)} (unchanged {result.unchanged})"
+    )
+    if result.build:
+        build = result.build
+        peak = f"{build['peak_rss_kb']}KB" if build.get("peak_rss_kb") is not None else "n/a"
+        status = "skipped" if build["skipped"] else (
+            f"{build['seconds']}s ({'warm' if build['warm'] else 'cold'}, peak {peak})"
+        )
+        msg += f"\n- build: {status}, {build['reason']}"
+    return msg
 
 """ Discord 호출 엔드포인트"""
 @app.post("/discord/interactions")
-async def discord_interactions(request: Request, background: BackgroundTasks):
+async def discord_interactions(request: Request):
     raw = await request.body()
     verify_discord_signature(request, raw)
     payload = json.loads(raw.decode("utf-8"))
@@ -154,12 +325,16 @@ async def discord_interactions(request: Request, background: BackgroundTasks):
 
         interaction_token = payload.get("token")
 
-        # 3초 내 응답 필수 → 즉시 ACK(에페메랄)
-        background.add_task(run_agent_and_notify, instruction, interaction_token)
+        # 3초 내 응답 필수 → 작업 큐에 넣고 즉시 ACK(에페메랄). 진행 상황 / 결과는 워커가 follow-up 으로
+        try:
+            job = await asyncio.to_thread(submit_job, instruction, "specs/app.json", {"discord_token": interaction_token})
+        except HTTPException as e:
+            return {"type": 4, "data": {"content": f"❌ 실패: {e.detail}", "flags": 64}}
 
+        waiting = f" (앞에 {job['queue_position']}개 대기 중)" if job["queue_position"] else ""
         return {
             "type": 4,
-            "data": {"content": "✅ 지시 받았어! 실행 시작할게.", "flags": 64}
+            "data": {"content": f"✅ 지시 받았어! job {job['job_id']}{waiting}", "flags": 64}
         }
 
     return {"type": 4, "data": {"content": "지원하지 않는 이벤트 타입이야.", "flags": 64}}
\ No newline at end of file
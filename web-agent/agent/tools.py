@@ -1,37 +1,346 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import json
 import os
+import re
 import shutil
+import signal
+import stat
 import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 생성한 파일 목록 {상대경로: sha256} (다음 생성 때 지워진 모듈의 파일을 찾는 용도)
+MANIFEST_NAME = ".agent-manifest.json"
+TEXT_EXTS = (".java", ".yaml", ".html", ".properties", ".gradle", ".md")
+# 템플릿 읽기/치환/쓰기 동시 처리 파일 수
+TEMPLATE_WORKERS = int(os.getenv("TEMPLATE_WORKERS", "8"))
+# run_cmd 기본 제한 시간(초)
+CMD_TIMEOUT = float(os.getenv("CMD_TIMEOUT", "1800"))
+# 프로세스 트리 메모리를 재는 간격(초) / 취소 이벤트 확인 간격(초)
+MEMORY_SAMPLE_SECONDS = 0.2
+CANCEL_POLL_SECONDS = 0.2
+# 종료시킨 뒤 남은 출력을 끝(EOF)까지 읽으며 기다리는 최대 시간(초)
+PIPE_DRAIN_SECONDS = 2.0
+# 출력 한 줄 최대 길이 (asyncio 기본 64KB 보다 길게)
+STREAM_LIMIT = 1024 * 1024
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
-def copy_template(template_dir: Path, dest_dir: Path) -> None:
+def make_substitute(replacements: dict[str, str]):
+    """
+    placeholder 전부를 정규식 하나로 컴파일해, bytes 를 한 번만 훑어 치환하는 함수를 만든다.
+    반환 함수: data(bytes) -> 치환된 bytes, 치환할 곳이 없으면 None
+    - 모든 placeholder 의 공통 접두사(예: "__")가 없는 파일은 바이트 검색(in) 만으로 건너뛴다
+    - 긴 placeholder 를 먼저 매치하고, 치환한 값 안의 placeholder 는 다시 치환하지 않는다
+    """
+    table = {k.encode("utf-8"): v.encode("utf-8") for k, v in replacements.items() if k}
+    if not table:
+        return lambda data: None
+    pattern = re.compile(b"|".join(re.escape(k) for k in sorted(table, key=len, reverse=True)))
+    prefix = os.path.commonprefix(list(table))
+
+    def substitute(data: bytes) -> bytes | None:
+        if prefix and prefix not in data:
+            return None
+        result, count = pattern.subn(lambda m: table[m.group()], data)
+        return result if count else None
+
+    return substitute
+
+def _template_files(template_dir: Path) -> list[Path]:
+    return [p for p in template_dir.rglob("*") if p.is_file()]
+
+def render_template(template_dir: Path, replacements: dict[str, str], path_replacements: dict[str, str] | None = None,
+                    exts=TEXT_EXTS, workers: int = TEMPLATE_WORKERS) -> dict[str, bytes]:
+    """템플릿을 디스크에 복사하지 않고 {상대경로: 내용} 으로 읽는다 (읽기 + 치환 한 번에, 파일 단위 동시 처리).
+    exts 파일은 replacements 를, 경로에는 path_replacements 를 적용 (예: __BASE_PACKAGE_PATH__ -> com/example/app)
+    """
+    substitute = make_substitute(replacements)
+
+    def render(p: Path) -> tuple[str, bytes]:
+        rel = p.relative_to(template_dir).as_posix()
+        for k, v in (path_replacements or {}).items():
+            rel = rel.replace(k, v)
+        data = p.read_bytes()
+        if p.suffix in exts:
+            data = substitute(data) or data
+        return rel, data
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="template") as pool:
+        return dict(pool.map(render, _template_files(template_dir)))
+
+def _write_file(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+
+def copy_template(template_dir: Path, dest_dir: Path, replacements: dict[str, str] | None = None,
+                  path_replacements: dict[str, str] | None = None, exts=TEXT_EXTS, workers: int = TEMPLATE_WORKERS) -> None:
+    """dest_dir 를 지우고 템플릿을 복사. 복사하면서 치환까지 한 번에 (복사 후 replace_in_files 로 다시 쓰지 않는다)"""
     if dest_dir.exists():
         shutil.rmtree(dest_dir)
-    shutil.copytree(template_dir, dest_dir)
-
-def replace_in_files(root: Path, replacements: dict[str, str], exts=(".java", ".yaml", ".html", ".properties", ".gradle", ".md")) -> None:
-    for p in root.rglob("*"):
-        if p.is_file() and p.suffix in exts:
-            text = p.read_text(encoding="utf-8")
-            for k, v in replacements.items():
-                text = text.replace(k, v)
-            p.write_text(text, encoding="utf-8")
-
-""" 명령어 실행하고, 실패하면 예외 던지는 함수 """
-def run_cmd(cmd: list[str], cwd: Path) -> None:
-    print(f"\n[RUN] {' '.join(cmd)} (cwd={cwd})")
+    files = render_template(template_dir, replacements or {}, path_replacements, exts, workers)
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="template") as pool:
+        list(pool.map(lambda item: _write_file(dest_dir / item[0], item[1]), files.items()))
+
+def replace_in_files(root: Path, replacements: dict[str, str], exts=TEXT_EXTS, workers: int = TEMPLATE_WORKERS) -> int:
+    """root 아래 exts 파일의 placeholder 를 치환. 치환할 곳이 있는 파일만 다시 쓴다. 반환: 다시 쓴 파일 수"""
+    substitute = make_substitute(replacements)
+
+    def replace(p: Path) -> bool:
+        data = substitute(p.read_bytes())
+        if data is None:
+            return False
+        p.write_bytes(data)
+        return True
+
+    paths = [p for p in _template_files(root) if p.suffix in exts]
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="template") as pool:
+        return sum(pool.map(replace, paths))
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _load_manifest(dest_dir: Path) -> dict[str, str]:
+    try:
+        return json.loads((dest_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _remove_empty_dirs(path: Path, stop: Path) -> None:
+    while path != stop and path.is_dir() and not any(path.iterdir()):
+        path.rmdir()
+        path = path.parent
+
+def sync_tree(dest_dir: Path, files: dict[str, str | bytes], prune: bool = True,
+              workers: int = TEMPLATE_WORKERS) -> dict[str, list[str]]:
+    """
+    files({상대경로: 내용}) 를 dest_dir 에 맞춘다. 디스크 내용과 해시가 같은 파일은 건드리지 않아 mtime 이 유지된다
+    (Gradle 증분 빌드 / 빌드 캐시가 살아 있음). build/, .gradle/ 등 files 에 없는 파일은 그대로 둔다.
+    prune=True 면 지난번 manifest 에는 있었지만 이번 files 에 없는 파일(지워진 모듈)을 삭제한다.
+    반환: {"added": [...], "updated": [...], "unchanged": [...], "deleted": [...]} (상대경로)
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    root = dest_dir.resolve()
+    previous = _load_manifest(dest_dir)
+    manifest = {} if prune else dict(previous)
+    changes = {"added": [], "updated": [], "unchanged": [], "deleted": []}
 
+    def sync(item: tuple[str, str | bytes]) -> tuple[str, str, str]:
+        rel, content = item
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = _digest(data)
+        target = dest_dir / rel
+        if target.is_file():
+            if _digest(target.read_bytes()) == digest:
+                return rel, digest, "unchanged"
+            kind = "updated"
+        else:
+            kind = "added"
+        _write_file(target, data)
+        return rel, digest, kind
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="template") as pool:
+        for rel, digest, kind in pool.map(sync, sorted(files.items())):
+            manifest[rel] = digest
+            changes[kind].append(rel)
+
+    if prune:
+        for rel in sorted(set(previous) - set(files)):
+            target = (dest_dir / rel).resolve()
+            # manifest 가 손상돼도 프로젝트 밖은 지우지 않는다
+            if not target.is_relative_to(root):
+                continue
+            if target.is_file():
+                target.unlink()
+                changes["deleted"].append(rel)
+            _remove_empty_dirs(target.parent, root)
+
+    (dest_dir / MANIFEST_NAME).write_text(json.dumps(manifest, ensure_ascii=False, indent=0, sort_keys=True), encoding="utf-8")
+    return changes
+
+def format_changes(changes: dict[str, list[str]]) -> str:
+    """sync_tree 변경 내역 요약 한 줄 + 바뀐 파일 목록"""
+    lines = [" ".join(f"{k}={len(v)}" for k, v in changes.items())]
+    for kind, mark in (("added", "+"), ("updated", "~"), ("deleted", "-")):
+        lines += [f"  {mark} {rel}" for rel in changes[kind]]
+    return "\n".join(lines)
+
+IS_WINDOWS = os.name == "nt"
+
+class Canceled(RuntimeError):
+    """cancel 이벤트로 작업(명령)이 취소됨"""
+
+def gradlew_command(project_dir: Path) -> list[str]:
+    """OS 에 맞는 Gradle Wrapper 명령 (Windows: gradlew.bat, 그 외: ./gradlew 에 실행 권한 부여)"""
+    if IS_WINDOWS:
+        return ["gradlew.bat"]
+    gradlew = project_dir / "gradlew"
+    if gradlew.exists():
+        mode = gradlew.stat().st_mode
+        if not mode & stat.S_IXUSR:
+            gradlew.chmod(mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return ["./gradlew"]
+
+def _print_line(line: str, stream: str) -> None:
+    print(line, file=sys.stderr if stream == "stderr" else sys.stdout, flush=True)
+
+def _tree_rss_kb(pid: int) -> int | None:
+    """pid 와 그 자식 프로세스 전체 RSS(KB). psutil 이 없으면 리눅스는 /proc 의 같은 프로세스 그룹 합계, 그 외는 None"""
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            procs = [parent, *parent.children(recursive=True)]
+        except psutil.Error:
+            return 0
+        total = 0
+        for proc in procs:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        return total // 1024
+    if not sys.platform.startswith("linux"):
+        return None
+    total = 0
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry.name}/stat", "rb") as f:
+                # comm(2번째 필드)에 공백/괄호가 있을 수 있어 마지막 ')' 뒤부터 나눈다
+                fields = f.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[2] = pgrp, fields[21] = rss(페이지)
+        if int(fields[2]) == pid:
+            total += int(fields[21]) * _PAGE_SIZE // 1024
+    return total
+
+def _kill_tree(proc: asyncio.subprocess.Process) -> None:
+    """프로세스 그룹 전체 종료 (gradlew -> java 처럼 자식이 남지 않게)"""
+    if proc.returncode is not None:
+        return
+    if IS_WINDOWS:
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+async def stream_cmd(cmd: list[str], cwd: Path, on_line=_print_line, timeout: float | None = CMD_TIMEOUT,
+                     env: dict[str, str] | None = None, cancel: threading.Event | None = None) -> dict:
+    """
+    명령을 새 프로세스 그룹으로 실행하고 stdout / stderr 를 한 줄씩 on_line(line, stream) 으로 넘긴다.
+    timeout(초)을 넘기거나 cancel 이벤트가 set 되면 프로세스 그룹 전체를 죽인다.
+    반환: {"cmd", "returncode", "seconds"(벽시계), "peak_rss_kb"(프로세스 트리 최대 메모리, 못 재면 None),
+          "timed_out", "canceled"}
+    """
     if cmd and cmd[0].lower().endswith((".bat", ".cmd")):
         cmd = ["cmd", "/c", *cmd]
+    if IS_WINDOWS:
+        group = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {"start_new_session": True}
+
+    start = time.perf_counter()
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, cwd=str(cwd), env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LIMIT, **group,
+    )
+    peak = None
+
+    async def pump(reader: asyncio.StreamReader, stream: str) -> None:
+        while line := await reader.readline():
+            on_line(line.decode("utf-8", errors="replace").rstrip("\r\n"), stream)
+
+    async def sample_memory() -> None:
+        nonlocal peak
+        while True:
+            rss = await asyncio.to_thread(_tree_rss_kb, proc.pid)
+            if rss is not None:
+                peak = max(peak or 0, rss)
+            await asyncio.sleep(MEMORY_SAMPLE_SECONDS)
 
-    proc = subprocess.run(cmd, cwd=str(cwd), capture_output=True, text=True, shell=False)
-    
-    if proc.stdout:
-        print(proc.stdout)
-    if proc.returncode != 0:
-        if proc.stderr:
-            print(proc.stderr)
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
\ No newline at end of file
+    async def wait_cancel() -> None:
+        while not cancel.is_set():
+            await asyncio.sleep(CANCEL_POLL_SECONDS)
+
+    sampler = asyncio.create_task(sample_memory())
+    main = asyncio.ensure_future(asyncio.gather(pump(proc.stdout, "stdout"), pump(proc.stderr, "stderr"), proc.wait()))
+    waiters = {main}
+    if cancel is not None:
+        waiters.add(asyncio.create_task(wait_cancel()))
+    timed_out = canceled = False
+    try:
+        done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if main in done:
+            main.result()
+        elif done:
+            canceled = True
+            on_line(f"[CANCEL] 취소 요청, 프로세스 그룹 종료: {' '.join(cmd)}", "stderr")
+        else:
+            timed_out = True
+            on_line(f"[TIMEOUT] {timeout}s 초과, 프로세스 그룹 종료: {' '.join(cmd)}", "stderr")
+    finally:
+        _kill_tree(proc)
+        others = (waiters - {main}) | {sampler}
+        for task in others:
+            task.cancel()
+        # 파이프를 EOF 까지 읽어야 subprocess transport 가 닫힌다
+        # (중간에 끊으면 asyncio.run 이 루프를 닫은 뒤 GC 에서 "Event loop is closed" 가 난다)
+        if not main.done():
+            await asyncio.wait({main}, timeout=PIPE_DRAIN_SECONDS)
+            main.cancel()
+        await asyncio.gather(main, *others, return_exceptions=True)
+        await proc.wait()
+
+    return {
+        "cmd": cmd,
+        "returncode": proc.returncode,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_kb": peak,
+        "timed_out": timed_out,
+        "canceled": canceled,
+    }
+
+""" 명령어 실행하고, 실패하면 예외 던지는 함수
+    출력은 끝날 때까지 모으지 않고 한 줄씩 on_line 으로 넘긴다 (기본: 콘솔 출력)
+    반환 : stream_cmd 결과 (check=False 면 실패해도 예외 없이 반환)
+"""
+def run_cmd(cmd: list[str], cwd: Path, on_line=_print_line, timeout: float | None = CMD_TIMEOUT,
+            env: dict[str, str] | None = None, check: bool = True, cancel: threading.Event | None = None) -> dict:
+    """
+    stream_cmd 의 동기 버전 (스레드 / 워커 프로세스용). 실행 중인 이벤트 루프 안에서는 쓸 수 없으므로
+    코루틴에서는 await stream_cmd(...) 또는 await asyncio.to_thread(run_cmd, ...) 를 쓴다.
+    check=True 이면 종료 코드가 0 이 아닐 때 RuntimeError, cancel 로 중단되면 Canceled.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("run_cmd() cannot be called from a running event loop; "
+                           "use 'await stream_cmd(...)' or 'await asyncio.to_thread(run_cmd, ...)'")
+    print(f"\n[RUN] {' '.join(cmd)} (cwd={cwd})")
+    result = asyncio.run(stream_cmd(cmd, cwd, on_line, timeout, env, cancel))
+    peak_rss = f"{result['peak_rss_kb']}KB" if result["peak_rss_kb"] is not None else "n/a"
+    print(f"[DONE] returncode={result['returncode']} {result['seconds']}s peak_rss={peak_rss}")
+    if result["canceled"]:
+        raise Canceled(f"Command canceled: {' '.join(cmd)}")
+    if check and result["returncode"] != 0:
+        reason = "timed out" if result["timed_out"] else f"exit {result['returncode']}"
+        raise RuntimeError(f"Command failed ({reason}): {' '.join(cmd)}")
+    return result
@@ -0,0 +1,132 @@
+"""빌드 워커(agent/build_worker.py) 확인 + cold / warm 빌드 시간 비교 (stub 빌드 명령 bench/stub_gradle.py 사용)
+
+specs/app.json 으로 임시 디렉터리에 프로젝트를 만들고, spec 을 바꿔 가며 증분 생성 + 빌드한다.
+stub 은 daemon 이 없으면 --cold 초, 있으면 --warm 초 뒤에 task 출력을 한 줄씩 낸다.
+
+확인 (하나라도 틀리면 종료 코드 1)
+- 처음 빌드: 전체 test / 바뀐 것 없음: 빌드 생략 / 모듈 필드 추가: 그 모듈 테스트만 (--tests *Entity*) /
+  모듈 삭제(홈 페이지 링크가 바뀜): 전체 test
+- 빌드 실패 후에는 바뀐 것이 없어도 전체 test 다시 실행
+- 출력이 빌드가 끝나기 전에 한 줄씩 넘어옴 (스트리밍)
+- warm() 은 daemon 이 살아 있으면 아무것도 안 함
+출력: 기존 방식(매번 cold + 출력 모아서) vs 워커 cold / warm 소요시간, 첫 출력까지 시간
+
+사용 예 (web-agent 디렉터리에서):
+    python -m bench.bench_build
+    python -m bench.bench_build --cold 3 --warm 0.2
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+STUB = Path(__file__).resolve().parent / "stub_gradle.py"
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cold", type=float, default=1.5, help="stub daemon 시작 시간(초)")
+    parser.add_argument("--warm", type=float, default=0.1, help="stub warm 빌드 준비 시간(초)")
+    parser.add_argument("--line-delay", type=float, default=0.05, help="stub 출력 줄 간격(초)")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    os.environ.update({
+        "BUILD_COMMAND": f'"{sys.executable}" "{STUB}"',
+        "BUILD_TIMINGS_FILE": str(tmp / "build_timings.jsonl"),
+        "STUB_GRADLE_COLD": str(args.cold),
+        "STUB_GRADLE_WARM": str(args.warm),
+        "STUB_GRADLE_LINE_DELAY": str(args.line_delay),
+    })
+    # 환경변수를 읽은 뒤 import
+    import agent.main as agent_main
+    from agent.build_worker import get_worker, timing_summary
+    from agent.spec_editor import apply_instruction
+
+    agent_main.OUTPUT_DIR = tmp / "generated"
+    spec = json.loads((BASE_DIR / "specs" / "app.json").read_text(encoding="utf-8"))
+    failures = []
+    results = []
+
+    def run(name, expect_tasks):
+        project_dir, changes = agent_main.create_project(spec["projectName"], spec["basePackage"], spec["modules"])
+        lines = []
+        start = time.perf_counter()
+        try:
+            build = get_worker(project_dir).build(
+                changes, spec["basePackage"], spec["modules"],
+                on_line=lambda line: lines.append((time.perf_counter() - start, line)),
+            )
+        except RuntimeError as e:
+            build = {"error": str(e), "tasks": None, "skipped": False}
+        total = time.perf_counter() - start
+        # 첫 줄은 워커가 찍는 [BUILD] 안내, 그다음이 빌드 명령 출력
+        output = [t for t, line in lines if not line.startswith("[BUILD]")]
+        results.append((name, build, total, output[0] if output else None))
+        if expect_tasks is not None and build.get("tasks") != expect_tasks:
+            failures.append(f"{name}: tasks {build.get('tasks')} != {expect_tasks}")
+        return project_dir, build, total, output
+
+    project_dir, _, _, _ = run("first", ["test"])
+    run("unchanged", [])
+
+    spec = apply_instruction(spec, "reservation에 memo 필드 추가")
+    _, build, total, output = run("add field", ["test", "--tests", "*Reservation*"])
+    if not output or output[0] > total - args.line_delay * 2:
+        failures.append("빌드 출력이 끝나기 전에 넘어오지 않음 (스트리밍 아님)")
+
+    spec = apply_instruction(spec, "todo에 priority 필드 Integer 으로 추가")
+    run("add field 2", ["test", "--tests", "*Todo*"])
+
+    spec = {**spec, "modules": spec["modules"][:1]}
+    run("drop module", ["test"])
+
+    if get_worker(project_dir).warm() is not None:
+        failures.append("daemon 이 살아 있는데 warm() 이 다시 띄움")
+
+    os.environ["STUB_GRADLE_EXIT"] = "1"
+    spec = apply_instruction(spec, "reservation에 note 필드 추가")
+    _, build, _, _ = run("failing", None)
+    if "error" not in build:
+        failures.append("빌드 실패가 예외로 올라오지 않음")
+    os.environ["STUB_GRADLE_EXIT"] = "0"
+    run("after failure", ["test"])
+
+    # 기존 방식: daemon 없이(매번 cold) 전체 test, 출력은 끝난 뒤 한꺼번에
+    legacy = []
+    for _ in range(2):
+        (project_dir / ".gradle" / "stub-daemon").unlink(missing_ok=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(STUB), "test"], cwd=project_dir, capture_output=True, text=True)
+        legacy.append(time.perf_counter() - start)
+
+    for name, build, total, first in results:
+        if build.get("skipped"):
+            status = "skipped"
+        elif "error" in build:
+            status = "failed"
+        else:
+            status = "warm" if build["warm"] else "cold"
+        tasks = " ".join(build.get("tasks") or [])
+        first_text = f"{first:5.2f}s" if first is not None else "    -"
+        print(f"{name:<14}: {total:6.2f}s  {status:<7} first output {first_text}  tasks=[{tasks}]")
+    summary = timing_summary()
+    print(f"legacy        : {sum(legacy) / len(legacy):6.2f}s per build (cold, full test, output after exit)")
+    print(f"recorded      : cold {summary['cold']}  warm {summary['warm']}")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""작업 큐 / 워커 풀(agent/jobs.py) 확인 (LLM / Gradle 대신 잠깐 자는 자식 프로세스를 띄우는 fake handler 사용)
+
+instruction 형식: "<run|new> <프로젝트> <초>". run 은 제출할 때 lock_key 를 주고, new 는 실행 중 lock_project() 로 잠근다.
+
+확인 (하나라도 틀리면 종료 코드 1)
+- 같은 프로젝트 작업은 겹치지 않고 들어온 순서대로, 다른 프로젝트 작업은 동시에 실행
+- new project 모드: 같은 이름 프로젝트가 실행 중이면 lock_project() 에서 기다렸다가 이어서 실행
+- 취소: 대기 중 작업은 바로 canceled, 실행 중 작업은 자식 프로세스가 죽고 canceled
+- 풀을 하나 더 띄워도 살아 있는 워커가 처리 중인 작업은 다시 대기열에 들어가지 않음
+- 풀을 멈추면 실행 중이던 작업의 자식 프로세스가 죽고, 남은 풀이 그 작업을 다시 실행해서 끝냄 (SQLite 에 남아 있음)
+출력: 작업별 대기 / 실행 시간, 모두 순서대로 실행했을 때와 비교
+
+사용 예 (web-agent 디렉터리에서):
+    python -m bench.bench_jobs
+    python -m bench.bench_jobs --workers 4 --seconds 0.5
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agent.jobs import FINISHED, JobStore, JobWorkerPool
+from agent.tools import run_cmd
+
+HANDLER = "bench.bench_jobs:fake_handler"
+
+SLEEP = """
+import os, sys, time
+open(sys.argv[1], "w").write(str(os.getpid()))
+print("working", flush=True)
+time.sleep(float(sys.argv[2]))
+print("done", flush=True)
+"""
+
+
+def fake_handler(job, on_line, cancel, lock_project):
+    kind, project, seconds = job["instruction"].split()
+    if kind == "new":
+        lock_project(project)
+    start = time.time()
+    run_cmd([sys.executable, "-c", SLEEP, str(Path(job["spec"]) / f"{job['id']}.pid"), seconds], Path(job["spec"]),
+            on_line=lambda line, stream: on_line(line), cancel=cancel)
+    return {"start": start, "end": time.time()}
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rsplit(b")", 1)[1].split()[0] != b"Z"
+    except OSError:
+        return True
+
+
+def wait(store, job_ids, timeout=30.0, status=FINISHED):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        jobs = [store.get(job_id) for job_id in job_ids]
+        if all(job["status"] in status for job in jobs):
+            return jobs
+        time.sleep(0.05)
+    raise TimeoutError(f"jobs not {status}: {[store.get(job_id)['status'] for job_id in job_ids]}")
+
+
+def wait_pid(tmp, job_id, timeout=10.0):
+    """작업이 띄운 자식 프로세스의 pid (fake_handler 가 파일로 남긴다)"""
+    pid_file = tmp / f"{job_id}.pid"
+    deadline = time.monotonic() + timeout
+    while not pid_file.exists() or not pid_file.read_text():
+        if time.monotonic() > deadline:
+            raise TimeoutError("job did not start")
+        time.sleep(0.05)
+    return int(pid_file.read_text())
+
+
+def overlaps(a, b):
+    return a["result"]["start"] < b["result"]["end"] and b["result"]["start"] < a["result"]["end"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=1.0, help="작업 하나의 실행 시간(초)")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp())
+    # 워커 프로세스가 읽는다 (죽은 워커의 작업을 빨리 찾도록)
+    os.environ["JOB_ORPHAN_CHECK_SECONDS"] = "0.5"
+    store = JobStore(tmp / "jobs.db")
+    pool = JobWorkerPool(tmp / "jobs.db", args.workers, handler=HANDLER, poll_interval=0.05)
+    pool.start()
+    failures = []
+    sec = str(args.seconds)
+
+    def submit(instruction, lock_key):
+        return store.create(instruction, str(tmp), lock_key)
+
+    # 같은 프로젝트 2개 + 다른 프로젝트 1개 + 같은 프로젝트를 new 모드로 1개
+    start = time.time()
+    a1 = submit(f"run alpha {sec}", "project:alpha")
+    a2 = submit(f"run alpha {sec}", "project:alpha")
+    b1 = submit(f"run beta {sec}", "project:beta")
+    n1 = submit(f"new beta {sec}", None)
+    jobs = dict(zip(["alpha 1", "alpha 2", "beta", "new beta"], wait(store, [a1, a2, b1, n1])))
+    total = time.time() - start
+    for name, job in jobs.items():
+        if job["status"] != "succeeded":
+            failures.append(f"{name}: {job['status']} {job['error']}")
+            continue
+        queued = job["started_at"] - job["created_at"]
+        print(f"{name:<9}: queued {queued:5.2f}s  ran {job['result']['start'] - start:5.2f}s"
+              f" ~ {job['result']['end'] - start:5.2f}s")
+    print(f"total    : {total:5.2f}s (serial {4 * args.seconds:5.2f}s+)")
+    if not failures:
+        if overlaps(jobs["alpha 1"], jobs["alpha 2"]):
+            failures.append("같은 프로젝트 작업이 동시에 실행됨")
+        if jobs["alpha 2"]["result"]["start"] < jobs["alpha 1"]["result"]["end"]:
+            failures.append("같은 프로젝트 작업 순서가 바뀜")
+        if not overlaps(jobs["alpha 1"], jobs["beta"]):
+            failures.append("다른 프로젝트 작업이 동시에 실행되지 않음")
+        if overlaps(jobs["beta"], jobs["new beta"]):
+            failures.append("new project 작업이 같은 프로젝트 잠금을 기다리지 않음")
+
+    # 취소: 실행 중 1개 + 같은 프로젝트로 대기 중 1개
+    c1 = submit("run gamma 30", "project:gamma")
+    c2 = submit("run gamma 30", "project:gamma")
+    pid = wait_pid(tmp, c1)
+    if store.request_cancel(c2) != "canceled":
+        failures.append("대기 중 작업이 바로 취소되지 않음")
+    requested = time.monotonic()
+    store.request_cancel(c1)
+    running, queued = wait(store, [c1, c2], timeout=10)
+    took = time.monotonic() - requested
+    time.sleep(0.2)
+    print(f"cancel   : running -> {running['status']} in {took:.2f}s (child alive={alive(pid)}), "
+          f"queued -> {queued['status']}")
+    if running["status"] != "canceled" or queued["status"] != "canceled":
+        failures.append(f"취소 상태가 다름: {running['status']} / {queued['status']}")
+    if alive(pid):
+        failures.append("취소된 작업의 자식 프로세스가 살아 있음")
+
+    # 풀 하나 더 시작 (python -m agent.jobs 를 같이 띄운 경우): 살아 있는 워커의 작업은 그대로 둬야 한다
+    d1 = submit(f"run delta {sec}", "project:delta")
+    d2 = submit(f"run delta {sec}", "project:delta")
+    running = wait(store, [d1], timeout=10, status=("running",))[0]
+    second = JobWorkerPool(tmp / "jobs.db", 1, handler=HANDLER, poll_interval=0.05)
+    second.start()
+    after = store.get(d1)
+    print(f"second   : d1 {after['status']} pid {running['worker_pid']} -> {after['worker_pid']}")
+    if after["status"] != "running" or after["worker_pid"] != running["worker_pid"]:
+        failures.append("두 번째 풀이 살아 있는 워커의 작업을 다시 대기열에 넣음")
+
+    # 워커 종료: 실행 중이던 작업의 자식 프로세스는 죽고, 남은 풀이 그 작업을 이어서 처리 (SQLite 에 남아 있음)
+    d1_pid = wait_pid(tmp, d1)
+    pool.stop(timeout=0)
+    print(f"restart  : stopped with {store.counts()} (child alive={alive(d1_pid)})")
+    if alive(d1_pid):
+        failures.append("풀을 멈춘 뒤 실행 중이던 작업의 자식 프로세스가 살아 있음")
+    restarted = wait(store, [d1, d2])
+    print(f"restart  : after worker exit {[job['status'] for job in restarted]}")
+    if any(job["status"] != "succeeded" for job in restarted):
+        failures.append("워커가 종료된 뒤 작업이 끝나지 않음")
+    elif overlaps(*restarted):
+        failures.append("다시 실행된 작업이 같은 프로젝트 작업과 동시에 실행됨")
+    second.stop()
+    store.close()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""명령 실행기(tools.stream_cmd / run_cmd) 확인 + 기존 run_cmd(subprocess.run capture_output) 와 첫 출력 시간 비교
+
+확인 (하나라도 틀리면 종료 코드 1)
+- stdout / stderr 가 줄 단위로 구분되어 넘어오고, 첫 줄은 프로세스가 끝나기 전에 도착 (스트리밍)
+- 제한 시간을 넘기면 자식(손자 프로세스 포함) 프로세스 그룹 전체가 죽고 timed_out=True
+- 메모리를 --alloc-mb 만큼 잡는 명령의 peak_rss_kb 가 그 이상 (리눅스 / psutil 설치 시)
+- 실패한 명령은 run_cmd 가 RuntimeError, check=False 면 returncode 반환
+- gradlew_command: 리눅스는 ./gradlew (실행 권한 부여), Windows 는 gradlew.bat
+
+사용 예 (web-agent 디렉터리에서):
+    python -m bench.bench_runner
+    python -m bench.bench_runner --lines 50 --line-delay 0.05 --alloc-mb 200
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agent.tools import IS_WINDOWS, gradlew_command, run_cmd
+
+EMIT = """
+import sys, time
+for i in range({lines}):
+    print(f"line {{i}}", flush=True)
+    if i % 5 == 0:
+        print(f"warn {{i}}", file=sys.stderr, flush=True)
+    time.sleep({delay})
+"""
+
+# 손자 프로세스를 띄우고 자기 pid 를 파일에 남긴 뒤 오래 잔다
+HANG = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+open(sys.argv[1], "w").write(str(child.pid))
+print("started", flush=True)
+time.sleep(60)
+"""
+
+ALLOC = """
+import time
+data = bytearray({mb} * 1024 * 1024)
+for i in range(0, len(data), 4096):
+    data[i] = 1
+time.sleep(0.8)
+print("done", flush=True)
+"""
+
+
+def alive(pid):
+    if IS_WINDOWS:
+        return str(pid) in subprocess.run(["tasklist", "/FI", f"PID eq {pid}"], capture_output=True, text=True).stdout
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # 죽었지만 아직 회수되지 않은 좀비는 죽은 것으로 본다
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            return f.read().rsplit(b")", 1)[1].split()[0] != b"Z"
+    except OSError:
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=20)
+    parser.add_argument("--line-delay", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    parser.add_argument("--alloc-mb", type=int, default=100)
+    args = parser.parse_args()
+
+    cwd = Path(tempfile.mkdtemp())
+    failures = []
+    emit = [sys.executable, "-c", EMIT.format(lines=args.lines, delay=args.line_delay)]
+
+    # 기존 방식: 끝날 때까지 모아서 출력
+    start = time.perf_counter()
+    subprocess.run(emit, cwd=cwd, capture_output=True, text=True)
+    legacy = time.perf_counter() - start
+
+    events = []
+    start = time.perf_counter()
+    result = run_cmd(emit, cwd, on_line=lambda line, stream: events.append((time.perf_counter() - start, stream, line)))
+    stdout = [line for _, stream, line in events if stream == "stdout"]
+    stderr = [line for _, stream, line in events if stream == "stderr"]
+    print(f"stream     : first line {events[0][0]:.2f}s / total {result['seconds']:.2f}s "
+          f"(legacy first output {legacy:.2f}s), stdout={len(stdout)} stderr={len(stderr)}")
+    if stdout != [f"line {i}" for i in range(args.lines)] or stderr != [f"warn {i}" for i in range(0, args.lines, 5)]:
+        failures.append("stdout / stderr 줄이 다름")
+    if events[0][0] > result["seconds"] / 2:
+        failures.append("첫 줄이 프로세스가 끝날 무렵에 도착 (스트리밍 아님)")
+
+    pid_file = cwd / "grandchild.pid"
+    result = run_cmd([sys.executable, "-c", HANG, str(pid_file)], cwd, on_line=lambda line, stream: None,
+                     timeout=args.timeout, check=False)
+    grandchild = int(pid_file.read_text())
+    time.sleep(0.2)
+    print(f"timeout    : timed_out={result['timed_out']} after {result['seconds']:.2f}s, "
+          f"grandchild alive={alive(grandchild)}")
+    if not result["timed_out"] or result["seconds"] > args.timeout + 2:
+        failures.append("제한 시간이 지켜지지 않음")
+    if alive(grandchild):
+        failures.append("손자 프로세스가 살아 있음 (프로세스 그룹 종료 안 됨)")
+
+    result = run_cmd([sys.executable, "-c", ALLOC.format(mb=args.alloc_mb)], cwd, on_line=lambda line, stream: None)
+    peak = result["peak_rss_kb"]
+    print(f"memory     : peak_rss_kb={peak} (allocated {args.alloc_mb}MB)")
+    if peak is not None and peak < args.alloc_mb * 1024:
+        failures.append(f"peak_rss_kb {peak} < {args.alloc_mb * 1024}")
+    if peak is None and sys.platform.startswith("linux"):
+        failures.append("리눅스에서 peak_rss_kb 를 못 잼")
+
+    failing = [sys.executable, "-c", "import sys; sys.exit(3)"]
+    try:
+        run_cmd(failing, cwd, on_line=lambda line, stream: None)
+        failures.append("실패한 명령에서 예외가 없음")
+    except RuntimeError:
+        pass
+    if run_cmd(failing, cwd, on_line=lambda line, stream: None, check=False)["returncode"] != 3:
+        failures.append("check=False returncode 가 다름")
+
+    (cwd / "gradlew").write_text("#!/bin/sh\necho gradlew \"$@\"\n")
+    command = gradlew_command(cwd)
+    print(f"gradlew    : {command}")
+    if IS_WINDOWS:
+        if command != ["gradlew.bat"]:
+            failures.append(f"Windows gradlew 명령 {command}")
+    else:
+        output = []
+        run_cmd([*command, "test"], cwd, on_line=lambda line, stream: output.append(line))
+        if command != ["./gradlew"] or output != ["gradlew test"]:
+            failures.append(f"./gradlew 실행 실패 {command} {output}")
+    shutil.rmtree(cwd, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
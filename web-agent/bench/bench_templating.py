@@ -0,0 +1,153 @@
+"""템플릿 복사 + placeholder 치환 벤치마크 (agent/tools.py)
+
+임시 디렉터리에 파일 --files 개짜리 가짜 템플릿(__BASE_PACKAGE_PATH__ 아래 java / html / gradle, placeholder 가 있는
+파일은 --hit-ratio 비율, 나머지는 치환할 곳 없음 + wrapper jar 같은 바이너리 --binaries 개)을 만들고 비교한다.
+- legacy : shutil.copytree 후 파일마다 read_text + placeholder 수만큼 str.replace + 항상 write_text, 패키지 디렉터리 rename
+- copy   : tools.copy_template (정규식 하나로 복사하면서 치환, 동시 처리)
+- replace: copytree 후 tools.replace_in_files (치환할 곳이 있는 파일만 다시 씀)
+- sync   : tools.render_template + sync_tree (처음 생성 / 바뀐 것 없이 다시 생성)
+
+확인 (하나라도 틀리면 종료 코드 1)
+- legacy 와 copy / sync 결과 파일 내용이 모두 같음
+- replace_in_files 가 다시 쓴 파일 수 == placeholder 가 있는 파일 수
+- 바뀐 것 없이 다시 생성하면 쓴 파일 0개
+
+사용 예 (web-agent 디렉터리에서):
+    python -m bench.bench_templating
+    python -m bench.bench_templating --files 10000 --workers 16
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agent.tools import TEXT_EXTS, copy_template, render_template, replace_in_files, sync_tree
+
+REPLACEMENTS = {"__PROJECT_NAME__": "bench-service", "__BASE_PACKAGE__": "com.example.benchservice"}
+PATH_REPLACEMENTS = {"__BASE_PACKAGE_PATH__": "com/example/benchservice"}
+
+
+def make_template(root, files, hit_ratio, binaries, seed=0):
+    """반환: placeholder 가 있는 텍스트 파일 수"""
+    rng = random.Random(seed)
+    filler = "\n".join(f"    // line {i}: 평범한 코드 주석, placeholder 없음" for i in range(60))
+    hits = 0
+    for i in range(files):
+        kind = ("java", "html", "gradle")[i % 3]
+        hit = rng.random() < hit_ratio
+        hits += hit
+        if kind == "java":
+            path = root / "src/main/java/__BASE_PACKAGE_PATH__" / f"pkg{i % 40}" / f"Class{i}.java"
+            head = f"package __BASE_PACKAGE__.pkg{i % 40};\n" if hit else f"package plain.pkg{i % 40};\n"
+            text = f"{head}\npublic class Class{i} {{\n{filler}\n}}\n"
+        elif kind == "html":
+            path = root / "src/main/resources/templates" / f"view{i % 25}" / f"page{i}.html"
+            title = "__PROJECT_NAME__" if hit else f"page {i}"
+            text = f"<html><head><title>{title}</title></head>\n<body>\n{filler}\n</body></html>\n"
+        else:
+            path = root / "modules" / f"m{i % 30}" / f"build{i}.gradle"
+            group = "group = '__BASE_PACKAGE__'" if hit else "group = 'plain'"
+            text = f"{group}\n{filler}\n"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    for i in range(binaries):
+        path = root / "gradle/wrapper" / f"lib{i}.jar"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rng.randbytes(64 * 1024))
+    return hits
+
+
+def legacy_generate(template, dest):
+    """기존 방식 (copy_template + replace_in_files + replace_base_package_path): 통째로 복사한 뒤 치환 키마다 파일을 다시 읽고 쓴다"""
+    if dest.exists():
+        shutil.rmtree(dest)
+    shutil.copytree(template, dest)
+    for p in dest.rglob("*"):
+        if p.is_file() and p.suffix in TEXT_EXTS:
+            text = p.read_text(encoding="utf-8")
+            for k, v in REPLACEMENTS.items():
+                text = text.replace(k, v)
+            p.write_text(text, encoding="utf-8")
+    src_java = dest / "src/main/java"
+    target = src_java / PATH_REPLACEMENTS["__BASE_PACKAGE_PATH__"]
+    target.parent.mkdir(parents=True, exist_ok=True)
+    (src_java / "__BASE_PACKAGE_PATH__").rename(target)
+
+
+def read_tree(root):
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in root.rglob("*") if p.is_file() and p.name != ".agent-manifest.json"
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000, help="템플릿 텍스트 파일 수")
+    parser.add_argument("--hit-ratio", type=float, default=0.1, help="placeholder 가 있는 파일 비율")
+    parser.add_argument("--binaries", type=int, default=20, help="바이너리(jar) 파일 수 (64KB)")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        template = tmp / "template"
+        hits = make_template(template, args.files, args.hit_ratio, args.binaries)
+
+        _, legacy_time = timed(lambda: legacy_generate(template, tmp / "legacy"))
+        _, copy_time = timed(lambda: copy_template(template, tmp / "copy", REPLACEMENTS, PATH_REPLACEMENTS,
+                                                   workers=args.workers))
+        _, copy_serial_time = timed(lambda: copy_template(template, tmp / "copy-serial", REPLACEMENTS,
+                                                          PATH_REPLACEMENTS, workers=1))
+
+        shutil.copytree(template, tmp / "replace")
+        rewritten, replace_time = timed(lambda: replace_in_files(tmp / "replace", REPLACEMENTS, workers=args.workers))
+
+        def sync():
+            files = render_template(template, REPLACEMENTS, PATH_REPLACEMENTS, workers=args.workers)
+            return sync_tree(tmp / "sync", files, workers=args.workers)
+
+        first, sync_time = timed(sync)
+        again, resync_time = timed(sync)
+
+        legacy = read_tree(tmp / "legacy")
+        outputs = {"copy": read_tree(tmp / "copy"), "copy-serial": read_tree(tmp / "copy-serial"),
+                   "sync": read_tree(tmp / "sync")}
+
+    total = args.files + args.binaries
+    print(f"template   : {total} files ({hits} with placeholders, {args.binaries} binaries), workers={args.workers}")
+    print(f"legacy     : {legacy_time:6.3f}s  (copytree + rewrite every text file)")
+    print(f"copy       : {copy_time:6.3f}s  ({legacy_time / copy_time:.2f}x)  serial {copy_serial_time:.3f}s")
+    print(f"replace    : {replace_time:6.3f}s  rewrote {rewritten} files (in-place, after copytree)")
+    print(f"sync       : {sync_time:6.3f}s  first run added={len(first['added'])}")
+    print(f"resync     : {resync_time:6.3f}s  unchanged={len(again['unchanged'])} "
+          f"written={len(again['added']) + len(again['updated'])}")
+
+    failures = []
+    for name, tree in outputs.items():
+        if tree != legacy:
+            diff = sorted(set(tree) ^ set(legacy)) or sorted(k for k in tree if tree[k] != legacy.get(k))
+            failures.append(f"{name} 결과가 legacy 와 다름 (예: {diff[:3]})")
+    if rewritten != hits:
+        failures.append(f"replace_in_files 가 다시 쓴 파일 {rewritten} != placeholder 파일 {hits}")
+    if again["added"] or again["updated"] or again["deleted"]:
+        failures.append("바뀐 것 없는 재생성에서 파일을 씀")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""gradlew 대신 쓰는 stub 빌드 명령 (리눅스에서 build_worker 확인용)
+
+BUILD_COMMAND="python bench/stub_gradle.py" 처럼 지정한다.
+- daemon 흉내: 프로젝트의 .gradle/stub-daemon 이 없거나 STUB_GRADLE_IDLE 초보다 오래됐으면 cold (STUB_GRADLE_COLD 초 대기)
+  아니면 warm (STUB_GRADLE_WARM 초 대기)
+- task 마다 "> Task :이름" 한 줄을 STUB_GRADLE_LINE_DELAY 초 간격으로 출력 (출력 스트리밍 확인용)
+- 호출 인자 / cold 여부를 .gradle/stub-calls.jsonl 에 기록
+- 종료 코드: STUB_GRADLE_EXIT (기본 0)
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+COLD = float(os.getenv("STUB_GRADLE_COLD", "1.5"))
+WARM = float(os.getenv("STUB_GRADLE_WARM", "0.1"))
+IDLE = float(os.getenv("STUB_GRADLE_IDLE", "60"))
+LINE_DELAY = float(os.getenv("STUB_GRADLE_LINE_DELAY", "0.05"))
+EXIT = int(os.getenv("STUB_GRADLE_EXIT", "0"))
+
+
+def main():
+    args = sys.argv[1:]
+    state_dir = Path.cwd() / ".gradle"
+    state_dir.mkdir(exist_ok=True)
+    daemon = state_dir / "stub-daemon"
+    cold = not daemon.exists() or time.time() - daemon.stat().st_mtime > IDLE
+
+    print("Starting a Gradle Daemon" if cold else "Reusing Gradle Daemon", flush=True)
+    time.sleep(COLD if cold else WARM)
+    daemon.touch()
+
+    tasks = []
+    for i, arg in enumerate(args):
+        if not arg.startswith("-") and (i == 0 or args[i - 1] != "--tests"):
+            tasks.append(arg)
+    for task in tasks:
+        for step in ("compileJava", "processResources", "classes", task):
+            print(f"> Task :{step}", flush=True)
+            time.sleep(LINE_DELAY)
+    print("BUILD SUCCESSFUL" if EXIT == 0 else "BUILD FAILED", flush=True)
+
+    with (state_dir / "stub-calls.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"args": args, "cold": cold, "ts": time.time()}) + "\n")
+    sys.exit(EXIT)
+
+
+if __name__ == "__main__":
+    main()